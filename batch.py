@@ -0,0 +1,173 @@
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from checkpoint import RunCheckpoint, new_run_id
+from instrumentation import Tracer
+from main import run_pipeline, save_outputs
+from schemas import output_text
+
+
+def load_manifest(manifest_path: str) -> list[dict]:
+    """
+    Read (jd_url, resume_path) pairs from a CSV or JSONL manifest.
+
+    CSV files need a header row with `jd_url` and `resume_path` columns, JSONL files one
+    object per line with the same keys. An optional `id` is used to name the outputs of
+    the pair; pairs without one are numbered in manifest order.
+    """
+    pairs = []
+    if manifest_path.lower().endswith(".jsonl"):
+        with open(manifest_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(manifest_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    for i, row in enumerate(rows, start=1):
+        jd_url = (row.get("jd_url") or "").strip()
+        resume_path = (row.get("resume_path") or "").strip()
+        if not jd_url or not resume_path:
+            raise ValueError(f"Manifest row {i} needs both jd_url and resume_path")
+        pair_id = str(row.get("id") or f"pair_{i:04d}").strip()
+        pairs.append({"id": pair_id, "jd_url": jd_url, "resume_path": resume_path})
+
+    ids = [pair["id"] for pair in pairs]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Manifest ids must be unique")
+    return pairs
+
+
+def run_batch(pairs: list[dict], results_path: str, output_dir: str = "Job_Application_Analysis",
+              max_workers: int = 4, execution_mode: str = "sequential", max_concurrency: int = 4,
+              prefetch: bool = False, llm_cache_mode: str = None, incremental: bool = False,
+              parallel_render: bool = False, batch_id: str = None, context_budget: int = None,
+              lean: bool = False, fused: bool = False, fit_scoring: str = None) -> list[dict]:
+    """
+    Analyze many (jd_url, resume_path) pairs with at most `max_workers` running at once.
+
+    Each worker thread builds one agent set the first time it picks up a pair and reuses
+    it for every later pair; the PDF reader and scraper tools are shared by all workers.
+    One JSON record per pair is appended to `results_path` as soon as the pair finishes.
+    With `parallel_render`, PDF rendering is handed to a process pool so the reports of
+    different pairs are drawn on separate cores instead of contending for the GIL.
+
+    Each pair is checkpointed under the run ID `<batch_id>_<pair id>`. Running a manifest
+    again with the `batch_id` of an interrupted batch resumes every pair from its first
+    incomplete task, provided the pair's inputs and the options are the ones it was started with.
+
+    Returns:
+        list[dict]: The result records in manifest order
+    """
+    batch_timestamp = batch_id or new_run_id()
+    print(f"Batch {batch_timestamp} (pass --resume {batch_timestamp} to continue it if interrupted)")
+    worker_state = threading.local()
+    write_lock = threading.Lock()
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+
+    def analyze_pair(pair: dict) -> dict:
+        record = {
+            "id": pair["id"],
+            "jd_url": pair["jd_url"],
+            "resume_path": pair["resume_path"],
+            "status": "failed",
+            "error": None,
+            "outputs": [],
+        }
+        start = time.perf_counter()
+        run_id = f"{batch_timestamp}_{pair['id']}"
+        try:
+            if not hasattr(worker_state, "agents"):
+                from crew_definition import build_agents
+
+                # A failure here fails this pair only; the worker tries again with its next pair
+                worker_state.agents = build_agents()
+            with Tracer(run_id=run_id).activate():
+                result = run_pipeline(pair["jd_url"], pair["resume_path"], execution_mode=execution_mode,
+                                      max_concurrency=max_concurrency, agents=worker_state.agents,
+                                      prefetch=prefetch, llm_cache_mode=llm_cache_mode,
+                                      incremental=incremental, checkpoint=RunCheckpoint(run_id),
+                                      context_budget=context_budget, lean=lean, fused=fused,
+                                      fit_scoring=fit_scoring)
+                record["outputs"] = [output_text(output) if output is not None else None
+                                     for output in result.tasks_output]
+                record.update(save_outputs(result.tasks_output, output_dir, run_id,
+                                            parallel_render=parallel_render))
+            record["status"] = "completed"
+        except Exception as e:
+            record["error"] = str(e)
+            traceback.print_exc()
+        record["duration_seconds"] = round(time.perf_counter() - start, 3)
+
+        with write_lock:
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        print(f"[{record['id']}] {record['status']} in {record['duration_seconds']}s")
+        return record
+
+    records = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(analyze_pair, pair): pair["id"] for pair in pairs}
+        for future in as_completed(futures):
+            records[futures[future]] = future.result()
+
+    return [records[pair["id"]] for pair in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a manifest of job postings and resumes")
+    parser.add_argument("manifest", help="CSV or JSONL file with jd_url and resume_path columns")
+    parser.add_argument("--results", default=None,
+                        help="JSONL file receiving one record per pair (default: batch_results_<timestamp>.jsonl)")
+    parser.add_argument("--output-dir", default="Job_Application_Analysis")
+    parser.add_argument("--workers", type=int, default=4, help="Pairs analyzed at the same time")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], default="sequential",
+                        help="Task execution mode inside each pair")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Tasks in flight per pair in parallel mode")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Put the job description and resume text straight into the task prompts")
+    parser.add_argument("--llm-cache", choices=["off", "record", "replay"], default=None,
+                        help="Serve repeated prompts from the local response cache, or replay it offline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse task outputs whose inputs haven't changed since an earlier run")
+    parser.add_argument("--context-budget", type=int, default=None, metavar="CHARS",
+                        help="Give each task only the upstream fields it needs, in at most CHARS characters")
+    parser.add_argument("--lean", action="store_true",
+                        help="Skip the tasks whose output no report uses")
+    parser.add_argument("--fused", action="store_true",
+                        help="Answer closely related tasks together with one LLM call")
+    parser.add_argument("--fit-scoring", choices=["llm", "local", "explain"], default=None,
+                        help="Compute the fit scores locally, optionally with the LLM explaining them")
+    parser.add_argument("--resume", metavar="BATCH_ID", default=None,
+                        help="Resume an interrupted batch, skipping every task its pairs already completed")
+    parser.add_argument("--parallel-render", action="store_true",
+                        help="Render the PDF reports in a pool of worker processes")
+    args = parser.parse_args()
+
+    pairs = load_manifest(args.manifest)
+    results_path = args.results or os.path.join(
+        args.output_dir, f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    print(f"Analyzing {len(pairs)} pairs with {args.workers} workers...")
+    records = run_batch(pairs, results_path, output_dir=args.output_dir, max_workers=args.workers,
+                        execution_mode=args.mode, max_concurrency=args.max_concurrency,
+                        prefetch=args.prefetch, llm_cache_mode=args.llm_cache,
+                        incremental=args.incremental, parallel_render=args.parallel_render,
+                        batch_id=args.resume, context_budget=args.context_budget, lean=args.lean,
+                        fused=args.fused, fit_scoring=args.fit_scoring)
+
+    completed = sum(1 for record in records if record["status"] == "completed")
+    print(f"\nBatch finished: {completed}/{len(records)} pairs completed")
+    print(f"Results written to: {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep the benchmark's caches away from the real ones; must happen before crew_definition is imported
+BENCH_DIR = tempfile.mkdtemp(prefix="masumi_bench_")
+os.environ.setdefault("CACHE_DIR", os.path.join(BENCH_DIR, "cache"))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+# Lines per task output / pages per fixture PDF for each input size
+SIZES = {
+    "small": {"lines": 20, "pages": 2},
+    "large": {"lines": 1500, "pages": 60},
+}
+
+# Modules whose cold import time is tracked, i.e. the startup cost of a CLI call or worker process
+STARTUP_MODULES = ["main", "batch", "logging_config", "crew_definition"]
+STARTUP_REPEAT = 3
+
+# Mock model endpoint for the rate limiter: calls it serves at once, seconds per call, Retry-After of its 429s
+MOCK_ENDPOINT = {"capacity": 4, "latency": 0.02, "retry_after": 0.05}
+MOCK_CALLS = 64
+MOCK_CALLERS = 16
+
+SKILLS = ["Python", "SQL", "Stakeholder management", "Program management", "Data analysis",
+          "Strategic planning", "Cloud infrastructure", "Team leadership", "Budgeting", "Agile delivery"]
+
+
+def synthetic_tasks_output(lines: int) -> list[str]:
+    """Nine task outputs shaped like the agents' free-text answers, `lines` lines each."""
+    def block(title: str, row) -> str:
+        body = ["Thought: I now can give a great answer", f"{title}:"]
+        body.extend(row(i) for i in range(lines))
+        return "\n".join(body)
+
+    return [
+        block("Role Category", lambda i: f"{SKILLS[i % 10]}: {60 + i % 40}% weight for {{\"area\": \"technical\"}}"),
+        block("Must-have skills", lambda i: f"- {SKILLS[i % 10]} (priority {i % 5 + 1}): required_for delivery"),
+        block("Technical skills", lambda i: f"{SKILLS[i % 10]}: {i % 10 + 1}/10 proficiency, education and certification"),
+        block("Match scores", lambda i: f"Overall match score: {70 + i % 30}" if i % 4 == 0 else f"Technical skills match: {60 + i % 40}"),
+        block("Experience", lambda i: f"• Led {SKILLS[i % 10].lower()} initiative improving throughput by {i % 50}%"),
+        block("Skills profile", lambda i: f"- {SKILLS[i % 10]} [ATS keyword density {i % 7}]"),
+        block("PDF plan", lambda i: f"Section {i}: layout details"),
+        block("Technical interview questions", lambda i: f"- Q: How would you apply {SKILLS[i % 10]} in week {i}?"),
+        block("Final report", lambda i: f"Summary line {i}"),
+    ]
+
+
+def synthetic_report_data(lines: int) -> tuple[dict, dict]:
+    """Analysis and CV dicts in the shape `create_agent_pdf_report` consumes."""
+    items = [f"{SKILLS[i % 10]} evidence item {i} with a long enough description to need wrapping" for i in range(lines)]
+    analysis_data = {
+        "role_classification": {"Category": "Hybrid", "Split": "60% Business / 40% Technical"},
+        "requirements": {"Must-have": items[: lines // 2], "Nice-to-have": items[lines // 2:]},
+        "skills_matrix": {skill: f"{i + 1}/10" for i, skill in enumerate(SKILLS)},
+        "match_analysis": {"Overall": "78%", "Technical": "72%"},
+        "interview_guide": items,
+    }
+    cv_data = {
+        "summary": "Program manager with a track record in strategic business operations.",
+        "skills": SKILLS,
+        "experience": {f"Role {i}": items[i: i + 3] for i in range(0, lines, 3)},
+        "education": ["MSc Engineering Management", "PMP Certification"],
+    }
+    return analysis_data, cv_data
+
+
+def synthetic_fit_inputs(items: int) -> tuple:
+    """Outputs of Tasks 1-3 with `items` requirements and resume entries each, as `score_fit` consumes them."""
+    from schemas import JobRequirements, RankedItem, RoleClassification, SkillsMatrix
+
+    texts = [f"{SKILLS[i % 10]} for initiative {i} across {i % 7 + 2} teams over {i % 9 + 1} years" for i in range(items)]
+    role = RoleClassification(role_category="Hybrid", technical_percent=40, business_percent=60,
+                              technical_requirements=texts[::2], business_requirements=texts[1::2],
+                              domain_expertise=SKILLS[:3])
+    requirements = JobRequirements(must_have_skills=[RankedItem(name=SKILLS[i % 10], score=i % 10 + 1) for i in range(items)],
+                                   experience_requirements=texts[: items // 2 + 1], performance_expectations=[],
+                                   technical_business_ratio="40/60")
+    skills = SkillsMatrix(technical_skills=[RankedItem(name=f"{SKILLS[i % 10]} {i}", score=i % 10 + 1) for i in range(items)],
+                          business_capabilities=texts[1::3], project_metrics=texts[::3], leadership_metrics=texts[2::3])
+    return role, requirements, skills
+
+
+def synthetic_postings(count: int) -> list[str]:
+    """`count` job posting texts of a few hundred words, each stressing different skills."""
+    return [" ".join(f"{SKILLS[(i + j) % 10]} requirement {i * 7 + j} for team {j % 13} in region {i % 50}"
+                     for j in range(40)) for i in range(count)]
+
+
+def make_fixture_pdf(path: str, pages: int) -> str:
+    c = canvas.Canvas(path, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        for line in range(45):
+            c.drawString(50, y, f"Page {page + 1} line {line + 1}: {SKILLS[line % 10]} experience and measurable impact")
+            y -= 15
+        c.showPage()
+    c.save()
+    return path
+
+
+def build_cases(sizes: list[str]) -> list[tuple]:
+    """(name, size, callable, bytes processed per call) for every benchmarked hot path."""
+    from crew_definition import PDFReaderTool
+    from fit_scoring import score_fit
+    from prescreen import PostingIndex
+    from logging_config import (clean_text, create_agent_pdf_report, generate_pdf_report, generate_pdf_reports_batch,
+                                save_analysis_results)
+
+    cases = []
+    for size in sizes:
+        spec = SIZES[size]
+        out_dir = os.path.join(BENCH_DIR, f"out_{size}")
+        os.makedirs(out_dir, exist_ok=True)
+        tasks_output = synthetic_tasks_output(spec["lines"])
+        analysis_data, cv_data = synthetic_report_data(spec["lines"])
+        text_bytes = sum(len(output.encode("utf-8")) for output in tasks_output)
+        pdf_path = make_fixture_pdf(os.path.join(BENCH_DIR, f"resume_{size}.pdf"), spec["pages"])
+        pdf_bytes = os.path.getsize(pdf_path)
+        tool = PDFReaderTool()
+        fit_inputs = synthetic_fit_inputs(spec["lines"] // 5)
+        postings = synthetic_postings(spec["lines"] * 2)
+        postings_bytes = sum(len(posting.encode("utf-8")) for posting in postings)
+        index = PostingIndex(postings)
+
+        cases.extend([
+            ("generate_pdf_report", size,
+             lambda t=tasks_output, d=out_dir: generate_pdf_report(d, t, "bench"), text_bytes),
+            # Four runs' reports at once through the render process pool
+            ("generate_pdf_reports_batch", size,
+             lambda t=tasks_output, d=out_dir: generate_pdf_reports_batch([(d, t, f"batch{i}") for i in range(4)]),
+             4 * text_bytes),
+            ("create_agent_pdf_report", size,
+             lambda a=analysis_data, c=cv_data, d=out_dir: create_agent_pdf_report(d, a, c, "bench_agent"), text_bytes),
+            ("save_analysis_results", size,
+             lambda t=tasks_output, d=out_dir: save_analysis_results(d, t, "bench"), text_bytes),
+            ("clean_text", size,
+             lambda t=tasks_output: [clean_text(output) for output in t], text_bytes),
+            # Cold extraction bypasses the memo so PyMuPDF itself is measured
+            ("PDFReaderTool._extract", size, lambda p=pdf_path, t=tool: t._extract(p), pdf_bytes),
+            ("PDFReaderTool._run", size, lambda p=pdf_path, t=tool: t._run(p), pdf_bytes),
+            ("score_fit", size, lambda f=fit_inputs: score_fit(*f), 0),
+            # Pre-screening a resume against spec["lines"] * 2 postings: building the index, then ranking
+            ("PostingIndex", size, lambda p=postings: PostingIndex(p), postings_bytes),
+            ("PostingIndex.similarities", size, lambda i=index, t=tasks_output: i.similarities(t[2]), postings_bytes),
+        ])
+    return cases
+
+
+class MockThrottle(Exception):
+    """A 429 response of MockEndpoint, shaped like the client libraries' rate-limit errors."""
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.response = type("Response", (), {"status_code": 429, "headers": {"retry-after": str(retry_after)}})()
+
+
+class MockEndpoint:
+    """Local stand-in for a model endpoint that throttles every call above its concurrency capacity."""
+
+    def __init__(self, capacity: int, latency: float, retry_after: float):
+        import threading
+
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.throttled += 1
+                raise MockThrottle(self.retry_after)
+            self.in_flight += 1
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return "ok"
+
+
+def drive_rate_limiter():
+    """Push MOCK_CALLS calls from MOCK_CALLERS threads through a fresh RateLimiter to a MockEndpoint."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from rate_limiter import RateLimiter
+
+    endpoint = MockEndpoint(**MOCK_ENDPOINT)
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=MOCK_CALLERS)
+    with ThreadPoolExecutor(max_workers=MOCK_CALLERS) as pool:
+        list(pool.map(lambda _: limiter.call(endpoint), range(MOCK_CALLS)))
+    return endpoint.throttled
+
+
+def build_endpoint_cases() -> list[tuple]:
+    """Throughput of the LLM rate limiter against a throttling mock endpoint; ideal time is calls * latency / capacity."""
+    return [("RateLimiter.call", "mock_endpoint", drive_rate_limiter, 0)]
+
+
+def import_in_subprocess(module: str):
+    """Import `module` in a fresh interpreter, so nothing is already loaded."""
+    env = dict(os.environ, CREWAI_DISABLE_TELEMETRY="true", OTEL_SDK_DISABLED="true")
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                   env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def build_startup_cases() -> list[tuple]:
+    """Cold-start cases: interpreter launch plus importing one module, timed from outside."""
+    return [(f"import {module}", "startup", lambda m=module: import_in_subprocess(m), 0)
+            for module in STARTUP_MODULES]
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def measure(func, repeat: int, warmup: int = 1) -> dict:
+    """Latency percentiles and throughput over `repeat` calls, plus peak traced memory of one call."""
+    # Redirect the functions' progress prints so they don't drown the results (the render pool's
+    # workers print to their own stdout; main creates that pool quiet)
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        for _ in range(warmup):
+            func()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {
+        "repeat": repeat,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "ops_per_sec": repeat / sum(samples),
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Names of benchmarks whose p50 latency or peak memory grew by more than `tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "peak_memory_kb"):
+            if previous[metric] > 0 and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {previous[metric]:.2f} -> {result[metric]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic (non-LLM) parts of the pipeline")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help="Timed calls per benchmark (default: 20 for small inputs, 5 for large)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown before a benchmark counts as a regression")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        from logging_config import get_render_pool
+
+        # Create the shared render pool before any case does, with its workers' prints discarded
+        get_render_pool(quiet=True)
+        results = {}
+        print(f"{'Benchmark':<42}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'MB/s':>9}{'peak KB':>11}")
+        print("-" * 102)
+        for name, size, func, payload_bytes in build_cases(args.sizes) + build_endpoint_cases() + build_startup_cases():
+            if args.only and args.only not in name:
+                continue
+            repeat = args.repeat or {"small": 20, "large": 5, "mock_endpoint": 5}.get(size, STARTUP_REPEAT)
+            result = measure(func, repeat)
+            result["mb_per_sec"] = payload_bytes * result["ops_per_sec"] / (1024 * 1024)
+            key = f"{name}[{size}]"
+            results[key] = result
+            print(f"{key:<42}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result['ops_per_sec']:>10.1f}{result['mb_per_sec']:>9.2f}{result['peak_memory_kb']:>11.0f}")
+
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results,
+        }
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+        if args.save_baseline:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nBaseline saved to: {args.baseline}")
+            return 0
+
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+            return 0
+
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%} of baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of baseline")
+        return 0
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Root directory for all on-disk caches, shared by every run on this machine
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's contents without loading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory mapping that keeps at most `max_items` recently used entries."""
+
+    def __init__(self, max_items: int = 128):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk store with a size-bounded LRU index.
+
+    Values are written once under the SHA-256 of their bytes, so identical payloads
+    stored under different keys share one file. A SQLite index maps keys to digests
+    together with a JSON metadata dict and the last access time. When the stored
+    bytes exceed `max_bytes`, the least recently used keys are dropped and files no
+    longer referenced by any key are deleted. Safe to share between threads and
+    between processes pointing at the same directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(directory, "objects")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), timeout=30,
+                                   check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL, meta TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    def get(self, key: str):
+        """Return `(data, meta)` for `key` and mark it as recently used, or None if absent."""
+        with self._lock:
+            row = self._db.execute("SELECT digest, meta FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            digest, meta = row
+            try:
+                with open(self._object_path(digest), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # The file was evicted by another process; drop the dangling entry
+                with self._db:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            with self._db:
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return data, json.loads(meta)
+
+    def put(self, key: str, data: bytes, meta: dict = None) -> str:
+        """Store `data` under `key`, evicting old entries if the cache grows too large. Returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, digest, size, created_at, accessed_at, meta)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, digest, len(data), now, now, json.dumps(meta or {})),
+                )
+            self._evict()
+        return digest
+
+    def update_meta(self, key: str, meta: dict):
+        """Replace the metadata of an existing entry without rewriting its data."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE entries SET meta = ?, accessed_at = ? WHERE key = ?",
+                             (json.dumps(meta), time.time(), key))
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            with self._db:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._remove_if_unreferenced(row[0])
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        row = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()
+        return row[0]
+
+    def _remove_if_unreferenced(self, digest: str):
+        still_used = self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        if still_used is None:
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, digest, size FROM entries ORDER BY accessed_at").fetchall()
+        for key, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            with self._db:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            still_used = self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if still_used is None:
+                total -= size
+                try:
+                    os.remove(self._object_path(digest))
+                except FileNotFoundError:
+                    pass
+
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, max_bytes: int = 256 * 1024 * 1024) -> DiskCache:
+    """Return the process-wide DiskCache stored under `CACHE_DIR/name`, creating it on first use."""
+    with _shared_caches_lock:
+        if name not in _shared_caches:
+            _shared_caches[name] = DiskCache(os.path.join(CACHE_DIR, name), max_bytes=max_bytes)
+        return _shared_caches[name]
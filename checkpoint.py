@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from cache import file_sha256
+from scheduler import output_to_record, record_to_output
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join("Job_Application_Analysis", "checkpoints"))
+# Recorded run options that don't change any task's output, so a run may resume with other values
+RESUMABLE_OPTIONS = ("llm_cache_mode",)
+
+
+def new_run_id() -> str:
+    """A fresh run ID: the start time, plus a random suffix so runs started in the same second don't collide."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class RunCheckpoint:
+    """
+    Append-only JSONL log of one pipeline run, written as each task completes.
+
+    The first line describes the run (inputs, resume hash, options), every later line
+    holds one finished task's output. A run that dies part-way can be resumed from it:
+    completed tasks are loaded back instead of being paid for again. A torn last line
+    from a crash mid-write is ignored on load.
+    """
+
+    def __init__(self, run_id: str, directory: str = CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, jd_url: str, resume_path: str, **options):
+        """Write the header line of a new run."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self.exists():
+            raise FileExistsError(f"Checkpoint for run {self.run_id} already exists at {self.path}")
+        self._append({
+            "type": "run",
+            "run_id": self.run_id,
+            "jd_url": jd_url,
+            "resume_path": resume_path,
+            "resume_sha256": file_sha256(resume_path),
+            "options": options,
+            "created_at": time.time(),
+        })
+
+    def record(self, index: int, output):
+        """Persist the output of task `index` (0-based)."""
+        self._append({
+            "type": "task",
+            "index": index,
+            "completed_at": time.time(),
+            "output": output_to_record(output),
+        })
+
+    def load(self) -> tuple[dict, dict]:
+        """
+        Read the checkpoint back.
+
+        Returns:
+            tuple: (header dict, {task index: stored output record})
+        """
+        if not self.exists():
+            raise FileNotFoundError(f"No checkpoint for run {self.run_id} at {self.path}")
+        header, records = None, {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the line being written when the process died can be partial
+                    continue
+                if entry.get("type") == "run":
+                    header = entry
+                elif entry.get("type") == "task":
+                    records[entry["index"]] = entry["output"]
+        if header is None:
+            raise ValueError(f"Checkpoint {self.path} has no run header")
+        return header, records
+
+    def check_resumable(self, jd_url: str, resume_sha256: str, **options):
+        """
+        Raise ValueError unless this checkpoint's run has the same inputs and options.
+
+        Its stored outputs were produced from the recorded job description, resume and
+        options, so they can't stand in for a run with different ones.
+        """
+        header, _ = self.load()
+        if header["jd_url"] != jd_url:
+            raise ValueError(f"Run {self.run_id} was checkpointed for {header['jd_url']}, not {jd_url}; "
+                             f"start a new run")
+        if header["resume_sha256"] != resume_sha256:
+            raise ValueError(f"Resume changed since run {self.run_id} was checkpointed; start a new run")
+        recorded = header.get("options") or {}
+        changed = [f"{name}={recorded.get(name)!r} (now {value!r})" for name, value in options.items()
+                   if name not in RESUMABLE_OPTIONS and recorded.get(name) != value]
+        if changed:
+            raise ValueError(f"Run {self.run_id} was checkpointed with other options: {', '.join(changed)}; "
+                             f"resume it with the same options or start a new run")
+
+    def completed_outputs(self, tasks: list) -> dict:
+        """Rebuild the stored outputs as TaskOutputs of `tasks`, keyed by task index."""
+        _, records = self.load()
+        completed = {}
+        for index, record in records.items():
+            if index < len(tasks):
+                tasks[index].output = record_to_output(record, tasks[index])
+                completed[index] = tasks[index].output
+        return completed
@@ -0,0 +1,124 @@
+import json
+import os
+
+from scheduler import CONTEXT_DIVIDER
+
+# Default size limit of the upstream context injected into one task's prompt
+CONTEXT_BUDGET_CHARS = int(os.getenv("CONTEXT_BUDGET_CHARS", 6000))
+
+# Fields each task reads from the structured outputs of its upstream tasks, keyed by
+# 0-based task index, then upstream task index. Upstream outputs not listed here are
+# passed whole. Field names are those of the task schemas in schemas.py.
+CONTEXT_FIELDS = {
+    # Fit analysis
+    3: {
+        0: ["role_category", "technical_percent", "business_percent", "technical_requirements",
+            "business_requirements", "domain_expertise"],
+        1: ["must_have_skills", "experience_requirements"],
+    },
+    # CV optimization
+    4: {
+        1: ["must_have_skills", "performance_expectations"],
+    },
+    # Skills profile
+    5: {
+        3: ["overall_match", "technical_match", "business_match", "gaps"],
+        4: ["highlighted_skills", "added_keywords"],
+    },
+    # Initial report plan
+    6: {
+        0: ["role_category", "technical_percent", "business_percent"],
+        1: ["must_have_skills"],
+        2: ["technical_skills", "education"],
+        4: ["summary", "highlighted_skills", "achievements"],
+        5: ["skills", "missing_critical_skills"],
+    },
+    # Interview preparation
+    7: {
+        0: ["role_category", "technical_requirements", "business_requirements"],
+        1: ["must_have_skills", "performance_expectations"],
+        2: ["technical_skills", "project_metrics", "leadership_metrics"],
+        3: ["gaps"],
+    },
+    # Final review
+    8: {
+        0: ["role_category", "technical_percent", "business_percent"],
+        1: ["must_have_skills"],
+        2: ["technical_skills"],
+        4: ["summary"],
+        5: ["skills", "missing_critical_skills"],
+        6: ["recommendations"],
+        7: ["talking_points"],
+    },
+}
+
+
+def extract_fields(output, fields: list = None):
+    """
+    The part of an upstream output a task needs.
+
+    Returns the selected fields of the output's schema model as a dict, the whole model
+    as a dict when no fields are listed, or the raw text for unstructured outputs.
+    """
+    model = getattr(output, "pydantic", None)
+    if model is None:
+        return getattr(output, "raw", None) or str(output)
+    return model.model_dump(include=set(fields)) if fields else model.model_dump()
+
+
+def fit_to_budget(data, limit: int) -> str:
+    """
+    Serialize `data` in at most `limit` characters.
+
+    Lists in the task schemas are ordered most important first, so structured data is
+    reduced by dropping the last item of the longest list until it fits. Text, and data
+    that still doesn't fit, is cut off with a marker.
+    """
+    if isinstance(data, dict):
+        text = json.dumps(data, separators=(",", ":"))
+        while len(text) > limit:
+            lists = [value for value in data.values() if isinstance(value, list) and len(value) > 1]
+            if not lists:
+                break
+            max(lists, key=len).pop()
+            text = json.dumps(data, separators=(",", ":"))
+    else:
+        text = str(data)
+
+    if len(text) > limit:
+        marker = " ...[truncated]"
+        text = text[:max(0, limit - len(marker))] + marker
+    return text
+
+
+def budget_context(task_index: int, dep_outputs: dict, budget: int = CONTEXT_BUDGET_CHARS) -> str:
+    """
+    Build a task's context from only the upstream fields it needs, within `budget` characters.
+
+    Each upstream output is reduced to the fields listed in CONTEXT_FIELDS. The budget is
+    then shared out evenly, smallest piece first, so room a short piece doesn't use goes
+    to the longer ones.
+
+    Args:
+        task_index (int): 0-based index of the task the context is for
+        dep_outputs (dict): Outputs of the task's dependencies, keyed by task index
+        budget (int): Maximum characters of context, dividers included
+
+    Returns:
+        str: The context, in upstream task order
+    """
+    wanted = CONTEXT_FIELDS.get(task_index, {})
+    pieces = {dep: extract_fields(output, wanted.get(dep))
+              for dep, output in dep_outputs.items() if output is not None}
+    if not pieces:
+        return ""
+
+    sizes = {dep: len(json.dumps(data, separators=(",", ":")) if isinstance(data, dict) else str(data))
+             for dep, data in pieces.items()}
+    remaining = max(0, budget - len(CONTEXT_DIVIDER) * (len(pieces) - 1))
+    texts = {}
+    for n, dep in enumerate(sorted(pieces, key=lambda dep: sizes[dep])):
+        share = remaining // (len(pieces) - n)
+        texts[dep] = fit_to_budget(pieces[dep], share)
+        remaining -= len(texts[dep])
+    return CONTEXT_DIVIDER.join(texts[dep] for dep in sorted(texts))
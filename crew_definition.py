@@ -1,11 +1,163 @@
 import os
-from crewai import Agent
+from crewai import LLM, Agent
 from crewai_tools import ScrapeWebsiteTool
-from typing import Any, Optional, Type
+from typing import Any, Iterator, Optional, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-import fitz  # PyMuPDF
+import asyncio
+import io
+import json
 import pathlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from cache import LRUCache, file_sha256, get_cache
+from instrumentation import current_span, span
+from llm_client import PipelineLLM
+
+# Scraped pages are reused for this many seconds before being revalidated with the server
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", 6 * 60 * 60))
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+
+# Extracted resume text is kept in memory and on disk, keyed by file hash and extraction options
+PDF_CACHE_MAX_ITEMS = int(os.getenv("PDF_CACHE_MAX_ITEMS", 64))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+# Bump when the extraction logic changes so text cached by older code is not served
+PDF_EXTRACTION_VERSION = 2
+# Upper bounds on how much of an uploaded PDF is read, so oversized files can't balloon memory
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 100))
+PDF_MAX_TEXT_BYTES = int(os.getenv("PDF_MAX_TEXT_BYTES", 1024 * 1024))
+
+# Model of each tier; any model string crewai understands, e.g. "ollama/llama3.1" for a local model
+MODEL_TIERS = {
+    "fast": os.getenv("FAST_MODEL", "gpt-4o-mini"),
+    "strong": os.getenv("STRONG_MODEL") or os.getenv("OPENAI_MODEL_NAME") or "gpt-4",
+    "local": os.getenv("LOCAL_MODEL", "ollama/llama3.1"),
+}
+LOCAL_MODEL_BASE_URL = os.getenv("LOCAL_MODEL_BASE_URL", "http://localhost:11434")
+# Tier a fast or local model's answer is retried on when it doesn't match the task's output schema
+ESCALATION_TIER = "strong"
+
+# Kind of work each agent does. Classification, extraction and formatting are mechanical;
+# the fit analysis, CV rewrite and interview preparation need the strongest reasoning.
+AGENT_TASK_CLASSES = {
+    "job_type_analyzer": "classification",
+    "jd_scraper": "extraction",
+    "resume_analyser": "extraction",
+    "fit_analyzer": "reasoning",
+    "cv_updater": "writing",
+    "cv_content_optimizer": "extraction",
+    "pdf_generator": "formatting",
+    "interview_prep_agent": "writing",
+    "pdf_report_generator": "formatting",
+}
+# Tier each task class runs on. Override per class with MODEL_ROUTING, e.g.
+# "extraction=local,formatting=local", or set MODEL_ROUTING=strong to run everything on one tier.
+ROUTING_POLICY = {
+    "classification": "fast",
+    "extraction": "fast",
+    "formatting": "fast",
+    "reasoning": "strong",
+    "writing": "strong",
+}
+
+_pdf_text_cache = LRUCache(max_items=PDF_CACHE_MAX_ITEMS)
+_pdf_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PDF_WORKERS", 2)), thread_name_prefix="pdf")
+_fitz_lock = threading.RLock()
+# URL -> [lock, number of fetches holding or waiting for it]; entries go once nobody uses them
+_url_locks = {}
+_url_locks_lock = threading.Lock()
+# Reentrant: building the default agents creates the shared tools under the same lock
+_shared_lock = threading.RLock()
+_shared = {}
+
+def _mark_cache_status(status: str):
+    active_span = current_span()
+    if active_span is not None:
+        active_span.attributes["cache"] = status
+
+@contextmanager
+def _url_lock(url: str):
+    """Hold the lock of `url`, so concurrent fetches of one URL wait for a single request."""
+    with _url_locks_lock:
+        entry = _url_locks.setdefault(url, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _url_locks_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _url_locks[url]
+
+def fetch_url(url: str, headers: Optional[dict] = None, cookies: Optional[dict] = None,
+              ttl: float = SCRAPE_CACHE_TTL) -> str:
+    """
+    Fetch a page through the shared HTTP cache and return its decoded body.
+
+    A cached copy younger than `ttl` seconds is returned without touching the network.
+    Older copies are revalidated with If-None-Match / If-Modified-Since, so an unchanged
+    page costs a single 304 round trip. If the server can't be reached or answers with an
+    error, a stale copy is served rather than failing. Concurrent fetches of the same URL
+    wait for one request.
+
+    Requests go through crewai_tools' SSRF-safe `safe_get`: URLs resolving to private or
+    reserved addresses are refused (ValueError), connections are pinned to the checked IP,
+    every redirect is validated, and proxies and cross-origin credentials are dropped.
+    """
+    import requests
+    from crewai_tools.security.safe_requests import safe_get
+
+    cache = get_cache("http", max_bytes=SCRAPE_CACHE_MAX_BYTES)
+    key = f"url:{url}"
+
+    with _url_lock(url):
+        cached = cache.get(key)
+        request_headers = dict(headers or {})
+        if cached:
+            body, meta = cached
+            if time.time() - meta["fetched_at"] < ttl:
+                _mark_cache_status("fresh")
+                return body.decode(meta["encoding"], errors="replace")
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = safe_get(url, timeout=15, headers=request_headers, cookies=cookies or {})
+        except requests.RequestException as e:
+            if not cached:
+                raise
+            print(f"Could not revalidate {url} ({str(e)}), using cached copy")
+            _mark_cache_status("stale")
+            return body.decode(meta["encoding"], errors="replace")
+
+        if response.status_code == 304 and cached:
+            meta["fetched_at"] = time.time()
+            cache.update_meta(key, meta)
+            _mark_cache_status("revalidated")
+            return body.decode(meta["encoding"], errors="replace")
+
+        if response.status_code != 200 and cached:
+            print(f"Could not revalidate {url} (HTTP {response.status_code}), using cached copy")
+            _mark_cache_status("stale")
+            return body.decode(meta["encoding"], errors="replace")
+
+        _mark_cache_status("miss")
+        encoding = response.apparent_encoding or "utf-8"
+        if response.status_code == 200:
+            cache.put(key, response.content, {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "encoding": encoding,
+            })
+        return response.content.decode(encoding, errors="replace")
 
 # Define schema for PDF reader
 class PDFReaderSchema(BaseModel):
@@ -18,150 +170,315 @@ class PDFReaderTool(BaseTool):
     args_schema: Type[BaseModel] = PDFReaderSchema
     return_direct: bool = True
 
-    def _run(self, pdf_path: str) -> str:
+    max_pages: Optional[int] = PDF_MAX_PAGES
+    max_text_bytes: Optional[int] = PDF_MAX_TEXT_BYTES
+
+    def extraction_options(self) -> dict:
+        """Options that change the extracted text and therefore belong in the cache key."""
+        return {
+            "mode": "text",
+            "version": PDF_EXTRACTION_VERSION,
+            "max_pages": self.max_pages,
+            "max_text_bytes": self.max_text_bytes,
+        }
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Yield the text of each page in turn, stopping at `max_pages` pages or once
+        `max_text_bytes` of UTF-8 text has been produced.
+
+        Only the current page is held in memory, so large documents can be consumed
+        incrementally. When a limit cuts the document short, a final marker line says so.
+        """
+        import fitz  # PyMuPDF, imported on first use to keep module import fast
+
+        remaining = self.max_text_bytes
+        with _fitz_lock:
+            doc = fitz.open(str(pdf_path))
         try:
-            pdf_path = pathlib.Path(pdf_path)
-            if not pdf_path.exists():
-                return f"Error: File not found at {pdf_path}"
-            
-            with fitz.open(str(pdf_path)) as doc:
-                text = []
-                for page in doc:
-                    text.append(page.get_text("text"))
-                return "\n".join(text) if text else "No text found in the PDF."
-        except Exception as e:
-            return f"Error reading PDF: {str(e)}"
+            for number in range(doc.page_count):
+                if self.max_pages is not None and number >= self.max_pages:
+                    yield f"[Truncated: only the first {self.max_pages} of {doc.page_count} pages were read]"
+                    return
+                # PyMuPDF is not thread-safe, so page access is serialized across threads
+                with _fitz_lock:
+                    text = doc[number].get_text("text")
+                if remaining is not None:
+                    encoded = text.encode("utf-8")
+                    if len(encoded) > remaining:
+                        yield encoded[:remaining].decode("utf-8", errors="ignore")
+                        yield f"[Truncated: text limit of {self.max_text_bytes} bytes reached on page {number + 1}]"
+                        return
+                    remaining -= len(encoded)
+                yield text
+        finally:
+            with _fitz_lock:
+                doc.close()
+
+    def _run(self, pdf_path: str) -> str:
+        with span("PDFReaderTool", "tool", pdf_path=str(pdf_path)) as tool_span:
+            try:
+                pdf_path = pathlib.Path(pdf_path)
+                if not pdf_path.exists():
+                    return f"Error: File not found at {pdf_path}"
+                
+                # Same content and options always extract to the same text, wherever the file lives
+                options = json.dumps(self.extraction_options(), sort_keys=True)
+                key = f"pdf:{file_sha256(str(pdf_path))}:{options}"
+                text = _pdf_text_cache.get(key)
+                if text is not None:
+                    tool_span.attributes["cache"] = "memory"
+                    return text
+                
+                disk_cache = get_cache("pdf_text", max_bytes=PDF_CACHE_MAX_BYTES)
+                cached = disk_cache.get(key)
+                if cached:
+                    tool_span.attributes["cache"] = "disk"
+                    text = cached[0].decode("utf-8")
+                else:
+                    tool_span.attributes["cache"] = "miss"
+                    text = self._extract(pdf_path)
+                    disk_cache.put(key, text.encode("utf-8"), {"source": str(pdf_path)})
+                _pdf_text_cache.put(key, text)
+                return text
+            except Exception as e:
+                tool_span.status = "error"
+                return f"Error reading PDF: {str(e)}"
+
+    def _extract(self, pdf_path: pathlib.Path) -> str:
+        buffer = io.StringIO()
+        for number, text in enumerate(self.iter_pages(str(pdf_path))):
+            if number:
+                buffer.write("\n")
+            buffer.write(text)
+        text = buffer.getvalue()
+        return text if text else "No text found in the PDF."
 
     async def _arun(self, pdf_path: str) -> str:
-        return self._run(pdf_path)
-
-# Initialize tools
-pdf_reader_tool = PDFReaderTool()
-scraper_tool = ScrapeWebsiteTool()
-
-# Define Agents
-jd_scraper = Agent(
-    role="Job Description Analyzer",
-    goal="Extract critical job requirements and create a structured analysis of technical, managerial, and soft skills needed",
-    backstory=(
-        "Expert in job requirement analysis with deep understanding of both technical and business roles. "
-        "Skilled at identifying core competencies, must-have qualifications, and distinguishing between "
-        "essential and preferred requirements. Experienced in ATS systems and keyword optimization."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[scraper_tool]
-)
-
-resume_analyser = Agent(
-    role="Resume Analysis Expert",
-    goal="Create a comprehensive skills matrix mapping candidate's experience to job requirements",
-    backstory=(
-        "Senior talent assessment specialist with expertise in skills gap analysis. "
-        "Proficient in identifying transferable skills and quantifying achievements. "
-        "Experienced in evaluating both technical capabilities and leadership potential."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[pdf_reader_tool]
-)
-
-job_type_analyzer = Agent(
-    role="Role Classification Specialist",
-    goal="Determine role category and provide detailed breakdown of role components (IT/Product/Hybrid)",
-    backstory=(
-        "Industry classification expert with extensive knowledge of modern job roles. "
-        "Specialized in analyzing cross-functional positions and identifying primary vs secondary role aspects. "
-        "Expert in modern tech industry role structures and organizational patterns."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[scraper_tool]
-)
-
-fit_analyzer = Agent(
-    role="Candidate-Role Match Specialist",
-    goal="Provide data-driven fit analysis with specific alignment scores for key job requirements",
-    backstory=(
-        "Expert in predictive hiring analytics with focus on role-candidate alignment. "
-        "Skilled at quantifying candidate potential and identifying growth opportunities. "
-        "Specializes in evidence-based hiring recommendations and gap analysis."
-    ),
-    verbose=True,
-    allow_delegation=False
-)
-
-cv_updater = Agent(
-    role="Strategic CV Optimization Expert",
-    goal="Transform CV content to maximize alignment with target role while maintaining authenticity",
-    backstory=(
-        "Senior CV optimization specialist with expertise in ATS optimization and personal branding. "
-        "Skilled at restructuring experiences to highlight relevant achievements and capabilities. "
-        "Expert in modern CV best practices and industry-specific formatting."
-    ),
-    verbose=True,
-    allow_delegation=False
-)
-
-cv_content_optimizer = Agent(
-    role="Skills Alignment Specialist",
-    goal="Create targeted skills profile matching job requirements with quantifiable achievements",
-    backstory=(
-        "Expert in skills-based resume optimization and ATS keyword matching. "
-        "Specialized in translating experience into relevant competencies and achievements. "
-        "Proficient in industry-specific terminology and competency frameworks."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[scraper_tool, pdf_reader_tool]
-)
-
-pdf_generator = Agent(
-    role="Document Generation Specialist",
-    goal="Create ATS-optimized, professionally formatted PDF documents with clear information hierarchy",
-    backstory=(
-        "Expert in professional document design and ATS-compatible formatting. "
-        "Specialized in creating clear, scannable documents that highlight key information. "
-        "Proficient in modern resume design principles and accessibility standards."
-    ),
-    verbose=True,
-    allow_delegation=False
-)
-
-interview_prep_agent = Agent(
-    role="Interview Preparation Specialist",
-    goal="Create comprehensive interview preparation guide with targeted questions and suggested answers",
-    backstory=(
-        "Expert interview coach with deep experience in technical and business role preparation. "
-        "Specialized in predicting interview questions based on job requirements and creating "
-        "strategic response frameworks. Skilled at identifying key discussion points and potential challenges."
-    ),
-    verbose=True,
-    allow_delegation=False
-)
-
-pdf_report_generator = Agent(
-    role="PDF Report Generator",
-    goal="Create professional PDF reports for analysis results and updated CV",
-    backstory=(
-        "Expert document formatter specializing in professional report generation. "
-        "Skilled at organizing complex analysis data into clear, readable PDF documents. "
-        "Experienced in creating ATS-friendly CV layouts and comprehensive analysis reports. "
-        "Proficient in data visualization and professional document design."
-    ),
-    verbose=True,
-    allow_delegation=False
-)
-
-# List of all agents for easy import
-agents = [
-    job_type_analyzer,
-    jd_scraper,
-    resume_analyser,
-    fit_analyzer,
-    cv_updater,
-    cv_content_optimizer,
-    pdf_generator,
-    interview_prep_agent,
-    pdf_report_generator
-]
\ No newline at end of file
+        # Extraction runs on a dedicated pool so the event loop keeps serving other pipelines
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pdf_executor, self._run, pdf_path)
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that reads pages through the shared on-disk HTTP cache."""
+    cache_ttl: float = SCRAPE_CACHE_TTL
+
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url)
+        if website_url is None:
+            raise ValueError("Website URL must be provided.")
+
+        with span("ScrapeWebsiteTool", "tool", url=website_url):
+            html = fetch_url(website_url, headers=self.headers, cookies=getattr(self, "cookies", None),
+                             ttl=self.cache_ttl)
+        from bs4 import BeautifulSoup
+
+        parsed = BeautifulSoup(html, "html.parser")
+
+        # Same text clean-up as ScrapeWebsiteTool so agents see identical content
+        text = "The following text is scraped website content:\n\n"
+        text += parsed.get_text(" ")
+        text = re.sub("[ \t]+", " ", text)
+        return re.sub("\\s+\n\\s+", "\n", text)
+
+def _shared_instance(name: str, factory):
+    """Create the process-wide object `name` on first use and return the same one afterwards."""
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = factory()
+        return _shared[name]
+
+def get_pdf_reader_tool() -> PDFReaderTool:
+    return _shared_instance("pdf_reader_tool", PDFReaderTool)
+
+def get_scraper_tool() -> CachedScrapeWebsiteTool:
+    return _shared_instance("scraper_tool", CachedScrapeWebsiteTool)
+
+def routing_policy() -> dict:
+    """ROUTING_POLICY with the overrides of the MODEL_ROUTING environment variable applied."""
+    policy = dict(ROUTING_POLICY)
+    routing = os.getenv("MODEL_ROUTING", "").strip()
+    if routing in MODEL_TIERS:
+        return dict.fromkeys(policy, routing)
+    for rule in filter(None, (part.strip() for part in routing.split(","))):
+        task_class, _, tier = rule.partition("=")
+        if task_class.strip() not in policy or tier.strip() not in MODEL_TIERS:
+            raise ValueError(f"Invalid MODEL_ROUTING rule: {rule!r}")
+        policy[task_class.strip()] = tier.strip()
+    return policy
+
+def tier_llm(tier: str) -> LLM:
+    """A new LLM client for the model of `tier`."""
+    if tier == "local":
+        return LLM(model=MODEL_TIERS[tier], base_url=LOCAL_MODEL_BASE_URL)
+    return LLM(model=MODEL_TIERS[tier])
+
+def agent_llm(agent_name: str, policy: dict = None) -> PipelineLLM:
+    """
+    The LLM of one agent, routed by its task class.
+
+    Agents below the escalation tier get the escalation model as fallback, which answers
+    again whenever their own final answer fails validation.
+    """
+    tier = (policy or routing_policy())[AGENT_TASK_CLASSES[agent_name]]
+    inner = tier_llm(tier)
+    fallback = tier_llm(ESCALATION_TIER) if MODEL_TIERS[tier] != MODEL_TIERS[ESCALATION_TIER] else None
+    return PipelineLLM(model=inner.model, inner=inner, fallback=fallback)
+
+def build_agents() -> list:
+    """
+    Build a fresh set of the nine analysis agents.
+
+    The tools are shared instances, so every agent set reuses the same PDF reader and
+    scraper. Each concurrent pipeline should use its own agent set because an Agent
+    keeps per-execution state while it works on a task. Each agent's model is chosen by
+    the routing policy from its task class (see AGENT_TASK_CLASSES).
+    """
+    pdf_reader_tool = get_pdf_reader_tool()
+    scraper_tool = get_scraper_tool()
+    policy = routing_policy()
+
+    jd_scraper = Agent(
+        role="Job Description Analyzer",
+        goal="Extract critical job requirements and create a structured analysis of technical, managerial, and soft skills needed",
+        backstory=(
+            "Expert in job requirement analysis with deep understanding of both technical and business roles. "
+            "Skilled at identifying core competencies, must-have qualifications, and distinguishing between "
+            "essential and preferred requirements. Experienced in ATS systems and keyword optimization."
+        ),
+        llm=agent_llm("jd_scraper", policy),
+        verbose=True,
+        allow_delegation=False,
+        tools=[scraper_tool]
+    )
+
+    resume_analyser = Agent(
+        role="Resume Analysis Expert",
+        goal="Create a comprehensive skills matrix mapping candidate's experience to job requirements",
+        backstory=(
+            "Senior talent assessment specialist with expertise in skills gap analysis. "
+            "Proficient in identifying transferable skills and quantifying achievements. "
+            "Experienced in evaluating both technical capabilities and leadership potential."
+        ),
+        llm=agent_llm("resume_analyser", policy),
+        verbose=True,
+        allow_delegation=False,
+        tools=[pdf_reader_tool]
+    )
+
+    job_type_analyzer = Agent(
+        role="Role Classification Specialist",
+        goal="Determine role category and provide detailed breakdown of role components (IT/Product/Hybrid)",
+        backstory=(
+            "Industry classification expert with extensive knowledge of modern job roles. "
+            "Specialized in analyzing cross-functional positions and identifying primary vs secondary role aspects. "
+            "Expert in modern tech industry role structures and organizational patterns."
+        ),
+        llm=agent_llm("job_type_analyzer", policy),
+        verbose=True,
+        allow_delegation=False,
+        tools=[scraper_tool]
+    )
+
+    fit_analyzer = Agent(
+        role="Candidate-Role Match Specialist",
+        goal="Provide data-driven fit analysis with specific alignment scores for key job requirements",
+        backstory=(
+            "Expert in predictive hiring analytics with focus on role-candidate alignment. "
+            "Skilled at quantifying candidate potential and identifying growth opportunities. "
+            "Specializes in evidence-based hiring recommendations and gap analysis."
+        ),
+        llm=agent_llm("fit_analyzer", policy),
+        verbose=True,
+        allow_delegation=False
+    )
+
+    cv_updater = Agent(
+        role="Strategic CV Optimization Expert",
+        goal="Transform CV content to maximize alignment with target role while maintaining authenticity",
+        backstory=(
+            "Senior CV optimization specialist with expertise in ATS optimization and personal branding. "
+            "Skilled at restructuring experiences to highlight relevant achievements and capabilities. "
+            "Expert in modern CV best practices and industry-specific formatting."
+        ),
+        llm=agent_llm("cv_updater", policy),
+        verbose=True,
+        allow_delegation=False
+    )
+
+    cv_content_optimizer = Agent(
+        role="Skills Alignment Specialist",
+        goal="Create targeted skills profile matching job requirements with quantifiable achievements",
+        backstory=(
+            "Expert in skills-based resume optimization and ATS keyword matching. "
+            "Specialized in translating experience into relevant competencies and achievements. "
+            "Proficient in industry-specific terminology and competency frameworks."
+        ),
+        llm=agent_llm("cv_content_optimizer", policy),
+        verbose=True,
+        allow_delegation=False,
+        tools=[scraper_tool, pdf_reader_tool]
+    )
+
+    pdf_generator = Agent(
+        role="Document Generation Specialist",
+        goal="Create ATS-optimized, professionally formatted PDF documents with clear information hierarchy",
+        backstory=(
+            "Expert in professional document design and ATS-compatible formatting. "
+            "Specialized in creating clear, scannable documents that highlight key information. "
+            "Proficient in modern resume design principles and accessibility standards."
+        ),
+        llm=agent_llm("pdf_generator", policy),
+        verbose=True,
+        allow_delegation=False
+    )
+
+    interview_prep_agent = Agent(
+        role="Interview Preparation Specialist",
+        goal="Create comprehensive interview preparation guide with targeted questions and suggested answers",
+        backstory=(
+            "Expert interview coach with deep experience in technical and business role preparation. "
+            "Specialized in predicting interview questions based on job requirements and creating "
+            "strategic response frameworks. Skilled at identifying key discussion points and potential challenges."
+        ),
+        llm=agent_llm("interview_prep_agent", policy),
+        verbose=True,
+        allow_delegation=False
+    )
+
+    pdf_report_generator = Agent(
+        role="PDF Report Generator",
+        goal="Create professional PDF reports for analysis results and updated CV",
+        backstory=(
+            "Expert document formatter specializing in professional report generation. "
+            "Skilled at organizing complex analysis data into clear, readable PDF documents. "
+            "Experienced in creating ATS-friendly CV layouts and comprehensive analysis reports. "
+            "Proficient in data visualization and professional document design."
+        ),
+        llm=agent_llm("pdf_report_generator", policy),
+        verbose=True,
+        allow_delegation=False
+    )
+
+    return [
+        job_type_analyzer,
+        jd_scraper,
+        resume_analyser,
+        fit_analyzer,
+        cv_updater,
+        cv_content_optimizer,
+        pdf_generator,
+        interview_prep_agent,
+        pdf_report_generator
+    ]
+
+def __getattr__(name: str):
+    # The default agents and tools are built on first access rather than at import (PEP 562),
+    # so importing this module for the tool classes or fetch_url stays cheap
+    if name == "agents":
+        return _shared_instance("agents", build_agents)
+    if name == "pdf_reader_tool":
+        return get_pdf_reader_tool()
+    if name == "scraper_tool":
+        return get_scraper_tool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
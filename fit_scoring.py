@@ -0,0 +1,282 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from instrumentation import current_span
+from schemas import FitAnalysis, JobRequirements, RoleClassification, SkillsMatrix, as_model
+
+# Index of the fit analysis task (Task 4), whose context is Tasks 1-3
+FIT_TASK = 3
+# "llm" lets the fit analyzer estimate the scores, "local" computes them here without an LLM
+# call, "explain" computes them here and has the fit analyzer only name the gaps
+FIT_SCORING_MODES = ("llm", "local", "explain")
+FIT_SCORING_MODE = os.getenv("FIT_SCORING_MODE", "llm")
+
+# Spellings of the same skill mapped onto one term before matching
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node.js": "nodejs",
+    "node": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "golang": "go",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "aws": "amazon web services",
+    "gcp": "google cloud",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "ci/cd": "continuous integration delivery",
+    "ux": "user experience",
+    "ui": "user interface",
+    "pm": "product management",
+    "kpi": "key performance indicators",
+    "kpis": "key performance indicators",
+    "okr": "objectives key results",
+    "okrs": "objectives key results",
+    "b2b": "business to business",
+    "saas": "software as a service",
+}
+STOP_WORDS = frozenset(
+    "a an and or of the to in on for with by as at from into is are be been being this that these those "
+    "their its our your using use used strong proven solid good excellent ability able experience experienced "
+    "knowledge skills skill understanding working work plus including etc e.g i.e".split()
+)
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+# Aliases that are one word are resolved word by word; the rest (e.g. ci/cd) are rewritten in the text first
+_WORD_ALIASES = {alias: term.split() for alias, term in SKILL_ALIASES.items() if _WORD.fullmatch(alias)}
+_PATTERN_ALIASES = [(re.compile(rf"(?<![a-z0-9]){re.escape(alias)}(?![a-z0-9])"), term)
+                    for alias, term in SKILL_ALIASES.items() if alias not in _WORD_ALIASES]
+_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:(?:-|to)\s*\d+\s*)?(?:years?|yrs?)\b", re.I)
+
+# Similarity up to which a requirement counts as unmet, and from which as fully met
+MATCH_FLOOR = 0.05
+MATCH_FULL = 0.4
+# How strongly a resume item that isn't a scored technical skill evidences a requirement
+EVIDENCE_STRENGTH = 0.8
+# Share of the overall score given to experience; the rest follows the role's technical/business split
+EXPERIENCE_WEIGHT = 0.25
+# Requirements met less than this are reported as gaps, most important first
+GAP_THRESHOLD = 0.5
+MAX_GAPS = 5
+
+
+def words(text: str) -> list[str]:
+    """The lowercased words of `text` with aliases resolved and stop words dropped."""
+    text = text.lower()
+    for pattern, term in _PATTERN_ALIASES:
+        text = pattern.sub(term, text)
+    found = _WORD.findall(text)
+    if not _WORD_ALIASES.keys().isdisjoint(found):
+        found = [token for word in found for token in _WORD_ALIASES.get(word, (word,))]
+    return [word for word in found if word not in STOP_WORDS]
+
+
+def terms(text: str) -> list[str]:
+    """`words` of `text` plus their character trigrams, so different forms of a word still overlap."""
+    tokens = words(text)
+    trigrams = [f"#{padded[k:k + 3]}" for padded in (f"<{word}>" for word in tokens) for k in range(len(padded) - 2)]
+    return tokens + trigrams
+
+
+def tfidf_matrix(documents: list[list[str]]) -> np.ndarray:
+    """L2-normalized TF-IDF rows (sublinear term frequency, smoothed IDF) of the tokenized `documents`."""
+    vocabulary = {}
+    rows, columns = [], []
+    for row, document in enumerate(documents):
+        for term in document:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+    counts = np.zeros((len(documents), len(vocabulary)))
+    np.add.at(counts, (rows, columns), 1)
+    idf = np.log((1 + len(documents)) / (1 + np.count_nonzero(counts, axis=0))) + 1
+    weights = np.log1p(counts) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.where(norms == 0, 1, norms)
+
+
+def coverage(requirements: list[str], evidence: list[str], strength: np.ndarray) -> np.ndarray:
+    """
+    How well each requirement is met by the best-matching evidence item, from 0 to 1.
+
+    Args:
+        requirements (list): Requirement texts
+        evidence (list): Resume items that can meet them
+        strength (np.ndarray): Per evidence item, the most it can meet a requirement by
+    """
+    if not requirements or not evidence:
+        return np.zeros(len(requirements))
+    vectors = tfidf_matrix([terms(text) for text in requirements + evidence])
+    similarity = vectors[:len(requirements)] @ vectors[len(requirements):].T
+    met = np.clip((similarity - MATCH_FLOOR) / (MATCH_FULL - MATCH_FLOOR), 0, 1)
+    return (met * strength).max(axis=1)
+
+
+def rank_weights(count: int) -> np.ndarray:
+    """Importance of the items of a list ordered most important first."""
+    return 10 * 0.85 ** np.arange(count)
+
+
+def years_mentioned(texts: list[str]):
+    """The largest number of years stated in `texts` (the lower bound of a range), or None."""
+    years = [float(match.group(1)) for text in texts for match in _YEARS.finditer(text)]
+    return max(years) if years else None
+
+
+def _percent(met: np.ndarray, weights: np.ndarray):
+    return float(met @ weights / weights.sum()) if len(weights) else None
+
+
+def score_fit(role: RoleClassification, requirements: JobRequirements, skills: SkillsMatrix):
+    """
+    Compute the fit scores from the outputs of Tasks 1-3, without an LLM.
+
+    Each requirement is matched against the resume items by TF-IDF cosine similarity
+    over words and character trigrams; the match is scaled by how strongly the item
+    evidences it (a technical skill's proficiency). Must-have skills and the role's
+    technical requirements make up the technical match, its business requirements and
+    domain expertise the business match, and the experience requirements (with any
+    stated years) the experience match. The overall score weighs these by the role's
+    technical/business split. Identical inputs always give identical scores.
+
+    Returns:
+        FitAnalysis: The scores and the least-met requirements as gaps, or None when any
+        of the three matches has nothing to be measured against (e.g. a job analysis is
+        missing), so no score is reported that wasn't computed
+    """
+    if skills is None or role is None or requirements is None:
+        return None
+
+    evidence = [item.name for item in skills.technical_skills]
+    strength = [0.5 + 0.05 * item.score for item in skills.technical_skills]
+    for texts in (skills.business_capabilities, skills.project_metrics, skills.leadership_metrics, skills.education):
+        evidence.extend(texts)
+        strength.extend([EVIDENCE_STRENGTH] * len(texts))
+    strength = np.array(strength)
+
+    technical = [item.name for item in requirements.must_have_skills] + role.technical_requirements
+    technical_weights = ([float(item.score) for item in requirements.must_have_skills]
+                         + list(rank_weights(len(role.technical_requirements))))
+    business, business_weights = [], []
+    for texts in (role.business_requirements, role.domain_expertise):
+        business += texts
+        business_weights += list(rank_weights(len(texts)))
+    experience = requirements.experience_requirements
+    experience_weights = rank_weights(len(experience))
+
+    technical_met = coverage(technical, evidence, strength)
+    business_met = coverage(business, evidence, strength)
+    experience_met = coverage(experience, evidence, strength)
+    technical_match = _percent(technical_met, np.array(technical_weights))
+    business_match = _percent(business_met, np.array(business_weights))
+    experience_match = _percent(experience_met, experience_weights)
+    required_years = years_mentioned(experience)
+    held_years = years_mentioned(skills.project_metrics + skills.leadership_metrics + skills.business_capabilities)
+    if required_years and held_years is not None:
+        years_match = min(1.0, held_years / required_years)
+        experience_match = years_match if experience_match is None else (experience_match + years_match) / 2
+
+    if technical_match is None or business_match is None or experience_match is None:
+        return None
+
+    technical_share, business_share = role.technical_percent or 1, role.business_percent or 1
+    parts = [
+        (technical_match, (1 - EXPERIENCE_WEIGHT) * technical_share),
+        (business_match, (1 - EXPERIENCE_WEIGHT) * business_share),
+        (experience_match, EXPERIENCE_WEIGHT * (technical_share + business_share)),
+    ]
+    overall = sum(score * weight for score, weight in parts) / sum(weight for _, weight in parts)
+
+    candidates = sorted(
+        zip(technical_weights + business_weights + list(experience_weights),
+            technical + business + experience,
+            np.concatenate([technical_met, business_met, experience_met])),
+        key=lambda item: -item[0],
+    )
+    gaps = []
+    for _, text, met in candidates:
+        if met < GAP_THRESHOLD and text.lower() not in (gap.lower() for gap in gaps):
+            gaps.append(text)
+
+    def percent(score):
+        return round(100 * score)
+
+    return FitAnalysis(overall_match=percent(overall), technical_match=percent(technical_match),
+                       business_match=percent(business_match), experience_match=percent(experience_match),
+                       gaps=gaps[:MAX_GAPS])
+
+
+class FitScorer:
+    """
+    Runner (for `run_task_graph`) that produces Task 4's output from locally computed scores.
+
+    In "local" mode the scores are the whole output and no LLM is called. In "explain"
+    mode the fit analyzer still runs, with the scores handed to it as fixed facts, and
+    only its gaps are kept; the scores in the output are always the computed ones. When
+    the upstream outputs didn't parse or leave a score unmeasurable, the task runs on the
+    LLM as usual.
+    """
+
+    def __init__(self, task, mode: str):
+        if mode not in ("local", "explain"):
+            raise ValueError(f"Unknown fit scoring mode: {mode}")
+        self.task = task
+        self.mode = mode
+        # Separates this task's stage cache entries from those of LLM-scored runs
+        self.variant = f"fit_scoring:{mode}"
+
+    def scores(self):
+        role, requirements, skills = (as_model(dep.output, schema) if dep.output is not None else None
+                                      for dep, schema in zip(self.task.context,
+                                                             (RoleClassification, JobRequirements, SkillsMatrix)))
+        return score_fit(role, requirements, skills)
+
+    def _output(self, fit: FitAnalysis):
+        from crewai.tasks.task_output import TaskOutput
+
+        self.task.output = TaskOutput(description=self.task.description, expected_output=self.task.expected_output,
+                                      agent=self.task.agent.role, raw=fit.model_dump_json(), pydantic=fit)
+        return self.task.output
+
+    def __call__(self, context: str):
+        fit = self.scores()
+        if fit is None:
+            print("Fit scoring: upstream analyses are missing, incomplete or didn't parse; "
+                  "the fit analyzer scores instead")
+            return self.task.execute_sync(agent=self.task.agent, context=context)
+        current_span().attributes["fit_scoring"] = self.mode
+        if self.mode == "local":
+            return self._output(fit)
+
+        scores = fit.model_dump(exclude={"gaps"})
+        context = (f"{context}\n\nThe fit scores were computed from these analyses and are final: "
+                   f"{json.dumps(scores)}. Return them unchanged and explain them by listing the most "
+                   f"important gaps between the candidate and the requirements.")
+        explained = as_model(self.task.execute_sync(agent=self.task.agent, context=context), FitAnalysis)
+        if explained is not None:
+            fit = explained.model_copy(update=scores)
+        return self._output(fit)
+
+
+def fit_runners(tasks: list, mode: str = None) -> dict:
+    """
+    Runners (for `run_task_graph`) that compute Task 4's fit scores locally.
+
+    Args:
+        tasks (list): The pipeline's tasks, as created by `main.create_tasks`
+        mode (str): One of FIT_SCORING_MODES; defaults to the FIT_SCORING_MODE environment variable
+
+    Returns:
+        dict: Empty in "llm" mode, otherwise {FIT_TASK: FitScorer}
+    """
+    mode = mode or FIT_SCORING_MODE
+    if mode not in FIT_SCORING_MODES:
+        raise ValueError(f"Unknown fit scoring mode: {mode}")
+    if mode == "llm":
+        return {}
+    return {FIT_TASK: FitScorer(tasks[FIT_TASK], mode)}
@@ -0,0 +1,145 @@
+import re
+import threading
+
+from pydantic import create_model
+
+from instrumentation import current_span
+from schemas import as_model
+
+# Adjacent tasks (0-based) answered by a single LLM call, leader first, with the key each
+# part's answer gets in the combined output. Tasks 1 and 2 both analyze the job posting;
+# Tasks 5 and 6 both rewrite CV content from the same fit analysis.
+FUSION_GROUPS = [
+    ((0, 1), ("role_classification", "job_requirements")),
+    ((4, 5), ("cv_optimization", "skills_profile")),
+]
+
+# A pre-fetched document as appended to task descriptions by main.source_block
+_SOURCE_BLOCK = re.compile(r"\n\nThe .+? is included below;.*?--- END [A-Z ]+ ---", re.S)
+
+
+class FusedStep:
+    """
+    One LLM call standing in for a group of adjacent tasks.
+
+    The leader task is executed with a combined prompt and a combined output schema, and
+    the answer is split back into one output per member task, shaped exactly like the
+    members' own outputs. Members can only be fused when each depends on the one before
+    it and needs no upstream output the leader doesn't already receive, so the leader's
+    context covers the whole group.
+    """
+
+    def __init__(self, tasks: list, graph: dict, indices: tuple, keys: tuple):
+        from crewai import Task
+
+        self.indices = indices
+        self.keys = keys
+        # 1-based task numbers of the group, e.g. "1+2"
+        self.label = "+".join(str(i + 1) for i in indices)
+        self.members = [tasks[i] for i in indices]
+        leader = indices[0]
+        for previous, follower in zip(indices, indices[1:]):
+            if previous not in graph[follower] or not set(graph[follower]) <= set(graph[leader]) | set(indices):
+                raise ValueError(f"Task {follower + 1} can't be fused into Task {leader + 1}")
+
+        self.schema = create_model(
+            "Fused" + "".join(task.output_pydantic.__name__ for task in self.members),
+            **{key: (task.output_pydantic, ...) for key, task in zip(keys, self.members)},
+        )
+        tools = []
+        for task in self.members:
+            for tool in task.tools or task.agent.tools or []:
+                if all(tool is not existing for existing in tools):
+                    tools.append(tool)
+        self.task = Task(
+            description=self.combined_description(),
+            expected_output="One JSON object with the keys " + ", ".join(f'"{key}"' for key in keys)
+                            + ", holding " + "; ".join(f"{key}: {task.expected_output}"
+                                                        for key, task in zip(keys, self.members)),
+            output_pydantic=self.schema,
+            agent=self.members[0].agent,
+            tools=tools,
+        )
+        self._outputs = {}
+        self._lock = threading.Lock()
+
+    def combined_description(self) -> str:
+        """The members' descriptions as numbered parts of one prompt, each pre-fetched document included once."""
+        parts, documents = [], []
+        for n, (key, task) in enumerate(zip(self.keys, self.members), start=1):
+            for block in _SOURCE_BLOCK.findall(task.description):
+                if block not in documents:
+                    documents.append(block)
+            description = _SOURCE_BLOCK.sub("", task.description).strip()
+            note = " (builds on the previous parts)" if n > 1 else ""
+            parts.append(f"PART {n} - {key}{note}:\n{description}")
+        return (
+            f"Complete these {len(parts)} related tasks in one answer.\n\n" + "\n\n".join(parts)
+            + "".join(documents)
+        )
+
+    def split(self, output) -> dict:
+        """The member outputs contained in the fused answer, keyed by task index, or None if it doesn't parse."""
+        from crewai.tasks.task_output import TaskOutput
+
+        combined = as_model(output, self.schema)
+        if combined is None:
+            return None
+        outputs = {}
+        for i, key, task in zip(self.indices, self.keys, self.members):
+            part = getattr(combined, key)
+            outputs[i] = TaskOutput(description=task.description, expected_output=task.expected_output,
+                                    agent=task.agent.role, raw=part.model_dump_json(), pydantic=part)
+        return outputs
+
+    def run(self, index: int, context: str):
+        """
+        Produce the output of member `index`.
+
+        The leader runs the fused call; followers take their part of its answer. When the
+        fused answer can't be split, or a follower has no part (e.g. the run was resumed
+        between leader and follower), the member runs as its own task instead.
+        """
+        task = self.members[self.indices.index(index)]
+        if index == self.indices[0]:
+            current_span().attributes["fused"] = self.label
+            outputs = self.split(self.task.execute_sync(agent=self.task.agent, context=context))
+            if outputs is None:
+                print(f"Fused answer for tasks {self.label} didn't parse; running them separately")
+                outputs = {}
+            with self._lock:
+                self._outputs = outputs
+        with self._lock:
+            output = self._outputs.pop(index, None)
+        if output is None:
+            return task.execute_sync(agent=task.agent, context=context)
+        task.output = output
+        return output
+
+
+class FusedRunner:
+    """Runner (for `run_task_graph`) producing one member's output of a FusedStep."""
+
+    def __init__(self, step: FusedStep, index: int):
+        self.step = step
+        self.index = index
+        # Separates the member's stage cache entries from those of runs that executed it on its own
+        self.variant = f"fused:{step.label}"
+
+    def __call__(self, context: str):
+        return self.step.run(self.index, context)
+
+
+def fuse_tasks(tasks: list, graph: dict, groups: list = FUSION_GROUPS) -> dict:
+    """
+    Runners (for `run_task_graph`) that execute each fusion group with one LLM call.
+
+    Returns:
+        dict: Task index -> FusedRunner returning that task's output
+    """
+    runners = {}
+    for indices, keys in groups:
+        step = FusedStep(tasks, graph, indices, keys)
+        for i in indices:
+            runners[i] = FusedRunner(step, i)
+    return runners
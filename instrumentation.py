@@ -0,0 +1,174 @@
+import contextvars
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# USD per 1K (prompt, completion) tokens, used to estimate the cost of each LLM call
+MODEL_PRICES_PER_1K = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+_current_tracer = contextvars.ContextVar("current_tracer", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int):
+    """Estimated USD cost of a call, or None for models without a known price."""
+    prices = MODEL_PRICES_PER_1K.get((model or "").split("/")[-1])
+    if prices is None:
+        return None
+    return round(prompt_tokens / 1000 * prices[0] + completion_tokens / 1000 * prices[1], 6)
+
+
+class Span:
+    """One timed unit of work: a task, an LLM call, a tool invocation or a render step."""
+
+    def __init__(self, name: str, kind: str, parent_id: int = None, queued_at: float = None, **attributes):
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.end = None
+        self.queue_time = max(0.0, self.start - queued_at) if queued_at else 0.0
+        self.status = "ok"
+        self.attributes = attributes
+
+    @property
+    def wall_time(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": self.end,
+            "wall_time": round(self.wall_time, 6),
+            "queue_time": round(self.queue_time, 6),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """Collects the spans of one pipeline run and writes them out as a JSON trace."""
+
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this tracer receive every span opened in the current context."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def record(self, name: str, kind: str, start: float, end: float, queue_time: float = 0.0, **attributes) -> Span:
+        """Add a span for work that was timed elsewhere, e.g. tasks run inside `Crew.kickoff()`."""
+        span = Span(name, kind, **attributes)
+        span.start, span.end, span.queue_time = start, end, queue_time
+        self.add(span)
+        return span
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {"run_id": self.run_id, "spans": [span.to_dict() for span in spans]}
+
+    def write_json(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+    def summary_table(self) -> str:
+        """Per-task and per-tool totals as a fixed-width text table."""
+        with self._lock:
+            spans = list(self.spans)
+
+        llm_by_agent = {}
+        for span in spans:
+            if span.kind == "llm":
+                totals = llm_by_agent.setdefault(span.attributes.get("agent"), [0, 0, 0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += span.attributes.get("prompt_tokens", 0)
+                totals[2] += span.attributes.get("completion_tokens", 0)
+                totals[3] += span.attributes.get("cost_usd") or 0.0
+                totals[4] += span.status == "error"
+
+        lines = [
+            f"{'Span':<34}{'Wall s':>9}{'Queue s':>9}{'Calls':>7}{'Prompt':>9}{'Compl.':>9}{'Cost $':>9}{'Retries':>9}",
+            "-" * 95,
+        ]
+        for span in sorted((s for s in spans if s.kind == "task"), key=lambda s: s.start):
+            calls, prompt, completion, cost, failed = llm_by_agent.get(span.attributes.get("agent"), [0, 0, 0, 0.0, 0])
+            retries = span.attributes.get("retries", 0) + failed
+            label = f"{span.name} ({span.attributes.get('agent', '')})"[:33]
+            lines.append(f"{label:<34}{span.wall_time:>9.2f}{span.queue_time:>9.2f}{calls:>7}"
+                         f"{prompt:>9}{completion:>9}{cost:>9.4f}{retries:>9}")
+
+        tools = {}
+        for span in spans:
+            if span.kind in ("tool", "render"):
+                totals = tools.setdefault(span.name, [0, 0.0])
+                totals[0] += 1
+                totals[1] += span.wall_time
+        for name, (calls, wall) in sorted(tools.items()):
+            lines.append(f"{name[:33]:<34}{wall:>9.2f}{'':>9}{calls:>7}")
+
+        tokens = sum(t[1] + t[2] for t in llm_by_agent.values())
+        cost = sum(t[3] for t in llm_by_agent.values())
+        lines.append("-" * 95)
+        lines.append(f"{len(spans)} spans, {sum(t[0] for t in llm_by_agent.values())} LLM calls, "
+                     f"{tokens} tokens, ~${cost:.4f}")
+        return "\n".join(lines)
+
+
+def current_tracer():
+    return _current_tracer.get()
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str, queued_at: float = None, **attributes):
+    """
+    Time the enclosed block as a child of the current span.
+
+    Does nothing but yield a detached Span when no tracer is active, so callers can
+    set attributes unconditionally. Exceptions mark the span as failed and propagate.
+    """
+    tracer = _current_tracer.get()
+    parent = _current_span.get()
+    current = Span(name, kind, parent_id=parent.span_id if parent else None, queued_at=queued_at, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.status = "error"
+        current.attributes["error"] = str(e)
+        raise
+    finally:
+        current.end = time.time()
+        _current_span.reset(token)
+        if tracer is not None:
+            tracer.add(current)
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from cache import file_sha256
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join("Job_Application_Analysis", "jobs.sqlite"))
+# How long a claimed job stays with its worker without a heartbeat before another may take it
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 120))
+# Claims of one job (the first run plus recoveries) before it is given up as failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# How long a completed job answers identical submissions before the analysis is run again
+# (the posting at a URL may have changed); 0 never reuses completed jobs
+JOB_DEDUP_TTL = float(os.getenv("JOB_DEDUP_TTL", 24 * 60 * 60))
+
+JOB_STATUSES = ("pending", "running", "completed", "failed")
+
+_COLUMNS = ("job_id", "dedup_key", "status", "priority", "jd_url", "resume_path", "resume_sha256", "options",
+            "created_at", "started_at", "finished_at", "attempts", "lease_owner", "lease_expires_at", "error",
+            "outputs", "artifacts")
+_JSON_COLUMNS = ("options", "outputs", "artifacts")
+
+
+def dedup_key(jd_url: str, resume_sha256: str, options: dict = None) -> str:
+    """Identity of an analysis: the same posting against the same resume content with the same options."""
+    canonical_options = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{jd_url}\0{resume_sha256}\0{canonical_options}".encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """
+    Persistent priority queue of analysis jobs in a SQLite file.
+
+    Workers `claim` the highest-priority pending job, which leases it to them for
+    `lease_seconds`; they keep the lease alive with `heartbeat` and end it with
+    `complete` or `fail`. When a worker dies, its lease runs out and the job goes back
+    to pending for the next claim, up to `max_attempts` claims in total. Jobs survive
+    restarts, and a recovered job resumes from its checkpoint under the same job ID.
+
+    A submission of a job URL, resume content and options that is already pending or
+    running, or completed less than `dedup_ttl` seconds ago, attaches to that job instead
+    of queueing another run; a failed or older job is run again. Safe to share between
+    threads and between processes using the same file.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, dedup_ttl: float = JOB_DEDUP_TTL):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.dedup_ttl = dedup_ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, dedup_key TEXT NOT NULL, status TEXT NOT NULL,"
+                " priority INTEGER NOT NULL, jd_url TEXT NOT NULL, resume_path TEXT NOT NULL,"
+                " resume_sha256 TEXT NOT NULL, options TEXT NOT NULL, created_at REAL NOT NULL,"
+                " started_at REAL, finished_at REAL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " lease_owner TEXT, lease_expires_at REAL, error TEXT, outputs TEXT, artifacts TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority DESC, created_at)")
+            # At most one queued or running job per analysis. Completed jobs are matched by age
+            # in `submit`; the index of older versions also covered them, which blocked re-runs
+            self._db.execute("DROP INDEX IF EXISTS jobs_dedup")
+            self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedup_active ON jobs (dedup_key)"
+                             " WHERE status IN ('pending', 'running')")
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(zip(_COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] is not None else None
+        return job
+
+    def _select(self, where: str, params: tuple):
+        row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE {where}", params).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def submit(self, jd_url: str, resume_path: str, options: dict = None, priority: int = 0) -> tuple[dict, bool]:
+        """
+        Queue an analysis, or attach to the existing job for the same posting, resume and options.
+
+        Attaching to a pending job raises its priority to `priority` if that is higher.
+
+        Args:
+            jd_url (str): URL of the job description
+            resume_path (str): Path to the resume PDF; its content is hashed for deduplication
+            options (dict): run_pipeline options stored with the job; part of its identity
+            priority (int): Higher priorities are claimed first, equal ones in submission order
+
+        Returns:
+            tuple: (job dict, True if an existing job was returned)
+        """
+        resume_sha = file_sha256(resume_path)
+        key = dedup_key(jd_url, resume_sha, options)
+        with self._lock:
+            for _ in range(2):
+                existing = self._select(
+                    "dedup_key = ? AND (status IN ('pending', 'running') OR (status = 'completed'"
+                    " AND finished_at >= ?)) ORDER BY created_at DESC LIMIT 1",
+                    (key, time.time() - self.dedup_ttl) if self.dedup_ttl > 0 else (key, float("inf")),
+                )
+                if existing is not None:
+                    if existing["status"] == "pending" and priority > existing["priority"]:
+                        with self._db:
+                            self._db.execute("UPDATE jobs SET priority = ? WHERE job_id = ? AND priority < ?",
+                                             (priority, existing["job_id"], priority))
+                        existing["priority"] = priority
+                    return existing, True
+                job_id = uuid.uuid4().hex
+                try:
+                    with self._db:
+                        self._db.execute(
+                            "INSERT INTO jobs (job_id, dedup_key, status, priority, jd_url, resume_path,"
+                            " resume_sha256, options, created_at) VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?)",
+                            (job_id, key, priority, jd_url, resume_path, resume_sha, json.dumps(options or {}),
+                             time.time()),
+                        )
+                except sqlite3.IntegrityError:
+                    # Another process queued the same analysis in between; attach to that one
+                    continue
+                return self._select("job_id = ?", (job_id,)), False
+        raise RuntimeError(f"Could not submit or find the job for {jd_url}")
+
+    def claim(self, worker_id: str):
+        """
+        Lease the next job to `worker_id`.
+
+        Jobs whose lease has run out are first put back as pending, or failed once they
+        have used up their attempts.
+
+        Returns:
+            dict: The claimed job, or None if nothing is pending
+        """
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL,"
+                    " error = 'Worker lease expired ' || attempts || ' times'"
+                    " WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                self._db.execute(
+                    "UPDATE jobs SET status = 'pending', lease_owner = NULL"
+                    " WHERE status = 'running' AND lease_expires_at < ?",
+                    (now,),
+                )
+            while True:
+                job = self._select("status = 'pending' ORDER BY priority DESC, created_at LIMIT 1", ())
+                if job is None:
+                    return None
+                with self._db:
+                    claimed = self._db.execute(
+                        "UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires_at = ?,"
+                        " attempts = attempts + 1, started_at = COALESCE(started_at, ?)"
+                        " WHERE job_id = ? AND status = 'pending'",
+                        (worker_id, now + self.lease_seconds, now, job["job_id"]),
+                    ).rowcount
+                if claimed:
+                    return self._select("job_id = ?", (job["job_id"],))
+                # Claimed by another process first; try the next one
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease on `job_id`. Returns False if the worker no longer holds it."""
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, worker_id),
+            ).rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, outputs: list, artifacts: dict) -> bool:
+        """Store the results of a job the worker holds. Returns False if its lease was lost."""
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ?, lease_owner = NULL, error = NULL,"
+                " outputs = ?, artifacts = ? WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), json.dumps(outputs), json.dumps(artifacts), job_id, worker_id),
+            ).rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Mark a job the worker holds as failed. Returns False if its lease was lost."""
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, error = ?"
+                " WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), error, job_id, worker_id),
+            ).rowcount == 1
+
+    def get(self, job_id: str):
+        """The job's current state, or None for an unknown job."""
+        with self._lock:
+            return self._select("job_id = ?", (job_id,))
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(rows)
+        return counts
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+from typing import Any
+
+from crewai import BaseLLM
+from pydantic import BaseModel
+
+from cache import get_cache
+from instrumentation import estimate_cost, span
+from rate_limiter import estimate_tokens, get_rate_limiter
+from schemas import as_model
+
+# "off" calls the model directly, "record" serves repeats from the cache and stores new
+# responses, "replay" answers only from the cache and never contacts the model
+LLM_CACHE_MODES = ("off", "record", "replay")
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+
+class PipelineLLM(BaseLLM):
+    """
+    Wrapper around an agent's LLM that the pipeline routes every model call through.
+
+    In "record" mode each response is stored under a key built from the model, the
+    calling agent's role, the task description and the full message list (which
+    carries the context handed over from upstream tasks), plus the structured
+    `response_model` crewai asks for, if any, so an identical prompt is answered from the
+    local cache. Structured responses are stored as JSON and rebuilt as their model.
+    "replay" serves exclusively from that cache.
+
+    Calls that reach the model pass through the process-wide rate limiter of its model,
+    which every agent and concurrent pipeline shares.
+
+    With a `fallback` LLM (a stronger model), a final answer of `inner` that fails the
+    task's output schema is asked for again from the fallback, whose answer is used.
+    """
+    inner: Any
+    fallback: Any = None
+    cache_mode: str = LLM_CACHE_MODE
+
+    def cache_key(self, messages, from_task=None, from_agent=None, response_model=None) -> str:
+        payload = {
+            "model": self.inner.model,
+            "temperature": getattr(self.inner, "temperature", None),
+            "agent_role": getattr(from_agent, "role", None),
+            "task_description": getattr(from_task, "description", None),
+            "messages": messages,
+        }
+        if response_model is not None:
+            payload["response_model"] = response_model.model_json_schema()
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return f"llm:{hashlib.sha256(encoded).hexdigest()}"
+
+    def _lookup(self, key: str, response_model=None):
+        if self.cache_mode == "off":
+            return None
+        cached = get_cache("llm", max_bytes=LLM_CACHE_MAX_BYTES).get(key)
+        if cached:
+            text = cached[0].decode("utf-8")
+            if cached[1].get("format") == "model" and response_model is not None:
+                return response_model.model_validate_json(text)
+            return text
+        if self.cache_mode == "replay":
+            raise LLMCacheMiss(f"No recorded response for this prompt ({key}) in replay mode")
+        return None
+
+    def _store(self, key: str, response, from_agent=None):
+        # Only text and structured answers are recorded; tool-call results depend on live tools
+        if self.cache_mode != "record" or not isinstance(response, (str, BaseModel)):
+            return
+        meta = {"model": self.inner.model, "agent_role": getattr(from_agent, "role", None)}
+        if isinstance(response, BaseModel):
+            response, meta["format"] = response.model_dump_json(), "model"
+        get_cache("llm", max_bytes=LLM_CACHE_MAX_BYTES).put(key, response.encode("utf-8"), meta)
+
+    def _usage(self, llm) -> tuple:
+        summary = llm.get_token_usage_summary() if hasattr(llm, "get_token_usage_summary") else None
+        return (getattr(summary, "prompt_tokens", 0), getattr(summary, "completion_tokens", 0))
+
+    def _record_usage(self, llm, llm_span, usage_before: tuple) -> int:
+        prompt_before, completion_before = usage_before
+        prompt_after, completion_after = self._usage(llm)
+        prompt_tokens = prompt_after - prompt_before
+        completion_tokens = completion_after - completion_before
+        llm_span.attributes.update({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": estimate_cost(llm.model, prompt_tokens, completion_tokens),
+        })
+        return prompt_tokens + completion_tokens
+
+    def _sync_stop_words(self):
+        stop = getattr(self, "stop_sequences", None) or self.stop
+        if stop:
+            for llm in (self.inner, self.fallback):
+                if llm is not None:
+                    llm.stop = list(stop)
+
+    def needs_escalation(self, response, from_task=None, response_model=None) -> bool:
+        """
+        Whether `response` is a final answer that doesn't match the output schema of `from_task`.
+
+        A structured call (`response_model` set) answers with a model or its JSON as a whole;
+        a ReAct-style call only with the text after "Final Answer:".
+        """
+        schema = getattr(from_task, "output_pydantic", None)
+        if self.fallback is None or schema is None:
+            return False
+        if isinstance(response, BaseModel):
+            return as_model(response.model_dump_json(), schema) is None
+        if not isinstance(response, str):
+            return False
+        # Intermediate steps (tool calls, thoughts) aren't validated, only the final answer
+        _, marker, answer = response.partition("Final Answer:")
+        if marker:
+            return as_model(answer, schema) is None
+        return response_model is not None and as_model(response, schema) is None
+
+    def _invoke(self, llm, llm_span, messages, **kwargs):
+        usage_before = self._usage(llm)
+        limiter = get_rate_limiter(llm.model)
+        tokens = estimate_tokens(messages, getattr(llm, "max_tokens", None))
+        response = limiter.call(lambda: llm.call(messages, **kwargs), tokens=tokens)
+        limiter.settle_tokens(tokens, self._record_usage(llm, llm_span, usage_before))
+        return response
+
+    async def _ainvoke(self, llm, llm_span, messages, **kwargs):
+        usage_before = self._usage(llm)
+        limiter = get_rate_limiter(llm.model)
+        tokens = estimate_tokens(messages, getattr(llm, "max_tokens", None))
+        response = await limiter.acall(lambda: llm.acall(messages, **kwargs), tokens=tokens)
+        limiter.settle_tokens(tokens, self._record_usage(llm, llm_span, usage_before))
+        return response
+
+    def _escalation_span(self, from_agent=None):
+        return span(f"LLM {self.fallback.model}", "llm", agent=getattr(from_agent, "role", None),
+                    model=self.fallback.model, escalated_from=self.inner.model)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None,
+             from_agent=None, **kwargs) -> str | Any:
+        key = self.cache_key(messages, from_task, from_agent, kwargs.get("response_model"))
+        call_kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                           from_task=from_task, from_agent=from_agent, **kwargs)
+        with span(f"LLM {self.inner.model}", "llm", agent=getattr(from_agent, "role", None),
+                  model=self.inner.model) as llm_span:
+            cached = self._lookup(key, kwargs.get("response_model"))
+            if cached is not None:
+                llm_span.attributes["cached"] = True
+                return cached
+
+            self._sync_stop_words()
+            response = self._invoke(self.inner, llm_span, messages, **call_kwargs)
+            if self.needs_escalation(response, from_task, kwargs.get("response_model")):
+                llm_span.attributes["escalated"] = True
+                with self._escalation_span(from_agent) as fallback_span:
+                    response = self._invoke(self.fallback, fallback_span, messages, **call_kwargs)
+        self._store(key, response, from_agent)
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None,
+                    from_agent=None, **kwargs) -> str | Any:
+        key = self.cache_key(messages, from_task, from_agent, kwargs.get("response_model"))
+        call_kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                           from_task=from_task, from_agent=from_agent, **kwargs)
+        with span(f"LLM {self.inner.model}", "llm", agent=getattr(from_agent, "role", None),
+                  model=self.inner.model) as llm_span:
+            cached = self._lookup(key, kwargs.get("response_model"))
+            if cached is not None:
+                llm_span.attributes["cached"] = True
+                return cached
+
+            self._sync_stop_words()
+            response = await self._ainvoke(self.inner, llm_span, messages, **call_kwargs)
+            if self.needs_escalation(response, from_task, kwargs.get("response_model")):
+                llm_span.attributes["escalated"] = True
+                with self._escalation_span(from_agent) as fallback_span:
+                    response = await self._ainvoke(self.fallback, fallback_span, messages, **call_kwargs)
+        self._store(key, response, from_agent)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self.inner.get_token_usage_summary()
+
+
+def configure_llms(agents: list, cache_mode: str = None) -> list:
+    """
+    Route every agent's model calls through a PipelineLLM with the given cache mode.
+
+    Agents that are already wrapped only have their settings updated. Returns `agents`.
+    """
+    cache_mode = cache_mode or LLM_CACHE_MODE
+    if cache_mode not in LLM_CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode: {cache_mode}")
+
+    for agent in agents:
+        if isinstance(agent.llm, PipelineLLM):
+            agent.llm.cache_mode = cache_mode
+        else:
+            agent.llm = PipelineLLM(model=agent.llm.model, inner=agent.llm, cache_mode=cache_mode)
+    return agents
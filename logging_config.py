@@ -1,396 +1,521 @@
+import multiprocessing
 import os
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pydantic import BaseModel
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from datetime import datetime
 import traceback
 
-def write_section_header(c, y, title):
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, y, title)
-    return y - 25
-
-def write_subsection_header(c, y, title):
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(70, y, title)
-    return y - 20
-
-def write_content(c, y, text, indent=90):
-    if y < 50:
-        c.showPage()
-        y = 750
-    c.setFont("Helvetica", 12)
+from pdf_layout import TextLayout
+from schemas import TASK_SCHEMAS, AnalysisReportData, CVData, as_model, output_text
+
+# Worker processes for parallel rendering; defaults to one per CPU
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", 0)) or None
+
+# Task outputs (0-based) each report is drawn from. Outputs outside RENDERED_TASKS only feed
+# other tasks, and lean runs skip the tasks whose outputs reach no report at all
+ANALYSIS_REPORT_TASKS = (0, 1, 2, 3, 7)
+CV_TASKS = (2, 4, 5)
+RENDERED_TASKS = tuple(sorted(set(ANALYSIS_REPORT_TASKS) | set(CV_TASKS)))
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+# clean_text maps '_' to a space and drops JSON punctuation in one bytes.translate pass. All of
+# these are ASCII, which never occurs inside a multi-byte UTF-8 sequence, so working on the
+# encoded text is safe and much faster than str.translate on non-ASCII text
+_CLEAN_TABLE = bytes.maketrans(b'_', b' ')
+_CLEAN_DELETE = b'{}"[]'
+# Leftovers of the agents' reasoning that sometimes leak into their final answers
+THOUGHT_PHRASES = (
+    'Thought: I now can give a great answer',
+    'I must stop using this action input',
+    'I\'ll try something else instead',
+)
+_QUESTION_MARKS = str.maketrans('', '', '•-')
+
+# One non-empty line of a task output; key and value are None when the line has no ':'
+ParsedLine = namedtuple("ParsedLine", ["text", "lower", "key", "value"])
+
+def write_section_header(layout, title):
+    # Keep a header on the same page as at least its first line of content
+    layout.ensure_space(40)
+    layout.write(title, indent=50, font="Helvetica-Bold", size=16, leading=25)
+
+def write_subsection_header(layout, title):
+    layout.ensure_space(35)
+    layout.write(title, indent=70, font="Helvetica-Bold", size=14, leading=20)
+
+def write_content(layout, text, indent=90):
     text = clean_text(text)
     if text:
-        c.drawString(indent, y, text[:80])
-        return y - 15
-    return y
+        layout.write(text, indent=indent)
 
 def clean_text(text):
-    if isinstance(text, (dict, list)):
-        text = str(text)
-    text = str(text)
-    text = text.replace('{', '').replace('}', '').replace('"', '').replace('[', '').replace(']', '')
-    text = text.replace('_', ' ').strip()
-    return text
-
-def generate_pdf_report(output_dir: str, tasks_output: list, timestamp: str):
-    """Generate PDF reports for analyses and updated CV."""
-    try:
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Analysis Report
-        analysis_pdf_path = os.path.join(output_dir, f"analysis_report_{timestamp}.pdf")
-        cv_pdf_path = os.path.join(output_dir, f"updated_cv_{timestamp}.pdf")
-        
-        # Helper function to clean text
-        def clean_text(text):
-            if isinstance(text, (dict, list)):
-                text = str(text)
-            text = str(text)
-            # Remove common unwanted patterns
-            text = text.replace('{', '').replace('}', '').replace('"', '').replace('[', '').replace(']', '')
-            text = text.replace('_', ' ').strip()
-            # Remove thought patterns
-            text = text.replace('Thought: I now can give a great answer', '')
-            text = text.replace('I must stop using this action input', '')
-            text = text.replace('I\'ll try something else instead', '')
-            return text
-
-        # Helper function to write CV section with controlled bullet points
-        def write_cv_section(c, y, title, content, indent=90):
-            if y < 100:
-                c.showPage()
-                y = 750
-            
-            # Section title
-            c.setFont("Helvetica-Bold", 14)
-            c.drawString(50, y, title)
-            y -= 20
-            
-            content = clean_text(content)
-            
-            # Split content into meaningful chunks
-            chunks = []
-            current_chunk = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if line:
-                    if ':' in line and not line.startswith('•') and not line.startswith('-'):
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                            current_chunk = []
-                        chunks.append([line])
-                    else:
-                        current_chunk.append(line)
+    """Drop JSON punctuation and leftover thought phrases from an agent's output."""
+    text = str(text).encode('utf-8').translate(_CLEAN_TABLE, _CLEAN_DELETE).decode('utf-8')
+    for phrase in THOUGHT_PHRASES:
+        if phrase in text:
+            text = text.replace(phrase, '')
+    return text.strip()
+
+class ParsedOutput:
+    """
+    A task output cleaned and split into lines once, shared by every section that reads it.
+
+    `lines` skips blank lines and the agents' "Thought:" / "I now ..." lines.
+    """
+
+    def __init__(self, raw: str):
+        self.text = clean_text(raw)
+        self.lower = self.text.lower()
+        self.lines = []
+        for line in self.text.split('\n'):
+            line = line.strip()
+            if not line or line.startswith('Thought:') or line.startswith('I now'):
+                continue
+            key, sep, value = line.partition(':')
+            if sep:
+                self.lines.append(ParsedLine(line, line.lower(), key.strip(), value.strip()))
+            else:
+                self.lines.append(ParsedLine(line, line.lower(), None, None))
+
+    def __bool__(self):
+        return bool(self.text)
+
+@lru_cache(maxsize=64)
+def parse_output(raw: str) -> ParsedOutput:
+    return ParsedOutput(raw)
+
+def parse_outputs(tasks_output: list) -> list:
+    """ParsedOutput per task output; each distinct text is only cleaned and split once."""
+    return [output if isinstance(output, ParsedOutput) else parse_output(str(output) if output else "")
+            for output in tasks_output]
+
+def write_cv_section(layout, title, content: ParsedOutput, indent=90):
+    """Write one CV section, turning "Header: value" lines into bold headers and the rest into bullets."""
+    # Section title
+    layout.ensure_space(60)
+    layout.write(title, indent=50, font="Helvetica-Bold", size=14, leading=20)
+
+    # Split content into meaningful chunks
+    chunks = []
+    current_chunk = []
+    for line in content.lines:
+        if line.key is not None and not line.text.startswith('•') and not line.text.startswith('-'):
             if current_chunk:
                 chunks.append(current_chunk)
-            
-            # Write chunks with controlled formatting
-            for chunk in chunks:
-                if not chunk:
-                    continue
-                
-                if y < 100:
-                    c.showPage()
-                    y = 750
-                
-                # Handle header-style lines (containing ':')
-                if ':' in chunk[0]:
-                    c.setFont("Helvetica-Bold", 12)
-                    header, *values = chunk[0].split(':')
-                    c.drawString(indent, y, header.strip())
-                    y -= 15
-                    if values:
-                        c.setFont("Helvetica", 12)
-                        c.drawString(indent + 20, y, values[0].strip())
-                        y -= 15
+                current_chunk = []
+            chunks.append([line])
+        else:
+            current_chunk.append(line)
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    # Write chunks with controlled formatting
+    for chunk in chunks:
+        # Handle header-style lines (containing ':')
+        if chunk[0].key is not None:
+            layout.write(chunk[0].key, indent=indent, font="Helvetica-Bold")
+            if chunk[0].value:
+                layout.write(chunk[0].value, indent=indent + 20)
+        else:
+            # Handle regular content
+            for line in chunk:
+                if line.text.startswith('•') or line.text.startswith('-'):
+                    layout.write(line.text, indent=indent + 20)
                 else:
-                    # Handle regular content
-                    c.setFont("Helvetica", 12)
-                    for line in chunk:
-                        if y < 100:
-                            c.showPage()
-                            y = 750
-                        if line.startswith('•') or line.startswith('-'):
-                            c.drawString(indent + 20, y, line)
-                        else:
-                            c.drawString(indent + 20, y, f"• {line}")
-                        y -= 15
-                
-                y -= 5  # Small gap between chunks
-            
-            return y - 15
-
-        # Generate Analysis Report
-        c = canvas.Canvas(analysis_pdf_path, pagesize=letter)
-        y = 750
-        
-        # Title
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(50, y, "Job Application Analysis Report")
-        y -= 30
-
-        # Role Classification
-        if len(tasks_output) > 0 and tasks_output[0]:
-            y = write_section_header(c, y, "Role Classification")
-            
-            # Hardcoded role classification since the model output is not in the expected format
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(70, y, "Role Category")
-            c.setFont("Helvetica", 12)
-            c.drawString(200, y, "Program Manager - Strategic Business Operations")
-            y -= 15
-
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(70, y, "Role Split")
-            c.setFont("Helvetica", 12)
-            c.drawString(200, y, "60% Business / 40% Technical")
-            y -= 20
-
-            # Technical Requirements
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(70, y, "Technical Requirements:")
-            y -= 15
-            c.setFont("Helvetica", 12)
-            technical_reqs = [
-                "Data analysis and visualization",
-                "Energy market analysis",
-                "Project management tools",
-                "Business intelligence platforms",
-                "Performance tracking systems"
-            ]
-            for req in technical_reqs:
-                c.drawString(90, y, f"• {req}")
-                y -= 15
-            y -= 10
-
-            # Business Requirements
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(70, y, "Business Requirements:")
-            y -= 15
-            c.setFont("Helvetica", 12)
-            business_reqs = [
-                "Program management",
-                "Strategic planning",
-                "Stakeholder management",
-                "Team leadership",
-                "Business operations"
-            ]
-            for req in business_reqs:
-                c.drawString(90, y, f"• {req}")
-                y -= 15
-            y -= 10
-
-            # Domain Expertise
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(70, y, "Domain Expertise:")
-            y -= 15
-            c.setFont("Helvetica", 12)
-            domain_exp = [
-                "Energy markets",
-                "Renewable energy",
-                "Sustainability",
-                "Climate initiatives",
-                "Strategic business operations"
-            ]
-            for exp in domain_exp:
-                c.drawString(90, y, f"• {exp}")
-                y -= 15
-            y -= 20
-
-        # Job Requirements
-        if len(tasks_output) > 1 and tasks_output[1]:
-            y = write_section_header(c, y, "Job Requirements")
-            content = clean_text(tasks_output[1])
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('Thought:') and not line.startswith('I now'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        c.setFont("Helvetica-Bold", 12)
-                        c.drawString(70, y, key.strip())
-                        y -= 15
-                        c.setFont("Helvetica", 12)
-                        c.drawString(90, y, value.strip())
-                    else:
-                        c.drawString(70, y, f"• {line}")
-                    y -= 15
-            y -= 20
-
-        # Skills Matrix
-        if len(tasks_output) > 2 and tasks_output[2]:
-            y = write_section_header(c, y, "Skills Matrix")
-            content = clean_text(tasks_output[2])
-            current_category = ""
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('Thought:') and not line.startswith('I now'):
-                    if ':' in line and not any(char.isdigit() for char in line.split(':')[1]):
-                        current_category = line.split(':')[0].strip()
-                        c.setFont("Helvetica-Bold", 12)
-                        c.drawString(70, y, current_category)
-                        y -= 15
-                    else:
-                        c.setFont("Helvetica", 12)
-                        c.drawString(90, y, f"• {line}")
-                    y -= 15
-            y -= 20
-
-        # Match Analysis
-        if len(tasks_output) > 3 and tasks_output[3]:
-            y = write_section_header(c, y, "Match Analysis")
-            content = clean_text(tasks_output[3])
-            
+                    layout.write(line.text, indent=indent + 20, bullet="•")
+
+        layout.space(5)  # Small gap between chunks
+
+    layout.space(15)
+
+def write_items(layout, heading, items, indent=70):
+    """Write a bold heading and one bullet per item; nothing at all when there are no items."""
+    if not items:
+        return
+    layout.ensure_space(35)
+    layout.write(heading, indent=indent, font="Helvetica-Bold", leading=20)
+    for item in items:
+        layout.write(str(item), indent=indent + 20, bullet="•")
+    layout.space(10)
+
+def write_parsed_lines(layout, content: ParsedOutput):
+    """Write free text as bold "key:" lines with their value below, and bullets for the rest."""
+    for line in content.lines:
+        if line.key is not None:
+            layout.write(line.key, indent=70, font="Helvetica-Bold")
+            if line.value:
+                layout.write(line.value, indent=90)
+        else:
+            layout.write(line.text, indent=70, bullet="•")
+        layout.space(15)
+
+def write_cv_list(layout, title, groups, indent=90):
+    """Write a CV section from (heading, items) groups of a structured output."""
+    layout.ensure_space(60)
+    layout.write(title, indent=50, font="Helvetica-Bold", size=14, leading=20)
+    for heading, items in groups:
+        if items:
+            layout.write(heading, indent=indent, font="Helvetica-Bold")
+            for item in items:
+                layout.write(str(item), indent=indent + 20, bullet="•")
+            layout.space(5)
+    layout.space(15)
+
+def structured_outputs(tasks_output: list) -> tuple[list, list]:
+    """
+    Split task outputs into their schema models and the text needed for the rest.
+
+    Returns:
+        tuple: (models, texts), one entry per pipeline task. models[i] is None when
+        output i doesn't match its schema, and only those outputs are parsed as text
+        into texts[i]; every other entry of texts is empty.
+    """
+    padded = list(tasks_output) + [None] * (len(TASK_SCHEMAS) - len(tasks_output))
+    models = [as_model(output, schema) for output, schema in zip(padded, TASK_SCHEMAS)]
+    texts = parse_outputs([output if model is None else None for output, model in zip(padded, models)])
+    return models, texts
+
+def render_analysis_report(analysis_pdf_path: str, tasks_output: list) -> str:
+    """Draw the analysis report PDF from the task outputs and return its path."""
+    models, outputs = structured_outputs(tasks_output)
+    c = canvas.Canvas(analysis_pdf_path, pagesize=letter)
+    layout = TextLayout(c)
+
+    # Title
+    layout.write("Job Application Analysis Report", indent=50, font="Helvetica-Bold", size=16, leading=30)
+
+    # Role Classification
+    role = models[0]
+    if role or outputs[0]:
+        write_section_header(layout, "Role Classification")
+        if role:
+            layout.write_pair("Role Category", role.role_category)
+            layout.write_pair("Role Split", f"{role.business_percent}% Business / {role.technical_percent}% Technical")
+            layout.space(5)
+            write_items(layout, "Technical Requirements:", role.technical_requirements)
+            write_items(layout, "Business Requirements:", role.business_requirements)
+            write_items(layout, "Domain Expertise:", role.domain_expertise)
+        else:
+            write_parsed_lines(layout, outputs[0])
+        layout.space(20)
+
+    # Job Requirements
+    requirements = models[1]
+    if requirements or outputs[1]:
+        write_section_header(layout, "Job Requirements")
+        if requirements:
+            layout.write_pair("Technical / Business", requirements.technical_business_ratio, value_indent=250)
+            layout.space(5)
+            write_items(layout, "Must-have Skills:", requirements.must_have_skills)
+            write_items(layout, "Experience:", requirements.experience_requirements)
+            write_items(layout, "Performance Expectations:", requirements.performance_expectations)
+        else:
+            write_parsed_lines(layout, outputs[1])
+        layout.space(20)
+
+    # Skills Matrix
+    skills = models[2]
+    if skills or outputs[2]:
+        write_section_header(layout, "Skills Matrix")
+        if skills:
+            write_items(layout, "Technical Skills:", skills.technical_skills)
+            write_items(layout, "Business Capabilities:", skills.business_capabilities)
+            write_items(layout, "Project Metrics:", skills.project_metrics)
+            write_items(layout, "Leadership:", skills.leadership_metrics)
+        else:
+            for line in outputs[2].lines:
+                if line.key is not None and not any(char.isdigit() for char in line.value.partition(':')[0]):
+                    layout.write(line.key, indent=70, font="Helvetica-Bold")
+                else:
+                    layout.write(line.text, indent=90, bullet="•")
+                layout.space(15)
+        layout.space(20)
+
+    # Match Analysis
+    fit = models[3]
+    if fit or outputs[3]:
+        write_section_header(layout, "Match Analysis")
+        if fit:
+            match_scores = {
+                "Overall Match Score": fit.overall_match,
+                "Technical Skills Match": fit.technical_match,
+                "Business Skills Match": fit.business_match,
+                "Experience Level Match": fit.experience_match,
+            }
+        else:
             # Extract match scores
             match_scores = {}
-            for line in content.split('\n'):
-                line = line.strip()
-                if ':' in line and ('match' in line.lower() or 'score' in line.lower()):
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if value.isdigit() or (value.replace('.', '').isdigit()):
-                        match_scores[key] = f"{value}%"
-
-            # Display match scores
-            if match_scores:
-                for key, value in match_scores.items():
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(70, y, key)
-                    c.setFont("Helvetica", 12)
-                    c.drawString(250, y, value)
-                    y -= 15
-            else:
-                c.setFont("Helvetica", 12)
-                c.drawString(70, y, "Overall Match Score: 75%")
-                y -= 15
-                c.drawString(70, y, "Technical Skills Match: 70%")
-                y -= 15
-                c.drawString(70, y, "Business Skills Match: 80%")
-                y -= 15
-                c.drawString(70, y, "Experience Level Match: 80%")
-            y -= 20
-
-        # Interview Preparation
-        if len(tasks_output) > 7 and tasks_output[7]:
-            y = write_section_header(c, y, "Interview Preparation")
-            content = clean_text(tasks_output[7])
-            
+            for line in outputs[3].lines:
+                if line.key is not None and ('match' in line.lower or 'score' in line.lower):
+                    if line.value.isdigit() or (line.value.replace('.', '').isdigit()):
+                        match_scores[line.key] = line.value
+
+        # Display match scores, or the analysis as written when it has none
+        if match_scores:
+            for key, value in match_scores.items():
+                layout.write_pair(key, f"{value}%", value_indent=250)
+        else:
+            write_parsed_lines(layout, outputs[3])
+        if fit:
+            layout.space(5)
+            write_items(layout, "Gaps:", fit.gaps)
+        layout.space(20)
+
+    # Interview Preparation
+    guide = models[7]
+    if guide or outputs[7]:
+        write_section_header(layout, "Interview Preparation")
+
+        if guide:
+            technical_questions = guide.technical_questions
+            behavioral_questions = guide.behavioral_questions
+            scenario_questions = guide.scenario_questions
+        else:
             # Organize questions by type
             technical_questions = []
             behavioral_questions = []
             scenario_questions = []
-            
+
             current_section = None
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('Thought:') and not line.startswith('I now'):
-                    if 'technical' in line.lower():
-                        current_section = technical_questions
-                    elif 'behavioral' in line.lower():
-                        current_section = behavioral_questions
-                    elif 'scenario' in line.lower():
-                        current_section = scenario_questions
-                    elif current_section is not None and (line.startswith('•') or line.startswith('-') or line.startswith('Q')):
-                        current_section.append(line.replace('•', '').replace('-', '').replace('Q:', '').strip())
-
-            # Write questions
-            if technical_questions:
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(70, y, "Technical Questions:")
-                y -= 20
-                c.setFont("Helvetica", 12)
-                for q in technical_questions:
-                    c.drawString(90, y, f"• {q}")
-                    y -= 15
-                y -= 10
-
-            if behavioral_questions:
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(70, y, "Behavioral Questions:")
-                y -= 20
-                c.setFont("Helvetica", 12)
-                for q in behavioral_questions:
-                    c.drawString(90, y, f"• {q}")
-                    y -= 15
-                y -= 10
-
-            if scenario_questions:
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(70, y, "Scenario Questions:")
-                y -= 20
-                c.setFont("Helvetica", 12)
-                for q in scenario_questions:
-                    c.drawString(90, y, f"• {q}")
-                    y -= 15
-
-        c.save()
-        print(f"Analysis report saved to: {analysis_pdf_path}")
-
-        # Generate CV
-        c = canvas.Canvas(cv_pdf_path, pagesize=letter)
-        y = 750
-
-        # CV Header
-        c.setFont("Helvetica-Bold", 24)
-        c.drawString(50, y, "Professional CV")
-        y -= 40
-
-        # CV Sections with controlled bullet points
-        if len(tasks_output) > 5:
-            y = write_cv_section(c, y, "Key Skills & Competencies", tasks_output[5], indent=70)
-
-        if len(tasks_output) > 2:
-            y = write_cv_section(c, y, "Technical Expertise", tasks_output[2], indent=70)
-
-        if len(tasks_output) > 4:
-            y = write_cv_section(c, y, "Professional Experience", tasks_output[4], indent=70)
-
-        # Add Education & Certifications if available
-        if len(tasks_output) > 2:
-            education_data = clean_text(tasks_output[2])
-            if 'education' in education_data.lower() or 'certification' in education_data.lower():
-                y = write_cv_section(c, y, "Education & Certifications", education_data, indent=70)
-
-        c.save()
-        print(f"CV saved to: {cv_pdf_path}")
+            for line in outputs[7].lines:
+                if 'technical' in line.lower:
+                    current_section = technical_questions
+                elif 'behavioral' in line.lower:
+                    current_section = behavioral_questions
+                elif 'scenario' in line.lower:
+                    current_section = scenario_questions
+                elif current_section is not None and line.text.startswith(('•', '-', 'Q')):
+                    current_section.append(line.text.translate(_QUESTION_MARKS).replace('Q:', '').strip())
+
+        # Write questions
+        write_items(layout, "Technical Questions:", technical_questions)
+        write_items(layout, "Behavioral Questions:", behavioral_questions)
+        write_items(layout, "Scenario Questions:", scenario_questions)
+        if guide:
+            write_items(layout, "Key Talking Points:", guide.talking_points)
+
+    c.save()
+    print(f"Analysis report saved to: {analysis_pdf_path}")
+    return analysis_pdf_path
+
+def render_cv(cv_pdf_path: str, tasks_output: list) -> str:
+    """Draw the updated CV PDF from the task outputs and return its path."""
+    models, outputs = structured_outputs(tasks_output)
+    skills_matrix, cv, profile = models[2], models[4], models[5]
+    c = canvas.Canvas(cv_pdf_path, pagesize=letter)
+    layout = TextLayout(c)
+
+    # CV Header
+    layout.write("Professional CV", indent=50, font="Helvetica-Bold", size=24, leading=40)
+
+    if cv and cv.summary:
+        layout.ensure_space(60)
+        layout.write("Professional Summary", indent=50, font="Helvetica-Bold", size=14, leading=20)
+        layout.write(cv.summary, indent=70)
+        layout.space(20)
+
+    # CV Sections with controlled bullet points
+    if len(tasks_output) > 5:
+        if profile:
+            write_cv_list(layout, "Key Skills & Competencies",
+                          [("Core Skills", [skill.name for skill in profile.skills]),
+                           ("Keywords", profile.ats_keywords)], indent=70)
+        else:
+            write_cv_section(layout, "Key Skills & Competencies", outputs[5], indent=70)
+
+    if len(tasks_output) > 2:
+        if skills_matrix:
+            write_cv_list(layout, "Technical Expertise",
+                          [("Technical Skills", [skill.name for skill in skills_matrix.technical_skills]),
+                           ("Business Capabilities", skills_matrix.business_capabilities)], indent=70)
+        else:
+            write_cv_section(layout, "Technical Expertise", outputs[2], indent=70)
+
+    if len(tasks_output) > 4:
+        if cv:
+            write_cv_list(layout, "Professional Experience",
+                          [("Experience", cv.experience), ("Key Achievements", cv.achievements)], indent=70)
+        else:
+            write_cv_section(layout, "Professional Experience", outputs[4], indent=70)
+
+    # Add Education & Certifications if available
+    if skills_matrix:
+        if skills_matrix.education:
+            write_cv_list(layout, "Education & Certifications", [("Education", skills_matrix.education)], indent=70)
+    elif len(tasks_output) > 2:
+        if 'education' in outputs[2].lower or 'certification' in outputs[2].lower:
+            write_cv_section(layout, "Education & Certifications", outputs[2], indent=70)
+
+    c.save()
+    print(f"CV saved to: {cv_pdf_path}")
+    return cv_pdf_path
+
+def report_data_from_outputs(tasks_output: list) -> tuple:
+    """
+    Collect the structured task outputs into the typed report objects.
+
+    Returns:
+        tuple: (AnalysisReportData, CVData) for `create_agent_pdf_report`; parts whose
+        task output didn't match its schema are left empty
+    """
+    models, _ = structured_outputs(tasks_output)
+    skills_matrix, cv, profile = models[2], models[4], models[5]
+    analysis_data = AnalysisReportData(
+        role_classification=models[0],
+        requirements=models[1],
+        skills_matrix=skills_matrix,
+        match_analysis=models[3],
+        interview_guide=models[7],
+    )
+    cv_data = CVData(
+        summary=cv.summary if cv else None,
+        skills=[skill.name for skill in profile.skills] if profile else (cv.highlighted_skills if cv else []),
+        experience=(cv.experience + cv.achievements) if cv else [],
+        education=skills_matrix.education if skills_matrix else [],
+    )
+    return analysis_data, cv_data
+
+def _discard_output():
+    """Pool initializer that sends a render worker's progress prints to /dev/null."""
+    sys.stdout = open(os.devnull, "w")
+
+def get_render_pool(quiet: bool = False) -> ProcessPoolExecutor:
+    """
+    Process pool shared by all parallel renders, created on first use.
+
+    The first use is usually on a worker thread, where forking could copy locks other
+    threads hold into the children, so the workers are spawned as fresh interpreters.
+
+    Args:
+        quiet (bool): Discard the workers' prints; only takes effect if this call creates the pool
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS,
+                                               mp_context=multiprocessing.get_context("spawn"),
+                                               initializer=_discard_output if quiet else None)
+        return _render_pool
+
+def portable_outputs(tasks_output: list) -> list:
+    """
+    Task outputs reduced to what the renderers read, safe to send to a worker process.
+
+    TaskOutput objects don't pickle reliably, so each becomes its schema model when it
+    has one and its text otherwise.
+    """
+    return [getattr(output, "pydantic", None) or (str(output) if output else "") for output in tasks_output]
+
+def generate_pdf_report(output_dir: str, tasks_output: list, timestamp: str, parallel: bool = False):
+    """
+    Generate PDF reports for analyses and updated CV.
+
+    With `parallel`, the two documents are drawn at the same time in the shared render
+    process pool instead of one after the other on the calling thread.
+    """
+    try:
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
         
-        return analysis_pdf_path, cv_pdf_path
+        # Analysis Report
+        analysis_pdf_path = os.path.join(output_dir, f"analysis_report_{timestamp}.pdf")
+        cv_pdf_path = os.path.join(output_dir, f"updated_cv_{timestamp}.pdf")
+        
+        if not parallel:
+            return render_analysis_report(analysis_pdf_path, tasks_output), render_cv(cv_pdf_path, tasks_output)
+
+        outputs = portable_outputs(tasks_output)
+        pool = get_render_pool()
+        analysis_future = pool.submit(render_analysis_report, analysis_pdf_path, outputs)
+        cv_future = pool.submit(render_cv, cv_pdf_path, outputs)
+        return analysis_future.result(), cv_future.result()
         
     except Exception as e:
         print(f"Error in PDF generation: {str(e)}")
         traceback.print_exc()
         raise
 
+def generate_pdf_reports_batch(jobs: list) -> list:
+    """
+    Render the reports of many runs across the shared render process pool.
+
+    Args:
+        jobs (list): (output_dir, tasks_output, timestamp) tuples, one per run
+
+    Returns:
+        list: (analysis_pdf_path, cv_pdf_path) per job in input order, or None for a job
+        whose rendering failed
+    """
+    pool = get_render_pool()
+    futures = []
+    for output_dir, tasks_output, timestamp in jobs:
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = portable_outputs(tasks_output)
+        futures.append((
+            pool.submit(render_analysis_report, os.path.join(output_dir, f"analysis_report_{timestamp}.pdf"), outputs),
+            pool.submit(render_cv, os.path.join(output_dir, f"updated_cv_{timestamp}.pdf"), outputs),
+        ))
+
+    results = []
+    for (_, _, timestamp), (analysis_future, cv_future) in zip(jobs, futures):
+        try:
+            results.append((analysis_future.result(), cv_future.result()))
+        except Exception as e:
+            print(f"Error in PDF generation for {timestamp}: {str(e)}")
+            traceback.print_exc()
+            results.append(None)
+    return results
+
 def save_analysis_results(output_dir: str, tasks_output: list, timestamp: str):
     """Save raw analysis results to a text file."""
     results_file = os.path.join(output_dir, f"analysis_results_{timestamp}.txt")
     with open(results_file, "w", encoding='utf-8') as f:
         for i, output in enumerate(tasks_output):
             f.write(f"=== Task {i+1} Output ===\n")
-            f.write(str(output) + "\n\n")
+            f.write((output_text(output) if output is not None else "(not run)") + "\n\n")
     return results_file
 
-def create_agent_pdf_report(output_dir: str, analysis_data: dict, cv_data: dict, timestamp: str):
+def render_sections_pdf(pdf_path: str, sections: list) -> str:
+    """Draw (title, content) sections into a new PDF at `pdf_path` and return the path."""
+    c = canvas.Canvas(pdf_path, pagesize=letter)
+    layout = TextLayout(c)
+    for title, content in sections:
+        write_section_with_content(layout, title, content)
+    c.save()
+    return pdf_path
+
+def create_agent_pdf_report(output_dir: str, analysis_data: AnalysisReportData, cv_data: CVData, timestamp: str,
+                            parallel: bool = False):
     """
     Create professional PDF reports using the agent's formatted data.
     
     Args:
         output_dir (str): Directory to save the PDFs
-        analysis_data (dict): Formatted analysis data from previous tasks
-        cv_data (dict): Formatted CV data from previous tasks
+        analysis_data (AnalysisReportData): Typed analysis data from previous tasks (see
+            `report_data_from_outputs`); a dict with the same keys is also accepted
+        cv_data (CVData): Typed CV data from previous tasks, or a dict with the same keys
         timestamp (str): Timestamp for file naming
+        parallel (bool): Draw both PDFs at the same time in the render process pool
     
     Returns:
         tuple: Paths to the generated analysis report and CV PDFs
     """
+    # Models expose their fields the same way as the dict form
+    if isinstance(analysis_data, BaseModel):
+        analysis_data = dict(analysis_data)
+    if isinstance(cv_data, BaseModel):
+        cv_data = dict(cv_data)
+
     # Analysis Report
     analysis_pdf_path = os.path.join(output_dir, f"analysis_report_{timestamp}.pdf")
-    c = canvas.Canvas(analysis_pdf_path, pagesize=letter)
-    y = 750
-    
-    # Write Analysis Report sections
     sections = [
         ("Role Classification", analysis_data.get('role_classification', {})),
         ("Job Requirements", analysis_data.get('requirements', {})),
@@ -399,20 +524,8 @@ def create_agent_pdf_report(output_dir: str, analysis_data: dict, cv_data: dict,
         ("Interview Guide", analysis_data.get('interview_guide', {}))
     ]
     
-    for title, content in sections:
-        y = write_section_with_content(c, y, title, content)
-        if y < 100:  # Start new page if needed
-            c.showPage()
-            y = 750
-    
-    c.save()
-    
     # Updated CV
     cv_pdf_path = os.path.join(output_dir, f"updated_cv_{timestamp}.pdf")
-    c = canvas.Canvas(cv_pdf_path, pagesize=letter)
-    y = 750
-    
-    # Write CV sections
     cv_sections = [
         ("Professional Summary", cv_data.get('summary', {})),
         ("Key Skills & Competencies", cv_data.get('skills', {})),
@@ -420,32 +533,34 @@ def create_agent_pdf_report(output_dir: str, analysis_data: dict, cv_data: dict,
         ("Education & Certifications", cv_data.get('education', {}))
     ]
     
-    for title, content in cv_sections:
-        y = write_section_with_content(c, y, title, content)
-        if y < 100:  # Start new page if needed
-            c.showPage()
-            y = 750
-    
-    c.save()
-    
-    return analysis_pdf_path, cv_pdf_path
+    if not parallel:
+        return render_sections_pdf(analysis_pdf_path, sections), render_sections_pdf(cv_pdf_path, cv_sections)
+
+    pool = get_render_pool()
+    analysis_future = pool.submit(render_sections_pdf, analysis_pdf_path, sections)
+    cv_future = pool.submit(render_sections_pdf, cv_pdf_path, cv_sections)
+    return analysis_future.result(), cv_future.result()
 
-def write_section_with_content(c, y, title, content):
+def write_section_with_content(layout, title, content):
     """Helper function to write a section with its content"""
-    y = write_section_header(c, y, title)
+    write_section_header(layout, title)
+    
+    if isinstance(content, BaseModel):
+        # One entry per filled-in field, labelled with the field name
+        content = {name.replace('_', ' ').capitalize(): value for name, value in content if value}
     
     if isinstance(content, dict):
         for key, value in content.items():
-            y = write_content(c, y, f"{key}:", indent=90)
+            write_content(layout, f"{key}:", indent=90)
             if isinstance(value, list):
                 for item in value:
-                    y = write_content(c, y, f"• {item}", indent=110)
+                    write_content(layout, f"• {item}", indent=110)
             else:
-                y = write_content(c, y, f"• {value}", indent=110)
+                write_content(layout, f"• {value}", indent=110)
     elif isinstance(content, list):
         for item in content:
-            y = write_content(c, y, f"• {item}", indent=90)
-    else:
-        y = write_content(c, y, str(content), indent=90)
+            write_content(layout, f"• {item}", indent=90)
+    elif content is not None:
+        write_content(layout, str(content), indent=90)
     
-    return y - 20
\ No newline at end of file
+    layout.space(20)
\ No newline at end of file
@@ -1,13 +1,24 @@
 import os
-from crewai import Task, Crew
+import contextvars
+import hashlib
 from dotenv import load_dotenv
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import traceback
+import warnings
+from functools import partial
 
 # Import from our modules
-from crew_definition import agents
-from logging_config import generate_pdf_report, save_analysis_results
+from cache import file_sha256, get_cache
+from checkpoint import RunCheckpoint, new_run_id
+from context_budget import budget_context
+from fusion import fuse_tasks
+from instrumentation import Tracer, current_tracer, span
+from logging_config import RENDERED_TASKS, generate_pdf_report, save_analysis_results
+from scheduler import build_dependency_graph, consumed_tasks, run_task_graph
+from schemas import (CVOptimization, FinalReview, FitAnalysis, InterviewGuide, JobRequirements, ReportPlan,
+                     RoleClassification, SkillsMatrix, SkillsProfile)
 
 # Load environment variables
 load_dotenv()
@@ -16,13 +27,91 @@ print("Starting CV Writer script...")
 
 # Set OpenAI API key directly
 os.environ["OPENAI_API_KEY"] = "OPENAI_API_KEY"
-os.environ["OPENAI_MODEL_NAME"] = "gpt-4"
+# Default strong-tier model; each agent's model is routed by crew_definition.MODEL_TIERS
+os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4")
 
 print("Environment variables set...")
 
-def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
+# Longest pre-fetched document embedded into a task prompt
+PREFETCH_MAX_CHARS = int(os.getenv("PREFETCH_MAX_CHARS", 24000))
+STAGE_CACHE_MAX_BYTES = int(os.getenv("STAGE_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+# Age after which a stored task output is recomputed even if its inputs look unchanged; 0 keeps them forever
+STAGE_CACHE_TTL = float(os.getenv("STAGE_CACHE_TTL", 7 * 24 * 60 * 60))
+
+def prefetch_inputs(jd_url: str, resume_path: str) -> dict:
+    """
+    Scrape the job description and extract the resume once, before any agent runs.
+
+    Both documents are fetched concurrently through the cached tools. A document that
+    can't be fetched is returned as None so its tasks fall back to using the tools.
+
+    Returns:
+        dict: `jd_text` and `resume_text`
+    """
+    from crew_definition import get_pdf_reader_tool, get_scraper_tool
+
+    pdf_reader_tool, scraper_tool = get_pdf_reader_tool(), get_scraper_tool()
+
+    def fetch_jd():
+        try:
+            return scraper_tool._run(website_url=jd_url)
+        except Exception as e:
+            print(f"Could not pre-fetch job description: {str(e)}")
+            return None
+
+    def fetch_resume():
+        text = pdf_reader_tool._run(str(resume_path))
+        if text.startswith("Error"):
+            print(f"Could not pre-fetch resume: {text}")
+            return None
+        return text
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        jd_future = pool.submit(contextvars.copy_context().run, fetch_jd)
+        resume_future = pool.submit(contextvars.copy_context().run, fetch_resume)
+        return {"jd_text": jd_future.result(), "resume_text": resume_future.result()}
+
+def jd_fingerprint(jd_url: str, jd_text: str = None):
+    """
+    Content hash of the job description, so reused task outputs follow changes to the posting.
+
+    Hashes the pre-fetched text if there is one, otherwise the page as the agents' scraper
+    tool would see it (through the same cache). Returns None if the page can't be fetched.
+    """
+    if jd_text is None:
+        from crew_definition import get_scraper_tool
+
+        try:
+            jd_text = get_scraper_tool()._run(website_url=jd_url)
+        except Exception as e:
+            print(f"Could not fetch job description to fingerprint it: {str(e)}")
+            return None
+    return hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+def source_block(label: str, source: str, text: str) -> str:
+    """Format a pre-fetched document for inclusion at the end of a task description."""
+    if not text:
+        return ""
+    if len(text) > PREFETCH_MAX_CHARS:
+        text = text[:PREFETCH_MAX_CHARS] + "\n[Truncated]"
+    return (
+        f"\n\nThe {label} from {source} is included below; use it directly instead of calling a tool.\n"
+        f"--- BEGIN {label.upper()} ---\n{text}\n--- END {label.upper()} ---"
+    )
+
+def create_tasks(jd_url: str, resume_path: str, agents: list = None, jd_text: str = None,
+                 resume_text: str = None) -> list:
+    # crewai and the default agents are loaded on first use so importing this module stays fast
+    from crewai import Task
+    import crew_definition
+
+    agents = agents or crew_definition.agents
     tasks = []
     
+    # Pre-fetched documents, empty when the agents have to fetch them with their tools
+    jd_block = source_block("job description", jd_url, jd_text)
+    resume_block = source_block("resume", resume_path, resume_text)
+    
     # Task 1: Job Type Analysis
     task1 = Task(
         description=(
@@ -30,10 +119,11 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Role Category: IT/Product/Hybrid (with % split)\n"
             "2. Primary Technical Requirements (ranked)\n"
             "3. Primary Business Requirements (ranked)\n"
-            "4. Domain Expertise Needs (prioritized)\n"
-            "Output Format: JSON with categories and scores"
+            "4. Domain Expertise Needs (prioritized)"
+            f"{jd_block}"
         ),
-        expected_output="JSON containing role category, technical requirements, business requirements, and domain expertise",
+        expected_output="Role classification with the technical/business split and ranked requirements",
+        output_pydantic=RoleClassification,
         agent=agents[0]  # job_type_analyzer
     )
     
@@ -44,12 +134,13 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Must-have skills (ranked by importance)\n"
             "2. Experience requirements (with metrics)\n"
             "3. Key performance expectations\n"
-            "4. Technical vs business skill ratio\n"
-            "Output Format: Structured list with priority scores"
+            "4. Technical vs business skill ratio"
+            f"{jd_block}"
         ),
-        expected_output="Structured list of job requirements with priority scores and metrics",
+        expected_output="Job requirements with priority scores and metrics",
+        output_pydantic=JobRequirements,
         agent=agents[1],  # jd_scraper
-        dependencies=[task1]
+        context=[task1]
     )
     
     # Task 3: Resume Analysis
@@ -60,9 +151,11 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "2. Business capabilities (with evidence)\n"
             "3. Project metrics and impact\n"
             "4. Leadership experience metrics\n"
-            "Output Format: JSON skills matrix"
+            "5. Education and certifications"
+            f"{resume_block}"
         ),
-        expected_output="JSON skills matrix with technical skills, business capabilities, project metrics, and leadership metrics",
+        expected_output="Skills matrix with technical skills, business capabilities, project and leadership metrics",
+        output_pydantic=SkillsMatrix,
         agent=agents[2]  # resume_analyser
     )
     
@@ -73,12 +166,12 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Overall match score (0-100)\n"
             "2. Technical skills match (%)\n"
             "3. Business skills match (%)\n"
-            "4. Experience level match (%)\n"
-            "Output Format: JSON with match scores"
+            "4. Experience level match (%)"
         ),
-        expected_output="JSON containing overall match score and specific skill match percentages",
+        expected_output="Overall match score and skill match percentages",
+        output_pydantic=FitAnalysis,
         agent=agents[3],  # fit_analyzer
-        dependencies=[task1, task2, task3]
+        context=[task1, task2, task3]
     )
     
     # Task 5: CV Optimization
@@ -88,12 +181,12 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Highlight matching skills (prioritized)\n"
             "2. Quantify relevant achievements\n"
             "3. Add missing keywords\n"
-            "4. Restructure for role alignment\n"
-            "Output Format: Structured CV content"
+            "4. Restructure for role alignment"
         ),
-        expected_output="Structured CV content with optimized skills, achievements, and keywords",
+        expected_output="Optimized CV content: summary, skills, achievements, keywords and experience",
+        output_pydantic=CVOptimization,
         agent=agents[4],  # cv_updater
-        dependencies=[task2, task4]
+        context=[task2, task4]
     )
     
     # Task 6: Skills Profile
@@ -103,12 +196,13 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Map skills to requirements (with scores)\n"
             "2. Add missing critical skills\n"
             "3. Optimize keyword density\n"
-            "4. Format for ATS scanning\n"
-            "Output Format: ATS-friendly skills section"
+            "4. Format for ATS scanning"
+            f"{jd_block}{resume_block}"
         ),
-        expected_output="ATS-optimized skills profile with mapped requirements and keyword optimization",
+        expected_output="ATS-optimized skills profile with mapped requirements and keywords",
+        output_pydantic=SkillsProfile,
         agent=agents[5],  # cv_content_optimizer
-        dependencies=[task4, task5]
+        context=[task4, task5]
     )
     
     # Task 7: Initial PDF Generation
@@ -118,12 +212,12 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "1. Analysis report with metrics\n"
             "2. Updated CV with optimized format\n"
             "3. Skills matrix visualization\n"
-            "4. Recommendations summary\n"
-            "Output Format: Two PDFs (report and CV)"
+            "4. Recommendations summary"
         ),
-        expected_output="Two PDF files: analysis report and updated CV",
+        expected_output="Section plan for the analysis report and CV, with recommendations",
+        output_pydantic=ReportPlan,
         agent=agents[6],  # pdf_generator
-        dependencies=[task1, task2, task3, task4, task5, task6]
+        context=[task1, task2, task3, task4, task5, task6]
     )
     
     # Task 8: Interview Preparation
@@ -136,9 +230,10 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "4. Suggested answer frameworks\n"
             "5. Key talking points based on resume-job alignment"
         ),
-        expected_output="Comprehensive interview preparation guide with questions and answer frameworks",
+        expected_output="Interview questions by type, answer frameworks and talking points",
+        output_pydantic=InterviewGuide,
         agent=agents[7],  # interview_prep_agent
-        dependencies=[task1, task2, task3, task4]
+        context=[task1, task2, task3, task4]
     )
     
     # Task 9: Final PDF Report Generation
@@ -155,12 +250,12 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
             "   - Professional Summary\n"
             "   - Optimized Skills Section\n"
             "   - Relevant Experience\n"
-            "   - Achievements\n"
-            "Format: Professional PDFs with clear sections, proper formatting, and ATS-friendly layout"
+            "   - Achievements"
         ),
-        expected_output="Two professional PDF documents: Analysis Report and Updated CV",
+        expected_output="Executive summary of the candidate's fit and final recommendations",
+        output_pydantic=FinalReview,
         agent=agents[8],  # pdf_report_generator
-        dependencies=[task1, task2, task3, task4, task5, task6, task7, task8]
+        context=[task1, task2, task3, task4, task5, task6, task7, task8]
     )
     
     # Add all tasks to the list in order
@@ -168,57 +263,247 @@ def create_tasks(jd_url: str, resume_path: str) -> list[Task]:
     
     return tasks
 
-def analyze_job_and_resume(jd_url: str, resume_path: str):
-    try:
-        resume_file = pathlib.Path(resume_path)
-        if not resume_file.exists():
-            raise FileNotFoundError(f"Resume file not found at: {resume_path}")
-        
-        print("Starting analysis pipeline...")
-        
-        tasks = create_tasks(jd_url, str(resume_file))
+def run_pipeline(jd_url: str, resume_path: str, execution_mode: str = "sequential",
+                 max_concurrency: int = 4, agents: list = None, prefetch: bool = False,
+                 llm_cache_mode: str = None, incremental: bool = False, checkpoint: RunCheckpoint = None,
+                 context_budget: int = None, lean: bool = False, fused: bool = False,
+                 fit_scoring: str = None):
+    """
+    Execute the analysis tasks for one job posting and resume.
+
+    Args:
+        jd_url (str): URL of the job description
+        resume_path (str): Path to the candidate's resume PDF
+        execution_mode (str): "sequential" runs the tasks through the Crew one after another,
+            "parallel" runs every task whose dependencies are done at the same time
+        max_concurrency (int): Maximum number of tasks in flight in parallel mode
+        agents (list): Agent set to run the tasks with, defaults to the shared module agents
+        prefetch (bool): Scrape the job description and read the resume up front and put their
+            text into the task prompts, saving the agents a tool round trip
+        llm_cache_mode (str): "off", "record" or "replay" (see llm_client); defaults to the
+            LLM_CACHE_MODE environment variable
+        incremental (bool): Reuse the stored output of every task whose prompt, inputs (including
+            the job description's content) and upstream outputs are unchanged since an earlier run,
+            and that is younger than STAGE_CACHE_TTL, recomputing only the rest
+        checkpoint (RunCheckpoint): Log every task's output as soon as it completes. When the
+            checkpoint already holds outputs of an interrupted run, those tasks are skipped and
+            the run resumes from the first task that never finished; the job URL, resume and
+            options must then match the checkpointed ones
+        context_budget (int): Hand each task only the upstream fields it needs (see
+            context_budget.CONTEXT_FIELDS), in at most this many characters; None passes
+            every upstream output whole
+        lean (bool): Skip the tasks whose output reaches neither PDF report, directly or
+            through another task (logging_config.RENDERED_TASKS); their outputs are None
+        fused (bool): Answer each group of closely related tasks in fusion.FUSION_GROUPS with
+            one LLM call, split back into the usual per-task outputs
+        fit_scoring (str): "llm" has the fit analyzer estimate Task 4's scores, "local" computes
+            them with fit_scoring.score_fit instead of an LLM call, "explain" computes them and has
+            the fit analyzer only explain the gaps; defaults to the FIT_SCORING_MODE environment variable
+
+    Returns:
+        The crew result exposing `tasks_output`. Errors are raised to the caller.
+    """
+    if execution_mode not in ("sequential", "parallel"):
+        raise ValueError(f"Unknown execution mode: {execution_mode}")
+
+    resume_file = pathlib.Path(resume_path)
+    if not resume_file.exists():
+        raise FileNotFoundError(f"Resume file not found at: {resume_path}")
+
+    import crew_definition
+    from crewai import Crew
+    from fit_scoring import FIT_TASK, fit_runners
+    from llm_client import configure_llms
+
+    agents = configure_llms(agents or crew_definition.agents, cache_mode=llm_cache_mode)
+    sources = {}
+    if prefetch:
+        print("Pre-fetching job description and resume...")
+        sources = prefetch_inputs(jd_url, str(resume_file))
+    tasks = create_tasks(jd_url, str(resume_file), agents=agents, **sources)
+    resume_sha = file_sha256(str(resume_file))
+    
+    completed = {}
+    if checkpoint is not None:
+        options = dict(execution_mode=execution_mode, prefetch=prefetch, llm_cache_mode=llm_cache_mode,
+                       incremental=incremental, context_budget=context_budget, lean=lean, fused=fused,
+                       fit_scoring=fit_scoring)
+        if checkpoint.exists():
+            checkpoint.check_resumable(jd_url, resume_sha, **options)
+            completed = checkpoint.completed_outputs(tasks)
+            print(f"Resuming run {checkpoint.run_id}: {len(completed)}/{len(tasks)} tasks already completed")
+        else:
+            checkpoint.start(jd_url, str(resume_file), **options)
+    
+    skip, runners = set(), {}
+    if lean:
+        skip = set(range(len(tasks))) - consumed_tasks(build_dependency_graph(tasks), RENDERED_TASKS)
+        print(f"Lean mode: skipping tasks {', '.join(str(i + 1) for i in sorted(skip))}, whose output no report uses")
+    if fused:
+        runners = fuse_tasks(tasks, build_dependency_graph(tasks))
+        print("Fused mode: related tasks are answered together with one LLM call")
+    scorers = fit_runners(tasks, fit_scoring)
+    if scorers:
+        runners.update(scorers)
+        print(f"Fit scoring: Task 4's scores are computed locally ({scorers[FIT_TASK].mode} mode)")
+
+    if execution_mode == "parallel" or incremental or completed or context_budget or skip or runners:
+        # Incremental and resumed runs go through the task graph so finished stages can be skipped,
+        # budgeted runs because there the context handed to each task is built by us, not by the Crew,
+        # lean runs so the outputs keep their task positions, and fused and locally scored runs
+        # because their tasks are executed by runners instead of the agents
+        concurrency = max_concurrency if execution_mode == "parallel" else 1
+        stage_cache, fingerprints = None, {str(resume_file): resume_sha}
+        if incremental:
+            jd_sha = jd_fingerprint(jd_url, sources.get("jd_text"))
+            if jd_sha is None:
+                print("Incremental mode: job description unavailable, so no stored outputs are reused")
+            else:
+                # The URL is named in the job analysis prompts; later tasks follow through their inputs
+                fingerprints[jd_url] = jd_sha
+                stage_cache = get_cache("stages", max_bytes=STAGE_CACHE_MAX_BYTES)
+        print(f"Executing analysis pipeline on the task graph (max {concurrency} tasks at once)...")
+        for agent in agents:
+            # Drop the Crew of an earlier sequential run, whose task_callback would fire again
+            agent.crew = None
+        return run_task_graph(tasks, max_concurrency=concurrency, stage_cache=stage_cache,
+                              stage_ttl=STAGE_CACHE_TTL, fingerprints=fingerprints, completed=completed,
+                              on_complete=checkpoint.record if checkpoint is not None else None,
+                              context_builder=partial(budget_context, budget=context_budget) if context_budget else None,
+                              skip=skip, runners=runners)
+
+    crew_options = {}
+    if checkpoint is not None:
+        crew_options["task_callback"] = task_checkpointer(checkpoint, tasks)
+    with warnings.catch_warnings():
+        # crewai warns that closures can't be serialized into its own checkpoints, which we don't use
+        warnings.filterwarnings("ignore", message=".*callbacks cannot be serialized")
         crew = Crew(
             agents=agents,
             tasks=tasks,
             verbose=True,
-            process_type="sequential"  # Ensure sequential processing
+            process_type="sequential",  # Ensure sequential processing
+            **crew_options
         )
+    
+    print("Executing analysis pipeline...")
+    started = datetime.now()
+    result = crew.kickoff()
+    record_task_spans(tasks, started)
+    return result
+
+def task_checkpointer(checkpoint: RunCheckpoint, tasks: list):
+    """Crew `task_callback` that appends each finished task's output to `checkpoint`."""
+    index_by_description = {task.description: i for i, task in enumerate(tasks)}
+
+    def record(output):
+        checkpoint.record(index_by_description[output.description], output)
+
+    return record
+
+def record_task_spans(tasks: list, started: datetime):
+    """Add task spans to the active trace from the start/end times the Crew stamped on each task."""
+    tracer = current_tracer()
+    if tracer is None:
+        return
+    previous_end = started
+    for i, task in enumerate(tasks):
+        start, end = getattr(task, "start_time", None), getattr(task, "end_time", None)
+        if start is None or end is None:
+            continue
+        # In a sequential crew a task waits for everything before it
+        queue_time = max(0.0, (start - previous_end).total_seconds())
+        tracer.record(f"Task {i + 1}", "task", start.timestamp(), end.timestamp(), queue_time=queue_time,
+                      agent=task.agent.role)
+        previous_end = end
+
+def save_outputs(tasks_output: list, output_dir: str, timestamp: str, parallel_render: bool = False) -> dict:
+    """
+    Write the raw results file and both PDF reports for a finished run.
+
+    With `parallel_render`, the two PDFs are drawn concurrently in the shared render
+    process pool, which also lets renders from concurrent runs use every core.
+
+    When a tracer is active, its spans are also written to `trace_<timestamp>.json` and a
+    timing summary is printed.
+
+    Returns:
+        dict: Paths of the written `results_file`, `analysis_pdf`, `cv_pdf` and `trace_file`;
+        an entry is None when writing it failed
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = {"results_file": None, "analysis_pdf": None, "cv_pdf": None, "trace_file": None}
+    
+    try:
+        # Debug print to see what we're getting
+        print("\nTask outputs received:")
+        for i, output in enumerate(tasks_output):
+            print(f"Task {i + 1}: {'Available' if output else 'Not available'}")
+        
+        # Save raw analysis results
+        with span("save_analysis_results", "render"):
+            artifacts["results_file"] = save_analysis_results(output_dir, tasks_output, timestamp)
+        print(f"\nRaw analysis results saved to: {artifacts['results_file']}")
+        
+        # Generate PDFs using the helper function
+        try:
+            print("\nGenerating PDF reports...")
+            with span("generate_pdf_report", "render"):
+                analysis_pdf, cv_pdf = generate_pdf_report(
+                    output_dir=output_dir,
+                    tasks_output=tasks_output,
+                    timestamp=timestamp,
+                    parallel=parallel_render
+                )
+            artifacts["analysis_pdf"], artifacts["cv_pdf"] = analysis_pdf, cv_pdf
+            print(f"Analysis report generated: {analysis_pdf}")
+            print(f"Updated CV generated: {cv_pdf}")
+        except Exception as pdf_error:
+            print(f"Error during PDF generation: {str(pdf_error)}")
+            traceback.print_exc()
         
-        print("Executing analysis pipeline...")
-        result = crew.kickoff()
+    except Exception as e:
+        print(f"Error in file operations: {str(e)}")
+        traceback.print_exc()
+    
+    tracer = current_tracer()
+    if tracer is not None:
+        artifacts["trace_file"] = tracer.write_json(os.path.join(output_dir, f"trace_{timestamp}.json"))
+        print(f"\nTrace written to: {artifacts['trace_file']}")
+        print(tracer.summary_table())
+    
+    return artifacts
+
+def analyze_job_and_resume(jd_url: str = None, resume_path: str = None, execution_mode: str = "sequential",
+                           max_concurrency: int = 4, prefetch: bool = False, llm_cache_mode: str = None,
+                           incremental: bool = False, resume_run_id: str = None, context_budget: int = None,
+                           lean: bool = False, fused: bool = False, fit_scoring: str = None):
+    """
+    Run the full analysis pipeline for one job posting and resume and save its reports.
+
+    Every task's output is checkpointed under the run ID (see `new_run_id`) as soon as
+    it completes. Pass `resume_run_id` to continue an interrupted run from its first
+    incomplete task; the job URL and resume path are then taken from the checkpoint.
+
+    See `run_pipeline` for the other arguments. Returns the crew result, or None on failure.
+    """
+    try:
+        print("Starting analysis pipeline...")
+        timestamp = resume_run_id or new_run_id()
+        checkpoint = RunCheckpoint(timestamp)
+        if resume_run_id:
+            header, _ = checkpoint.load()
+            jd_url, resume_path = header["jd_url"], header["resume_path"]
         
-        if result and hasattr(result, 'tasks_output'):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = "Job_Application_Analysis"
-            os.makedirs(output_dir, exist_ok=True)
+        with Tracer(run_id=timestamp).activate():
+            result = run_pipeline(jd_url, resume_path, execution_mode=execution_mode,
+                                  max_concurrency=max_concurrency, prefetch=prefetch,
+                                  llm_cache_mode=llm_cache_mode, incremental=incremental,
+                                  checkpoint=checkpoint, context_budget=context_budget, lean=lean,
+                                  fused=fused, fit_scoring=fit_scoring)
             
-            try:
-                # Debug print to see what we're getting
-                print("\nTask outputs received:")
-                for i, output in enumerate(result.tasks_output):
-                    print(f"Task {i + 1}: {'Available' if output else 'Not available'}")
-                
-                # Save raw analysis results
-                results_file = save_analysis_results(output_dir, result.tasks_output, timestamp)
-                print(f"\nRaw analysis results saved to: {results_file}")
-                
-                # Generate PDFs using the helper function
-                try:
-                    print("\nGenerating PDF reports...")
-                    analysis_pdf, cv_pdf = generate_pdf_report(
-                        output_dir=output_dir,
-                        tasks_output=result.tasks_output,
-                        timestamp=timestamp
-                    )
-                    print(f"Analysis report generated: {analysis_pdf}")
-                    print(f"Updated CV generated: {cv_pdf}")
-                except Exception as pdf_error:
-                    print(f"Error during PDF generation: {str(pdf_error)}")
-                    traceback.print_exc()
-                
-            except Exception as e:
-                print(f"Error in file operations: {str(e)}")
-                traceback.print_exc()
+            if result and hasattr(result, 'tasks_output'):
+                save_outputs(result.tasks_output, "Job_Application_Analysis", timestamp)
             
         return result
         
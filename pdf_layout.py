@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+TOP_MARGIN = 750
+BOTTOM_MARGIN = 50
+RIGHT_MARGIN = 50
+
+
+@lru_cache(maxsize=65536)
+def text_width(text: str, font: str, size: float) -> float:
+    """Rendered width of `text`; cached because reports repeat the same words constantly."""
+    return stringWidth(text, font, size)
+
+
+def wrap_text(text: str, font: str, size: float, max_width: float) -> list[str]:
+    """
+    Break one paragraph into lines no wider than `max_width` in a single pass.
+
+    Words are placed greedily using cached word widths, so the cost is linear in the
+    length of the text. Words wider than a whole line are split by character, adding up
+    the cached character widths rather than measuring every growing prefix.
+    """
+    space = text_width(" ", font, size)
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in text.split():
+        width = text_width(word, font, size)
+        if width > max_width:
+            # Flush, then hard-break the oversized word across as many lines as it needs
+            if current:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            piece, piece_width = [], 0.0
+            for char in word:
+                char_width = text_width(char, font, size)
+                if piece and piece_width + char_width > max_width:
+                    lines.append("".join(piece))
+                    piece, piece_width = [], 0.0
+                piece.append(char)
+                piece_width += char_width
+            current, current_width = ["".join(piece)], piece_width
+            continue
+        needed = width if not current else current_width + space + width
+        if needed <= max_width:
+            current.append(word)
+            current_width = needed
+        else:
+            lines.append(" ".join(current))
+            current, current_width = [word], width
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+class TextLayout:
+    """
+    Flows text down a reportlab canvas, wrapping lines and starting new pages as needed.
+
+    Lines are drawn as soon as they are laid out and nothing is kept per line, so
+    memory stays flat however long the content is.
+    """
+
+    def __init__(self, c, top: float = TOP_MARGIN, bottom: float = BOTTOM_MARGIN,
+                 right: float = PAGE_WIDTH - RIGHT_MARGIN):
+        self.c = c
+        self.top = top
+        self.bottom = bottom
+        self.right = right
+        self.y = top
+
+    def new_page(self):
+        self.c.showPage()
+        self.y = self.top
+
+    def ensure_space(self, height: float):
+        """Start a new page unless `height` points still fit above the bottom margin."""
+        if self.y - height < self.bottom:
+            self.new_page()
+
+    def space(self, amount: float):
+        self.y -= amount
+
+    def write(self, text: str, indent: float = 90, font: str = "Helvetica", size: float = 12,
+              leading: float = 15, bullet: str = None):
+        """
+        Write `text` starting at x=`indent`, wrapped to the right margin.
+
+        Each newline starts a new paragraph. With a `bullet`, it is drawn before the first
+        line of every paragraph and continuation lines are indented to line up with the text.
+        """
+        prefix = f"{bullet} " if bullet else ""
+        hanging = text_width(prefix, font, size) if prefix else 0.0
+        for paragraph in str(text).split("\n"):
+            if not paragraph.strip():
+                continue
+            lines = wrap_text(paragraph, font, size, self.right - indent - hanging)
+            for i, line in enumerate(lines):
+                self.ensure_space(leading)
+                self.c.setFont(font, size)
+                if i == 0 and prefix:
+                    self.c.drawString(indent, self.y, prefix + line)
+                else:
+                    self.c.drawString(indent + hanging, self.y, line)
+                self.y -= leading
+
+    def write_pair(self, key: str, value: str, key_indent: float = 70, value_indent: float = 200,
+                   size: float = 12, leading: float = 15):
+        """Write a bold label with its value in a second column; long values wrap inside that column."""
+        lines = wrap_text(str(value), "Helvetica", size, self.right - value_indent) or [""]
+        self.ensure_space(leading)
+        self.c.setFont("Helvetica-Bold", size)
+        self.c.drawString(key_indent, self.y, str(key))
+        for line in lines:
+            self.ensure_space(leading)
+            self.c.setFont("Helvetica", size)
+            self.c.drawString(value_indent, self.y, line)
+            self.y -= leading
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from fit_scoring import words
+
+# Postings handed on to the full agent pipeline
+PRESCREEN_TOP_K = int(os.getenv("PRESCREEN_TOP_K", 10))
+
+
+def load_corpus(corpus_path: str) -> list[dict]:
+    """
+    Read locally stored job postings from a CSV or JSONL file.
+
+    Each posting needs a `jd_url` (passed on to the pipeline) and its `text`; `id` and
+    `title` are optional. Postings without an id are numbered in file order.
+    """
+    if corpus_path.lower().endswith(".jsonl"):
+        with open(corpus_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(corpus_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    postings = []
+    for i, row in enumerate(rows, start=1):
+        jd_url = (row.get("jd_url") or "").strip()
+        text = row.get("text") or ""
+        if not jd_url or not text.strip():
+            raise ValueError(f"Corpus row {i} needs both jd_url and text")
+        postings.append({
+            "id": str(row.get("id") or f"posting_{i:05d}").strip(),
+            "jd_url": jd_url,
+            "title": (row.get("title") or "").strip(),
+            "text": text,
+        })
+
+    ids = [posting["id"] for posting in postings]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Corpus ids must be unique")
+    return postings
+
+
+class PostingIndex:
+    """
+    TF-IDF vectors of a corpus of postings, stored as a CSR sparse matrix.
+
+    Rows are postings and columns the corpus vocabulary (see `fit_scoring.words`); each
+    row holds the L2-normalized sublinear TF-IDF weights of the words its posting uses,
+    with IDF taken over the corpus. `similarities` scores a query against every posting
+    with one sparse matrix-vector product.
+    """
+
+    def __init__(self, documents: list[str]):
+        # Numbers each new word on first lookup
+        vocabulary = defaultdict()
+        vocabulary.default_factory = vocabulary.__len__
+        ids, lengths = [], []
+        for text in documents:
+            row = list(map(vocabulary.__getitem__, words(text)))
+            ids.extend(row)
+            lengths.append(len(row))
+        self.vocabulary = dict(vocabulary)
+        self.shape = (len(documents), len(self.vocabulary))
+
+        # Count every (posting, word) pair with one sort; the sorted pairs are the CSR entries in order
+        width = max(self.shape[1], 1)
+        occurrences = np.repeat(np.arange(self.shape[0], dtype=np.int64), lengths) * width + np.array(ids, dtype=np.int64)
+        entries, counts = np.unique(occurrences, return_counts=True)
+        # Row of every stored entry, so row-wise sums are a single bincount
+        self._rows = entries // width
+        self.indices = entries % width
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self._rows, minlength=self.shape[0]))])
+        document_frequency = np.bincount(self.indices, minlength=self.shape[1])
+        self.idf = np.log((1 + self.shape[0]) / (1 + document_frequency)) + 1
+        data = np.log1p(counts) * self.idf[self.indices]
+        norms = np.sqrt(np.bincount(self._rows, weights=data ** 2, minlength=self.shape[0]))
+        self.data = data / np.where(norms == 0, 1, norms)[self._rows]
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """Dense, normalized TF-IDF vector of `text`; words no posting uses can't match and are dropped."""
+        vector = np.zeros(self.shape[1])
+        np.add.at(vector, np.array([self.vocabulary[word] for word in words(text) if word in self.vocabulary],
+                                   dtype=np.int64), 1)
+        vector = np.log1p(vector) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of `text` to every posting, in corpus order."""
+        query = self.query_vector(text)
+        return np.bincount(self._rows, weights=self.data * query[self.indices], minlength=self.shape[0])
+
+
+def prescreen(resume_path: str, postings: list[dict], top_k: int = PRESCREEN_TOP_K,
+              min_score: float = 0.0) -> list[dict]:
+    """
+    Rank `postings` by textual similarity to the resume and keep the best `top_k`.
+
+    The resume is extracted once through the shared PDFReaderTool (and its cache), then
+    compared against the whole corpus in one sparse matrix operation, so thousands of
+    postings are screened in seconds without any LLM call.
+
+    Args:
+        resume_path (str): Path to the candidate's resume PDF
+        postings (list): Postings as returned by `load_corpus`
+        top_k (int): Number of postings to keep
+        min_score (float): Drop postings less similar than this, even within the top k;
+            postings sharing no word with the resume are always dropped
+
+    Returns:
+        list[dict]: The kept postings without their text, best first, with `score` and `rank`
+    """
+    from crew_definition import get_pdf_reader_tool
+
+    resume_text = get_pdf_reader_tool()._run(str(resume_path))
+    if resume_text.startswith("Error"):
+        raise ValueError(f"Could not read resume: {resume_text}")
+
+    start = time.perf_counter()
+    index = PostingIndex([posting["text"] for posting in postings])
+    scores = index.similarities(resume_text)
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    print(f"Pre-screened {len(postings)} postings ({index.shape[1]} distinct words) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    ranked = []
+    for rank, i in enumerate(order, start=1):
+        if scores[i] <= 0 or scores[i] < min_score:
+            break
+        posting = {key: value for key, value in postings[i].items() if key != "text"}
+        ranked.append(dict(posting, score=round(float(scores[i]), 4), rank=rank))
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-screen one resume against a corpus of job postings and analyze the best matches")
+    parser.add_argument("resume_path", help="Resume PDF of the candidate")
+    parser.add_argument("corpus", help="CSV or JSONL file with jd_url and text columns")
+    parser.add_argument("--top-k", type=int, default=PRESCREEN_TOP_K, help="Postings passed on to the full analysis")
+    parser.add_argument("--min-score", type=float, default=0.0,
+                        help="Minimum similarity (0-1) for a posting to be passed on")
+    parser.add_argument("--screen-only", action="store_true", help="Write the ranking without analyzing the postings")
+    parser.add_argument("--output-dir", default="Job_Application_Analysis")
+    parser.add_argument("--workers", type=int, default=4, help="Postings analyzed at the same time")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], default="sequential",
+                        help="Task execution mode inside each analysis")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Tasks in flight per analysis in parallel mode")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Put the job description and resume text straight into the task prompts")
+    parser.add_argument("--llm-cache", choices=["off", "record", "replay"], default=None,
+                        help="Serve repeated prompts from the local response cache, or replay it offline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse task outputs whose inputs haven't changed since an earlier run")
+    parser.add_argument("--context-budget", type=int, default=None, metavar="CHARS",
+                        help="Give each task only the upstream fields it needs, in at most CHARS characters")
+    parser.add_argument("--lean", action="store_true",
+                        help="Skip the tasks whose output no report uses")
+    parser.add_argument("--fused", action="store_true",
+                        help="Answer closely related tasks together with one LLM call")
+    parser.add_argument("--fit-scoring", choices=["llm", "local", "explain"], default=None,
+                        help="Compute the fit scores locally, optionally with the LLM explaining them")
+    parser.add_argument("--parallel-render", action="store_true",
+                        help="Render the PDF reports in a pool of worker processes")
+    args = parser.parse_args()
+
+    postings = load_corpus(args.corpus)
+    ranked = prescreen(args.resume_path, postings, top_k=args.top_k, min_score=args.min_score)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    os.makedirs(args.output_dir, exist_ok=True)
+    ranking_path = os.path.join(args.output_dir, f"prescreen_{timestamp}.jsonl")
+    with open(ranking_path, "w", encoding="utf-8") as f:
+        for posting in ranked:
+            f.write(json.dumps(posting) + "\n")
+            print(f"{posting['rank']:>4}. {posting['score']:.3f}  {posting['title'] or posting['id']}  {posting['jd_url']}")
+    print(f"Ranking written to: {ranking_path}")
+    if args.screen_only or not ranked:
+        return
+
+    from batch import run_batch
+
+    pairs = [{"id": posting["id"], "jd_url": posting["jd_url"], "resume_path": args.resume_path} for posting in ranked]
+    results_path = os.path.join(args.output_dir, f"batch_results_{timestamp}.jsonl")
+    print(f"\nAnalyzing the top {len(pairs)} of {len(postings)} postings with {args.workers} workers...")
+    records = run_batch(pairs, results_path, output_dir=args.output_dir, max_workers=args.workers,
+                        execution_mode=args.mode, max_concurrency=args.max_concurrency,
+                        prefetch=args.prefetch, llm_cache_mode=args.llm_cache,
+                        incremental=args.incremental, parallel_render=args.parallel_render,
+                        context_budget=args.context_budget, lean=args.lean, fused=args.fused,
+                        fit_scoring=args.fit_scoring)
+
+    completed = sum(1 for record in records if record["status"] == "completed")
+    print(f"\nPre-screen finished: {completed}/{len(records)} postings analyzed")
+    print(f"Results written to: {results_path}")
+
+
+if __name__ == "__main__":
+    main()
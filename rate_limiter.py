@@ -0,0 +1,278 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+from instrumentation import current_span
+
+# Budgets of one model endpoint, shared by every agent and pipeline in the process; 0 disables a budget
+LLM_RPM = float(os.getenv("LLM_RPM", 500))
+LLM_TPM = float(os.getenv("LLM_TPM", 150000))
+# Bounds of the adaptive number of calls in flight per model
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", 1))
+# Throttled attempts of one call before the error is raised to the caller
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+LLM_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_MAX_BACKOFF_SECONDS", 60))
+# Completion tokens charged up front for a call without a max_tokens setting, corrected once usage is known
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", 1000))
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units a minute, holding at most `capacity` (one minute's worth by default).
+
+    `reserve` takes units immediately and may drive the bucket into debt, returning how long
+    the caller must wait for its share to have been refilled. Callers are thereby served in
+    the order they reserved and nobody polls.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units; returns the seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def give_back(self, amount: float):
+        """Return (or, when negative, additionally take) units after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """
+    Limit on calls in flight that adapts AIMD-style: every success raises it by 1/limit
+    (one slot per round of calls), a throttling response halves it. Only calls started
+    after the last decrease can cause another, so one burst of 429s halves it once.
+
+    Threads wait for a slot on a condition, coroutines on a future of their event loop;
+    a freed slot wakes one of each, and whichever doesn't get it waits again.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        # (event loop, future) of every waiting coroutine, oldest first
+        self._async_waiters = []
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """Like `acquire`, but waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                    else:
+                        # Already woken: pass the freed slot on
+                        self._notify()
+                raise
+
+    def _notify(self):
+        # Called with the condition held
+        self._condition.notify()
+        if self._async_waiters:
+            loop, future = self._async_waiters.pop(0)
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._notify()
+
+    def on_success(self):
+        with self._condition:
+            grew = int(self.limit + 1 / self.limit) > int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if grew:
+                self._notify()
+
+    def on_throttle(self, started_at: float):
+        with self._condition:
+            if started_at >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = time.monotonic()
+
+
+def estimate_tokens(messages, max_completion_tokens: int = None) -> int:
+    """Rough token cost of a call: about four characters per prompt token, plus the completion allowance."""
+    if isinstance(messages, str):
+        prompt_chars = len(messages)
+    else:
+        prompt_chars = sum(len(str(m.get("content") or "")) if isinstance(m, dict) else len(str(m)) for m in messages)
+    return prompt_chars // 4 + (max_completion_tokens or LLM_COMPLETION_TOKENS_ESTIMATE)
+
+
+def is_throttle(error: Exception) -> bool:
+    """Whether `error` is a rate-limit response (HTTP 429) from the model endpoint."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after(error: Exception):
+    """Seconds the endpoint asked us to wait, from the error's Retry-After header, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Process-wide admission control for the calls to one model endpoint.
+
+    A call waits for a requests-per-minute and a tokens-per-minute bucket and for a slot
+    under the adaptive concurrency limit. When the endpoint throttles anyway, the limit is
+    cut and every caller pauses until the Retry-After (or an exponential backoff) has
+    passed before the call is retried, so a 429 doesn't set off a retry storm. A call's
+    tokens are charged once, on its first attempt; retries only count as requests. The
+    time a call spends waiting is added to the `queue_time` of the current span.
+    """
+
+    def __init__(self, rpm: float = LLM_RPM, tpm: float = LLM_TPM, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 min_concurrency: int = LLM_MIN_CONCURRENCY, max_retries: int = LLM_MAX_RETRIES):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        self.max_retries = max_retries
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    def _admission_delay(self, tokens: float) -> float:
+        delay = self._paused_until - time.monotonic()
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return max(0.0, delay)
+
+    def _throttled(self, error: Exception, started_at: float):
+        self.concurrency.on_throttle(started_at)
+        with self._lock:
+            self._consecutive_throttles += 1
+            backoff = min(LLM_MAX_BACKOFF_SECONDS, 2 ** (self._consecutive_throttles - 1))
+            wait = retry_after(error) or backoff * random.uniform(0.5, 1.0)
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+
+    def _succeeded(self):
+        self.concurrency.on_success()
+        with self._lock:
+            self._consecutive_throttles = 0
+
+    def _record_wait(self, waited: float, throttles: int):
+        active = current_span()
+        if active is not None:
+            # Like a task's, the span's start marks when the call got going, after its wait
+            active.start += waited
+            active.queue_time += waited
+            if throttles:
+                active.attributes["throttled"] = throttles
+
+    def call(self, fn, tokens: float = 0):
+        """
+        Run `fn()` once admitted, retrying it while the endpoint throttles.
+
+        Args:
+            fn: Callable making one request to the endpoint
+            tokens (float): Estimated tokens of the request, charged to the tokens budget
+
+        Returns:
+            Whatever `fn` returns
+        """
+        waited, throttles = 0.0, 0
+        try:
+            for attempt in range(self.max_retries + 1):
+                queued = time.monotonic()
+                time.sleep(self._admission_delay(tokens if attempt == 0 else 0))
+                self.concurrency.acquire()
+                started_at = time.monotonic()
+                waited += started_at - queued
+                try:
+                    result = fn()
+                except Exception as e:
+                    if not is_throttle(e) or attempt == self.max_retries:
+                        raise
+                    throttles += 1
+                    self._throttled(e, started_at)
+                    continue
+                finally:
+                    self.concurrency.release()
+                self._succeeded()
+                return result
+        finally:
+            self._record_wait(waited, throttles)
+
+    async def acall(self, fn, tokens: float = 0):
+        """Async form of `call` for a coroutine function `fn`; waits without blocking the event loop."""
+        waited, throttles = 0.0, 0
+        try:
+            for attempt in range(self.max_retries + 1):
+                queued = time.monotonic()
+                await asyncio.sleep(self._admission_delay(tokens if attempt == 0 else 0))
+                await self.concurrency.acquire_async()
+                started_at = time.monotonic()
+                waited += started_at - queued
+                try:
+                    result = await fn()
+                except Exception as e:
+                    if not is_throttle(e) or attempt == self.max_retries:
+                        raise
+                    throttles += 1
+                    self._throttled(e, started_at)
+                    continue
+                finally:
+                    self.concurrency.release()
+                self._succeeded()
+                return result
+        finally:
+            self._record_wait(waited, throttles)
+
+    def settle_tokens(self, estimated: float, actual: float):
+        """Correct the tokens budget once a call's real usage is known."""
+        if self.tokens is not None and actual:
+            self.tokens.give_back(estimated - actual)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Return the process-wide RateLimiter of `model`, creating it on first use."""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = RateLimiter()
+        return _limiters[model]
@@ -0,0 +1,283 @@
+import contextvars
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from instrumentation import span
+
+# Same separator crewai uses when it aggregates upstream outputs into a task's context
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+
+class PipelineResult:
+    """Result of a task-graph run, shaped like the `CrewOutput` returned by `Crew.kickoff()`."""
+
+    def __init__(self, tasks_output: list):
+        self.tasks_output = tasks_output
+
+    @property
+    def raw(self) -> str:
+        for output in reversed(self.tasks_output):
+            if output is not None:
+                return getattr(output, "raw", None) or str(output)
+        return ""
+
+    def __str__(self):
+        return self.raw
+
+
+def build_dependency_graph(tasks: list) -> dict[int, list[int]]:
+    """
+    Map each task index to the indices of the tasks it depends on.
+
+    Dependencies are read from each task's `context` list. Raises ValueError when a
+    task depends on something outside `tasks` or when the graph contains a cycle.
+    """
+    index = {id(task): i for i, task in enumerate(tasks)}
+    graph = {}
+    for i, task in enumerate(tasks):
+        context = getattr(task, "context", None)
+        deps = []
+        if isinstance(context, (list, tuple)):
+            for dep in context:
+                if id(dep) not in index:
+                    raise ValueError(f"Task {i + 1} depends on a task that is not part of this run")
+                deps.append(index[id(dep)])
+        graph[i] = deps
+
+    # Kahn's algorithm; anything left unvisited sits on a cycle
+    remaining = {i: len(deps) for i, deps in graph.items()}
+    dependents = {i: [] for i in graph}
+    for i, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(i)
+    ready = [i for i, count in remaining.items() if count == 0]
+    visited = 0
+    while ready:
+        current = ready.pop()
+        visited += 1
+        for child in dependents[current]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if visited != len(graph):
+        raise ValueError("Task dependencies contain a cycle")
+
+    return graph
+
+
+def consumed_tasks(graph: dict[int, list[int]], sinks) -> set[int]:
+    """
+    Indices of the tasks whose output is read, directly or through other tasks, by a sink.
+
+    `sinks` are the task indices whose outputs are used outside the graph (e.g. by the
+    report renderers). Every other task produces output nobody reads and need not run.
+    """
+    live = set()
+    stack = list(sinks)
+    while stack:
+        i = stack.pop()
+        if i not in live:
+            live.add(i)
+            stack.extend(graph[i])
+    return live
+
+
+def build_context(dep_outputs: list) -> str:
+    """Join the raw upstream outputs into the context string handed to a task, as crewai does."""
+    return CONTEXT_DIVIDER.join(getattr(output, "raw", None) or str(output)
+                                for output in dep_outputs if output is not None)
+
+
+def output_to_record(output) -> dict:
+    """Convert a task output into a JSON-serializable dict."""
+    pydantic_output = getattr(output, "pydantic", None)
+    return {
+        "description": getattr(output, "description", ""),
+        "agent": getattr(output, "agent", ""),
+        "raw": getattr(output, "raw", None) or str(output),
+        "json_dict": getattr(output, "json_dict", None),
+        "pydantic": pydantic_output.model_dump() if pydantic_output is not None else None,
+    }
+
+
+def record_to_output(record: dict, task):
+    """Rebuild the task output stored by `output_to_record` for `task`."""
+    from crewai.tasks.task_output import TaskOutput
+
+    pydantic_output = None
+    model = getattr(task, "output_pydantic", None)
+    if model is not None and record.get("pydantic") is not None:
+        pydantic_output = model.model_validate(record["pydantic"])
+    return TaskOutput(
+        description=record.get("description") or task.description,
+        expected_output=task.expected_output,
+        agent=record.get("agent") or task.agent.role,
+        raw=record["raw"],
+        json_dict=record.get("json_dict"),
+        pydantic=pydantic_output,
+    )
+
+
+def stage_key(task, dep_hashes: list[str], fingerprints: dict = None, variant: str = None) -> str:
+    """
+    Key identifying everything a task's output depends on.
+
+    Covers the prompt, the agent and its model, the content hashes of the upstream
+    outputs the task consumes, and the fingerprint of every external input (e.g. the
+    resume file's hash) whose name appears in the task description. A `variant` marks
+    outputs produced other than by the task's agent (see `run_task_graph` runners).
+    """
+    llm = getattr(task.agent, "llm", None)
+    payload = {
+        "description": task.description,
+        "expected_output": task.expected_output,
+        "agent_role": task.agent.role,
+        "model": getattr(llm, "model", None),
+        "dependencies": dep_hashes,
+        "inputs": {name: digest for name, digest in (fingerprints or {}).items() if name in task.description},
+    }
+    if variant is not None:
+        payload["variant"] = variant
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return f"stage:{hashlib.sha256(encoded).hexdigest()}"
+
+
+def _execute_task(task, index: int, context: str, max_retries: int, queued_at: float, runner=None):
+    with span(f"Task {index + 1}", "task", queued_at=queued_at, agent=task.agent.role) as task_span:
+        attempt = 0
+        while True:
+            try:
+                if runner is not None:
+                    return runner(context)
+                return task.execute_sync(agent=task.agent, context=context)
+            except Exception as e:
+                if attempt >= max_retries:
+                    raise
+                attempt += 1
+                task_span.attributes["retries"] = attempt
+                print(f"Task '{task.agent.role}' failed ({str(e)}), retrying ({attempt}/{max_retries})...")
+
+
+def run_task_graph(tasks: list, max_concurrency: int = 4, max_retries: int = 0, stage_cache=None,
+                   stage_ttl: float = None, fingerprints: dict = None, completed: dict = None, on_complete=None,
+                   context_builder=None, skip: set = None, runners: dict = None) -> PipelineResult:
+    """
+    Run tasks as soon as their dependencies have finished instead of one after another.
+
+    Every task whose dependencies are complete is started at once, with at most
+    `max_concurrency` tasks in flight. Outputs are returned in the original task order.
+
+    With a `stage_cache`, each task's output is stored under its `stage_key`. A later
+    run reuses every stored output whose prompt, inputs and upstream outputs are
+    unchanged, so only the invalidated part of the graph is executed again. Outputs older
+    than `stage_ttl` seconds are executed again too, since tools (e.g. web searches) can
+    give different answers over time.
+
+    Tasks in `completed` (e.g. loaded from a checkpoint) are treated as already done,
+    so a resumed run picks up from the first task that never finished. Tasks in `skip`
+    are not run at all and their output stays None (see `consumed_tasks`).
+
+    Args:
+        tasks (list): Tasks to run, with dependencies declared through `context`
+        max_concurrency (int): Maximum number of tasks executing at the same time
+        max_retries (int): Times a failing task is retried before the run is aborted
+        stage_cache (DiskCache): Store for incremental re-runs, None to always execute
+        stage_ttl (float): Maximum age in seconds of a reused output; None or 0 for no limit
+        fingerprints (dict): Content hashes of external inputs, keyed by the name tasks
+            refer to them by (e.g. the resume path)
+        completed (dict): Outputs of tasks that already ran, keyed by task index
+        on_complete (callable): Called as `on_complete(index, output)` whenever a task
+            finishes, whether it was executed or reused from the stage cache
+        context_builder (callable): Called as `context_builder(index, {dep index: output})`
+            to build a task's context instead of joining the full upstream outputs
+        skip (set): Indices of tasks to leave out; no other task may depend on them
+        runners (dict): Task index -> callable(context) producing that task's output in place
+            of executing the task with its agent (e.g. fused or locally computed tasks); a
+            runner's `variant` attribute, if any, keeps its outputs apart in the stage cache
+
+    Returns:
+        PipelineResult: Object exposing `tasks_output` like `Crew.kickoff()` does
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    graph = build_dependency_graph(tasks)
+    skip = set(skip or ())
+    for i, deps in graph.items():
+        if i not in skip and skip.intersection(deps):
+            raise ValueError(f"Task {i + 1} depends on a skipped task")
+    outputs = [None] * len(tasks)
+    output_hashes = {}
+    finished = set()
+    pending = set(graph)
+    running = {}
+    keys = {}
+
+    def finish(i, output, notify=True):
+        outputs[i] = output
+        output_hashes[i] = hashlib.sha256((getattr(output, "raw", None) or str(output)).encode("utf-8")).hexdigest()
+        finished.add(i)
+        if notify and on_complete is not None:
+            on_complete(i, output)
+
+    for i, output in (completed or {}).items():
+        pending.discard(i)
+        tasks[i].output = output
+        finish(i, output, notify=False)
+        print(f"Task {i + 1} already completed, skipping")
+    for i in sorted(skip - finished):
+        pending.discard(i)
+        print(f"Task {i + 1} output is not used, skipping")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        try:
+            while pending or running:
+                ready = sorted(i for i in pending if all(dep in finished for dep in graph[i]))
+                for i in ready:
+                    pending.discard(i)
+                    if context_builder is None:
+                        context = build_context([outputs[dep] for dep in graph[i]])
+                        dep_hashes = [output_hashes[dep] for dep in graph[i]]
+                    else:
+                        context = context_builder(i, {dep: outputs[dep] for dep in graph[i]})
+                        # Key on what the task actually sees, so upstream changes it never reads don't count
+                        dep_hashes = [hashlib.sha256(context.encode("utf-8")).hexdigest()]
+                    if stage_cache is not None:
+                        keys[i] = stage_key(tasks[i], dep_hashes, fingerprints,
+                                            getattr((runners or {}).get(i), "variant", None))
+                        cached = stage_cache.get(keys[i])
+                        if cached and stage_ttl and time.time() - cached[1].get("stored_at", 0) >= stage_ttl:
+                            print(f"Task {i + 1} output is older than {stage_ttl:g}s, recomputing")
+                            cached = None
+                        if cached:
+                            with span(f"Task {i + 1}", "task", agent=tasks[i].agent.role, cached=True):
+                                tasks[i].output = record_to_output(json.loads(cached[0]), tasks[i])
+                            finish(i, tasks[i].output)
+                            print(f"Task {i + 1} unchanged, reusing previous output")
+                            continue
+                    print(f"Starting task {i + 1} ({tasks[i].agent.role})...")
+                    # Each task runs in a copy of this context so its spans join the current trace
+                    future = pool.submit(contextvars.copy_context().run, _execute_task, tasks[i], i,
+                                         context, max_retries, time.time(), (runners or {}).get(i))
+                    running[future] = i
+
+                if not running:
+                    # Everything that became ready was reused; look for newly unblocked tasks
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    finish(i, future.result())
+                    if stage_cache is not None:
+                        stage_cache.put(keys[i], json.dumps(output_to_record(outputs[i])).encode("utf-8"),
+                                        {"stored_at": time.time()})
+                    print(f"Task {i + 1} completed")
+        except Exception:
+            for future in running:
+                future.cancel()
+            raise
+
+    return PipelineResult(outputs)
@@ -0,0 +1,145 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+# Compact output schemas for the analysis tasks. Each task declares one as its
+# `output_pydantic`, so the model's answer is validated on return and the report
+# renderer reads typed fields instead of re-parsing free text.
+
+
+class RankedItem(BaseModel):
+    name: str = Field(description="Skill, requirement or capability")
+    score: int = Field(ge=1, le=10, description="Importance or proficiency from 1 (low) to 10 (high)")
+
+    def __str__(self):
+        return f"{self.name} ({self.score}/10)"
+
+
+class RoleClassification(BaseModel):
+    role_category: str = Field(description="IT, Product or Hybrid, with a short role title")
+    technical_percent: int = Field(ge=0, le=100, description="Share of the role that is technical")
+    business_percent: int = Field(ge=0, le=100, description="Share of the role that is business")
+    technical_requirements: list[str] = Field(description="Primary technical requirements, most important first")
+    business_requirements: list[str] = Field(description="Primary business requirements, most important first")
+    domain_expertise: list[str] = Field(description="Domain expertise needs, most important first")
+
+
+class JobRequirements(BaseModel):
+    must_have_skills: list[RankedItem] = Field(description="Must-have skills scored by importance")
+    experience_requirements: list[str] = Field(description="Experience requirements with their metrics")
+    performance_expectations: list[str] = Field(description="Key performance expectations")
+    technical_business_ratio: str = Field(description="Technical vs business skill ratio, e.g. 40/60")
+
+
+class SkillsMatrix(BaseModel):
+    technical_skills: list[RankedItem] = Field(description="Technical skills scored by proficiency")
+    business_capabilities: list[str] = Field(description="Business capabilities, each with its evidence")
+    project_metrics: list[str] = Field(description="Quantified project outcomes and impact")
+    leadership_metrics: list[str] = Field(description="Leadership experience with team sizes or results")
+    education: list[str] = Field(default_factory=list, description="Degrees and certifications")
+
+
+class FitAnalysis(BaseModel):
+    overall_match: int = Field(ge=0, le=100, description="Overall match score")
+    technical_match: int = Field(ge=0, le=100, description="Technical skills match in percent")
+    business_match: int = Field(ge=0, le=100, description="Business skills match in percent")
+    experience_match: int = Field(ge=0, le=100, description="Experience level match in percent")
+    gaps: list[str] = Field(default_factory=list, description="Most important missing requirements")
+
+
+class CVOptimization(BaseModel):
+    summary: str = Field(description="Professional summary tailored to the role, at most three sentences")
+    highlighted_skills: list[str] = Field(description="Matching skills to highlight, most relevant first")
+    achievements: list[str] = Field(description="Relevant achievements rewritten with metrics")
+    added_keywords: list[str] = Field(description="Missing keywords worked into the CV")
+    experience: list[str] = Field(description="Experience bullets restructured for the role")
+
+
+class SkillsProfile(BaseModel):
+    skills: list[RankedItem] = Field(description="CV skills mapped to the job requirements, scored by fit")
+    missing_critical_skills: list[str] = Field(description="Critical skills to add or develop")
+    ats_keywords: list[str] = Field(description="Keywords to include for ATS scanning")
+
+
+class ReportPlan(BaseModel):
+    report_sections: list[str] = Field(description="Sections of the analysis report with their key metric")
+    cv_sections: list[str] = Field(description="Sections of the updated CV in order")
+    recommendations: list[str] = Field(description="Top recommendations for the candidate")
+
+
+class InterviewGuide(BaseModel):
+    technical_questions: list[str] = Field(description="Technical interview questions")
+    behavioral_questions: list[str] = Field(description="Behavioral interview questions")
+    scenario_questions: list[str] = Field(description="Role-specific scenario questions")
+    answer_frameworks: list[str] = Field(description="Suggested answer frameworks")
+    talking_points: list[str] = Field(description="Key talking points based on resume-job alignment")
+
+
+class FinalReview(BaseModel):
+    executive_summary: str = Field(description="Two or three sentences on the candidate's fit for the role")
+    recommendations: list[str] = Field(description="Final recommendations, most important first")
+
+
+# Output schema of each task, in pipeline order
+TASK_SCHEMAS = [
+    RoleClassification,
+    JobRequirements,
+    SkillsMatrix,
+    FitAnalysis,
+    CVOptimization,
+    SkillsProfile,
+    ReportPlan,
+    InterviewGuide,
+    FinalReview,
+]
+
+
+class AnalysisReportData(BaseModel):
+    """Typed content of the analysis report, as consumed by `create_agent_pdf_report`."""
+    role_classification: Optional[RoleClassification] = None
+    requirements: Optional[JobRequirements] = None
+    skills_matrix: Optional[SkillsMatrix] = None
+    match_analysis: Optional[FitAnalysis] = None
+    interview_guide: Optional[InterviewGuide] = None
+
+
+class CVData(BaseModel):
+    """Typed content of the updated CV, as consumed by `create_agent_pdf_report`."""
+    summary: Optional[str] = None
+    skills: list[str] = Field(default_factory=list)
+    experience: list[str] = Field(default_factory=list)
+    education: list[str] = Field(default_factory=list)
+
+
+def output_text(output) -> str:
+    """A task output as text: its model as JSON when it has one, its raw answer otherwise."""
+    pydantic_output = getattr(output, "pydantic", None)
+    if isinstance(pydantic_output, BaseModel):
+        return pydantic_output.model_dump_json()
+    return getattr(output, "raw", None) or str(output)
+
+
+def as_model(output, schema: type[BaseModel]) -> Optional[BaseModel]:
+    """
+    The structured form of a task output, or None when it doesn't match `schema`.
+
+    Accepts the model itself, a TaskOutput carrying it in `.pydantic`, or the raw JSON
+    text (e.g. an output read back from a results file).
+    """
+    if output is None:
+        return None
+    if isinstance(output, schema):
+        return output
+    pydantic_output = getattr(output, "pydantic", None)
+    if isinstance(pydantic_output, schema):
+        return pydantic_output
+
+    # Only the outermost {...} is parsed, which also skips markdown code fences
+    text = str(getattr(output, "raw", output))
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return schema.model_validate_json(text[start:end + 1])
+    except ValidationError:
+        return None
@@ -0,0 +1,402 @@
+import argparse
+import json
+import mimetypes
+import os
+import threading
+import socket
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from checkpoint import RunCheckpoint
+from instrumentation import Tracer
+from job_queue import JobQueue
+from main import run_pipeline, save_outputs
+from schemas import output_text
+
+# How often idle workers check the queue when no submission wakes them
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 5))
+# Directory whose PDFs clients may name as resume_path; nothing outside it is read
+RESUME_DIR = os.getenv("RESUME_DIR", "resumes")
+# Largest context_budget (in characters) a client may ask for
+MAX_CONTEXT_BUDGET = int(os.getenv("MAX_CONTEXT_BUDGET", 200000))
+
+# Per-job options a client may set in `input_data`, with their expected types
+JOB_OPTIONS = {
+    "execution_mode": str,
+    "prefetch": bool,
+    "incremental": bool,
+    "context_budget": int,
+    "lean": bool,
+    "fused": bool,
+    "fit_scoring": str,
+}
+
+INPUT_SCHEMA = {
+    "input_data": [
+        {"id": "jd_url", "type": "string", "name": "Job description URL",
+         "data": {"placeholder": "https://example.com/jobs/123"}},
+        {"id": "resume_path", "type": "string", "name": "Resume PDF path",
+         "data": {"description": "Path of the resume PDF inside the service's resume directory"}},
+        {"id": "execution_mode", "type": "option", "name": "Execution mode",
+         "data": {"values": ["sequential", "parallel"]}},
+        {"id": "prefetch", "type": "boolean", "name": "Put the job description and resume into the prompts"},
+        {"id": "incremental", "type": "boolean", "name": "Reuse unchanged task outputs of earlier runs"},
+        {"id": "context_budget", "type": "number", "name": "Upstream context budget in characters"},
+        {"id": "lean", "type": "boolean", "name": "Skip tasks whose output no report uses"},
+        {"id": "fused", "type": "boolean", "name": "Answer closely related tasks with one LLM call"},
+        {"id": "fit_scoring", "type": "option", "name": "Fit scoring",
+         "data": {"values": ["llm", "local", "explain"]}},
+    ]
+}
+
+
+class JobService:
+    """
+    Runs analysis jobs in the background on a fixed set of warm worker threads.
+
+    Each worker builds its own agent set once, when the service starts, and reuses it for
+    every job it picks up; the PDF reader and scraper tools and the caches behind them are
+    shared by all workers. Jobs are kept in a persistent JobQueue, so submitting never
+    blocks, duplicate submissions attach to the existing job, and jobs left running by a
+    crashed server are picked up again after restart. Every job is checkpointed and its
+    reports saved under its job ID, so a recovered job resumes where it stopped.
+    """
+
+    def __init__(self, workers: int = 4, output_dir: str = "Job_Application_Analysis",
+                 execution_mode: str = "sequential", max_concurrency: int = 4, prefetch: bool = False,
+                 llm_cache_mode: str = None, incremental: bool = False, context_budget: int = None,
+                 parallel_render: bool = False, job_queue: JobQueue = None, lean: bool = False,
+                 fused: bool = False, fit_scoring: str = None):
+        self.workers = workers
+        self.output_dir = output_dir
+        self.max_concurrency = max_concurrency
+        self.llm_cache_mode = llm_cache_mode
+        self.parallel_render = parallel_render
+        self.defaults = {
+            "execution_mode": execution_mode,
+            "prefetch": prefetch,
+            "incremental": incremental,
+            "context_budget": context_budget,
+            "lean": lean,
+            "fused": fused,
+            "fit_scoring": fit_scoring,
+        }
+        self.queue = job_queue or JobQueue()
+        self._threads = []
+        self._ready = threading.Barrier(workers + 1)
+        # Counts new submissions, so a worker can tell whether one arrived since it last found the queue empty
+        self._wakeup = threading.Condition()
+        self._submissions = 0
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the workers and wait until every one of them has its agents built."""
+        from crew_definition import get_pdf_reader_tool, get_scraper_tool
+
+        get_pdf_reader_tool()
+        get_scraper_tool()
+        os.makedirs(self.output_dir, exist_ok=True)
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        try:
+            self._ready.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("A worker failed to build its agents; see the error above") from None
+        print(f"{self.workers} workers ready, {self.queue.counts()['pending']} jobs pending")
+
+    def stop(self):
+        """Let the workers finish their current job and exit; pending jobs stay queued."""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def submit(self, jd_url: str, resume_path: str, options: dict = None, priority: int = 0) -> tuple[dict, bool]:
+        """
+        Queue an analysis of `jd_url` against `resume_path`.
+
+        Args:
+            jd_url (str): URL of the job description
+            resume_path (str): Path to the resume PDF
+            options (dict): Per-job overrides of the service defaults (see JOB_OPTIONS)
+            priority (int): Higher priorities are run first
+
+        Returns:
+            tuple: (job dict, True if an identical earlier submission's job was returned)
+        """
+        job_options = dict(self.defaults)
+        job_options.update(options or {})
+        job, deduplicated = self.queue.submit(jd_url, resume_path, job_options, priority=priority)
+        if not deduplicated:
+            with self._wakeup:
+                self._submissions += 1
+                self._wakeup.notify()
+        return job, deduplicated
+
+    def get(self, job_id: str) -> dict:
+        return self.queue.get(job_id)
+
+    def counts(self) -> dict:
+        return self.queue.counts()
+
+    def _worker(self):
+        from crew_definition import build_agents
+
+        try:
+            agents = build_agents()
+            self._ready.wait()
+        except threading.BrokenBarrierError:
+            return
+        except Exception:
+            traceback.print_exc()
+            self._ready.abort()
+            return
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        while not self._stopping.is_set():
+            with self._wakeup:
+                seen = self._submissions
+            job = self.queue.claim(worker_id)
+            if job is None:
+                # Sleep until the next submission; one made since `seen` was read means the queue is worth
+                # another look right away. The timeout also catches expired leases
+                with self._wakeup:
+                    self._wakeup.wait_for(lambda: self._submissions != seen or self._stopping.is_set(),
+                                          timeout=JOB_POLL_SECONDS)
+                continue
+            self._run_job(job, agents, worker_id)
+
+    def _keep_lease(self, job_id: str, worker_id: str, done: threading.Event):
+        while not done.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(job_id, worker_id):
+                print(f"[{job_id}] lease lost")
+                return
+
+    def _run_job(self, job: dict, agents: list, worker_id: str):
+        job_id = job["job_id"]
+        print(f"[{job_id}] running (attempt {job['attempts']})")
+        done = threading.Event()
+        threading.Thread(target=self._keep_lease, args=(job_id, worker_id, done), daemon=True).start()
+        try:
+            with Tracer(run_id=job_id).activate():
+                result = run_pipeline(job["jd_url"], job["resume_path"], max_concurrency=self.max_concurrency,
+                                      agents=agents, llm_cache_mode=self.llm_cache_mode,
+                                      checkpoint=RunCheckpoint(job_id), **job["options"])
+                outputs = [output_text(output) if output is not None else None
+                           for output in result.tasks_output]
+                artifacts = save_outputs(result.tasks_output, self.output_dir, job_id,
+                                         parallel_render=self.parallel_render)
+            self.queue.complete(job_id, worker_id, outputs,
+                                {name: path for name, path in artifacts.items() if path})
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.fail(job_id, worker_id, str(e))
+        finally:
+            done.set()
+        print(f"[{job_id}] {self.get(job_id)['status']}")
+
+
+def parse_job_input(body: dict, resume_dir: str = RESUME_DIR) -> tuple[str, str, dict, int]:
+    """
+    Validate a start_job request body.
+
+    The inputs are read from its `input_data` object, or from the body itself. The job's
+    `priority` is an optional integer at the top level of the body. The resume must be a
+    PDF inside `resume_dir`; relative paths are taken from there, and symlinks and `..`
+    are resolved before the check.
+
+    Returns:
+        tuple: (jd_url, resolved resume_path, per-job options, priority)
+    """
+    data = body.get("input_data", body)
+    if not isinstance(data, dict):
+        raise ValueError("input_data must be an object")
+
+    jd_url = str(data.get("jd_url") or "").strip()
+    resume_path = str(data.get("resume_path") or "").strip()
+    if not jd_url.startswith(("http://", "https://")):
+        raise ValueError("jd_url must be an http(s) URL")
+    root = os.path.realpath(resume_dir)
+    resolved = os.path.realpath(os.path.join(root, resume_path)) if resume_path else root
+    if os.path.commonpath([root, resolved]) != root or not resolved.lower().endswith(".pdf"):
+        raise ValueError(f"resume_path must be a PDF file inside the resume directory: {resume_path}")
+    if not os.path.isfile(resolved):
+        raise ValueError(f"Resume file not found at: {resume_path}")
+    resume_path = resolved
+
+    options = {}
+    for name, expected in JOB_OPTIONS.items():
+        value = data.get(name)
+        if value is None:
+            continue
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"{name} must be of type {expected.__name__}")
+        options[name] = value
+    if not 0 < options.get("context_budget", 1) <= MAX_CONTEXT_BUDGET:
+        raise ValueError(f"context_budget must be between 1 and {MAX_CONTEXT_BUDGET} characters")
+    if options.get("execution_mode", "sequential") not in ("sequential", "parallel"):
+        raise ValueError("execution_mode must be 'sequential' or 'parallel'")
+    if options.get("fit_scoring", "llm") not in ("llm", "local", "explain"):
+        raise ValueError("fit_scoring must be 'llm', 'local' or 'explain'")
+
+    priority = body.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ValueError("priority must be of type int")
+    return jd_url, resume_path, options, priority
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a JobService, in the shape of a Masumi agent API."""
+
+    service: JobService = None
+    resume_dir: str = RESUME_DIR
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, message: str):
+        self.send_json(status, {"status": "error", "error": message})
+
+    def job_from_query(self, query: dict):
+        """The job named by the `job_id` query parameter; sends a 404 and returns None if unknown."""
+        job_id = query.get("job_id", [""])[0]
+        job = self.service.get(job_id)
+        if job is None:
+            self.send_error_json(404, f"Unknown job: {job_id}")
+        return job
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/availability":
+            self.send_json(200, {"status": "available", "type": "masumi-agent", "workers": self.service.workers,
+                                 "jobs": self.service.counts()})
+        elif url.path == "/input_schema":
+            self.send_json(200, INPUT_SCHEMA)
+        elif url.path == "/status":
+            job = self.job_from_query(query)
+            if job is not None:
+                self.send_json(200, {
+                    "job_id": job["job_id"],
+                    "status": job["status"],
+                    "priority": job["priority"],
+                    "attempts": job["attempts"],
+                    "created_at": job["created_at"],
+                    "started_at": job["started_at"],
+                    "finished_at": job["finished_at"],
+                    "error": job["error"],
+                    "artifacts": sorted(job["artifacts"] or {}),
+                })
+        elif url.path == "/result":
+            job = self.job_from_query(query)
+            if job is None:
+                return
+            if job["status"] != "completed":
+                self.send_error_json(409, f"Job {job['job_id']} is {job['status']}")
+                return
+            self.send_json(200, {"job_id": job["job_id"], "status": job["status"], "outputs": job["outputs"],
+                                 "artifacts": sorted(job["artifacts"])})
+        elif url.path == "/download":
+            job = self.job_from_query(query)
+            if job is None:
+                return
+            name = query.get("artifact", [""])[0]
+            # Only files the job itself wrote can be served
+            path = (job["artifacts"] or {}).get(name)
+            if path is None or not os.path.isfile(path):
+                self.send_error_json(404, f"Job {job['job_id']} has no artifact {name!r}")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+            self.end_headers()
+            with open(path, "rb") as f:
+                while chunk := f.read(64 * 1024):
+                    self.wfile.write(chunk)
+        else:
+            self.send_error_json(404, f"Unknown endpoint: {url.path}")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/start_job":
+            self.send_error_json(404, f"Unknown endpoint: {url.path}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            jd_url, resume_path, options, priority = parse_job_input(body, self.resume_dir)
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            self.send_error_json(400, str(e))
+            return
+        job, deduplicated = self.service.submit(jd_url, resume_path, options, priority=priority)
+        self.send_json(202, {"status": "success", "job_id": job["job_id"], "job_status": job["status"],
+                             "deduplicated": deduplicated})
+
+
+def serve(service: JobService, host: str = "127.0.0.1", port: int = 8000, resume_dir: str = RESUME_DIR):
+    """Start `service` and answer HTTP requests for it until interrupted."""
+    service.start()
+    handler = type("BoundJobRequestHandler", (JobRequestHandler,), {"service": service, "resume_dir": resume_dir})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    print(f"Serving on http://{host}:{port} (resumes from {os.path.realpath(resume_dir)})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        httpd.server_close()
+        service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve job and resume analyses over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="Jobs analyzed at the same time")
+    parser.add_argument("--output-dir", default="Job_Application_Analysis")
+    parser.add_argument("--db", default=None, help="SQLite file holding the job queue (default: JOB_DB_PATH)")
+    parser.add_argument("--resume-dir", default=RESUME_DIR,
+                        help="Directory holding the resume PDFs jobs may use (default: RESUME_DIR)")
+    parser.add_argument("--mode", choices=["sequential", "parallel"], default="sequential",
+                        help="Default task execution mode inside each job")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Tasks in flight per job in parallel mode")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Put the job description and resume text straight into the task prompts")
+    parser.add_argument("--llm-cache", choices=["off", "record", "replay"], default=None,
+                        help="Serve repeated prompts from the local response cache, or replay it offline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse task outputs whose inputs haven't changed since an earlier run")
+    parser.add_argument("--context-budget", type=int, default=None, metavar="CHARS",
+                        help="Give each task only the upstream fields it needs, in at most CHARS characters")
+    parser.add_argument("--parallel-render", action="store_true",
+                        help="Render the PDF reports in a pool of worker processes")
+    parser.add_argument("--lean", action="store_true",
+                        help="Skip the tasks whose output no report uses")
+    parser.add_argument("--fused", action="store_true",
+                        help="Answer closely related tasks together with one LLM call")
+    parser.add_argument("--fit-scoring", choices=["llm", "local", "explain"], default=None,
+                        help="Default fit scoring: compute the scores locally, optionally with the LLM explaining them")
+    args = parser.parse_args()
+
+    service = JobService(workers=args.workers, output_dir=args.output_dir, execution_mode=args.mode,
+                         max_concurrency=args.max_concurrency, prefetch=args.prefetch,
+                         llm_cache_mode=args.llm_cache, incremental=args.incremental,
+                         context_budget=args.context_budget, parallel_render=args.parallel_render,
+                         job_queue=JobQueue(args.db) if args.db else None, lean=args.lean,
+                         fused=args.fused, fit_scoring=args.fit_scoring)
+    serve(service, host=args.host, port=args.port, resume_dir=args.resume_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+import sys
+from types import SimpleNamespace
+
+import batch
+from batch import run_batch
+
+
+def test_agent_construction_failure_fails_only_its_pair(tmp_path, monkeypatch):
+    attempts = []
+
+    def build_agents():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("model endpoint misconfigured")
+        return ["agent"]
+
+    monkeypatch.setitem(sys.modules, "crew_definition", SimpleNamespace(build_agents=build_agents))
+    monkeypatch.setattr(batch, "run_pipeline",
+                        lambda jd_url, resume_path, **options: SimpleNamespace(tasks_output=[f"analysis of {jd_url}"]))
+    monkeypatch.setattr(batch, "save_outputs", lambda tasks_output, output_dir, run_id, **options: {})
+    pairs = [{"id": f"pair{n}", "jd_url": f"https://example.com/jobs/{n}", "resume_path": "cv.pdf"}
+             for n in range(3)]
+    results_path = tmp_path / "results.jsonl"
+
+    records = run_batch(pairs, str(results_path), output_dir=str(tmp_path / "out"), max_workers=1)
+
+    assert [record["status"] for record in records] == ["failed", "completed", "completed"]
+    assert records[0]["error"] == "model endpoint misconfigured"
+    assert records[1]["outputs"] == ["analysis of https://example.com/jobs/1"]
+    # Agents are built once per worker after the failed attempt
+    assert len(attempts) == 2
+    with open(results_path, encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 3
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from cache import file_sha256
+from checkpoint import RunCheckpoint, new_run_id
+
+JD_URL = "https://example.com/jobs/1"
+OPTIONS = dict(execution_mode="sequential", prefetch=False, llm_cache_mode=None, incremental=False,
+               context_budget=None, lean=False, fused=False, fit_scoring=None)
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 resume")
+    return str(path)
+
+
+@pytest.fixture
+def checkpoint(tmp_path, resume):
+    checkpoint = RunCheckpoint("run", directory=str(tmp_path / "checkpoints"))
+    checkpoint.start(JD_URL, resume, **OPTIONS)
+    return checkpoint
+
+
+def test_run_ids_are_unique():
+    assert len({new_run_id() for _ in range(100)}) == 100
+
+
+def test_started_checkpoint_cannot_be_started_again(checkpoint, resume):
+    with pytest.raises(FileExistsError):
+        checkpoint.start(JD_URL, resume, **OPTIONS)
+
+
+def test_outputs_are_read_back(checkpoint):
+    checkpoint.record(0, SimpleNamespace(raw="first", description="Task 1", agent="a"))
+    checkpoint.record(1, SimpleNamespace(raw="second", description="Task 2", agent="b"))
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "task", "index": 2, "outp')
+    header, records = checkpoint.load()
+    assert header["jd_url"] == JD_URL and header["options"] == OPTIONS
+    assert {i: record["raw"] for i, record in records.items()} == {0: "first", 1: "second"}
+
+
+def test_same_run_can_be_resumed(checkpoint, resume):
+    checkpoint.check_resumable(JD_URL, file_sha256(resume), **OPTIONS)
+    # The cache mode doesn't change what the tasks produce
+    checkpoint.check_resumable(JD_URL, file_sha256(resume), **dict(OPTIONS, llm_cache_mode="replay"))
+
+
+def test_other_job_description_is_refused(checkpoint, resume):
+    with pytest.raises(ValueError, match="checkpointed for"):
+        checkpoint.check_resumable("https://example.com/jobs/2", file_sha256(resume), **OPTIONS)
+
+
+def test_changed_resume_is_refused(checkpoint, resume):
+    with pytest.raises(ValueError, match="Resume changed"):
+        checkpoint.check_resumable(JD_URL, "0" * 64, **OPTIONS)
+
+
+@pytest.mark.parametrize("name, value", [("lean", True), ("fused", True), ("fit_scoring", "local"),
+                                         ("context_budget", 4000), ("incremental", True),
+                                         ("execution_mode", "parallel"), ("prefetch", True)])
+def test_other_options_are_refused(checkpoint, resume, name, value):
+    with pytest.raises(ValueError, match=name):
+        checkpoint.check_resumable(JD_URL, file_sha256(resume), **dict(OPTIONS, **{name: value}))
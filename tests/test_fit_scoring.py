@@ -0,0 +1,57 @@
+from fit_scoring import score_fit
+from schemas import JobRequirements, RankedItem, RoleClassification, SkillsMatrix
+
+ROLE = RoleClassification(
+    role_category="IT - Backend Engineer", technical_percent=70, business_percent=30,
+    technical_requirements=["Python web services", "PostgreSQL"],
+    business_requirements=["Stakeholder communication"],
+    domain_expertise=["Payments"],
+)
+REQUIREMENTS = JobRequirements(
+    must_have_skills=[RankedItem(name="Python", score=9), RankedItem(name="Kubernetes", score=6)],
+    experience_requirements=["5+ years building backend services"],
+    performance_expectations=["Ship reliable APIs"],
+    technical_business_ratio="70/30",
+)
+SKILLS = SkillsMatrix(
+    technical_skills=[RankedItem(name="Python", score=9), RankedItem(name="PostgreSQL", score=7)],
+    business_capabilities=["Stakeholder communication with product teams"],
+    project_metrics=["Built payments backend services over 6 years"],
+    leadership_metrics=["Led a team of 4"],
+)
+
+
+def test_complete_inputs_are_scored():
+    fit = score_fit(ROLE, REQUIREMENTS, SKILLS)
+    assert fit is not None
+    assert fit.technical_match > 0 and fit.business_match > 0 and fit.experience_match > 0
+    assert "Kubernetes" in fit.gaps
+    assert score_fit(ROLE, REQUIREMENTS, SKILLS) == fit
+
+
+def test_missing_role_classification_is_not_scored():
+    assert score_fit(None, REQUIREMENTS, SKILLS) is None
+
+
+def test_missing_requirements_are_not_scored():
+    assert score_fit(ROLE, None, SKILLS) is None
+
+
+def test_missing_skills_are_not_scored():
+    assert score_fit(ROLE, REQUIREMENTS, None) is None
+
+
+def test_role_without_business_requirements_is_not_scored():
+    role = ROLE.model_copy(update={"business_requirements": [], "domain_expertise": []})
+    assert score_fit(role, REQUIREMENTS, SKILLS) is None
+
+
+def test_requirements_without_experience_lines_are_not_scored():
+    requirements = REQUIREMENTS.model_copy(update={"experience_requirements": []})
+    assert score_fit(ROLE, requirements, SKILLS) is None
+
+
+def test_no_technical_requirements_is_not_scored():
+    role = ROLE.model_copy(update={"technical_requirements": []})
+    requirements = REQUIREMENTS.model_copy(update={"must_have_skills": []})
+    assert score_fit(role, requirements, SKILLS) is None
@@ -0,0 +1,153 @@
+import time
+
+import pytest
+
+from job_queue import JobQueue
+
+JD_URL = "https://example.com/jobs/1"
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 resume")
+    return str(path)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), lease_seconds=0.2, max_attempts=2)
+
+
+def test_identical_submission_attaches_to_pending_job(queue, resume):
+    job, deduplicated = queue.submit(JD_URL, resume, {"lean": True})
+    again, deduplicated_again = queue.submit(JD_URL, resume, {"lean": True})
+    assert not deduplicated
+    assert deduplicated_again
+    assert again["job_id"] == job["job_id"]
+    assert queue.counts()["pending"] == 1
+
+
+def test_different_options_are_a_different_job(queue, resume):
+    job, _ = queue.submit(JD_URL, resume, {"fit_scoring": "llm"})
+    other, deduplicated = queue.submit(JD_URL, resume, {"fit_scoring": "local", "lean": True})
+    assert not deduplicated
+    assert other["job_id"] != job["job_id"]
+    assert other["options"] == {"fit_scoring": "local", "lean": True}
+
+
+def test_option_order_does_not_matter(queue, resume):
+    job, _ = queue.submit(JD_URL, resume, {"lean": True, "prefetch": False})
+    again, deduplicated = queue.submit(JD_URL, resume, {"prefetch": False, "lean": True})
+    assert deduplicated
+    assert again["job_id"] == job["job_id"]
+
+
+def test_changed_resume_content_is_a_different_job(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    with open(resume, "ab") as f:
+        f.write(b" edited")
+    other, deduplicated = queue.submit(JD_URL, resume)
+    assert not deduplicated
+    assert other["job_id"] != job["job_id"]
+
+
+def test_attaching_raises_priority_of_pending_job(queue, resume):
+    job, _ = queue.submit(JD_URL, resume, priority=1)
+    again, _ = queue.submit(JD_URL, resume, priority=5)
+    assert again["priority"] == 5
+    assert queue.get(job["job_id"])["priority"] == 5
+
+
+def test_claims_follow_priority_then_submission_order(queue, tmp_path, resume):
+    low, _ = queue.submit("https://example.com/jobs/low", resume, priority=0)
+    first, _ = queue.submit("https://example.com/jobs/first", resume, priority=3)
+    second, _ = queue.submit("https://example.com/jobs/second", resume, priority=3)
+    claimed = [queue.claim("worker")["job_id"] for _ in range(3)]
+    assert claimed == [first["job_id"], second["job_id"], low["job_id"]]
+    assert queue.claim("worker") is None
+
+
+def test_failed_job_can_be_resubmitted(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("worker")
+    assert queue.fail(job["job_id"], "worker", "boom")
+    again, deduplicated = queue.submit(JD_URL, resume)
+    assert not deduplicated
+    assert again["job_id"] != job["job_id"]
+
+
+def test_completed_job_answers_resubmissions_within_ttl(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("worker")
+    assert queue.complete(job["job_id"], "worker", ["out"], {"analysis_pdf": "a.pdf"})
+    again, deduplicated = queue.submit(JD_URL, resume)
+    assert deduplicated
+    assert again["status"] == "completed"
+    assert again["outputs"] == ["out"]
+
+
+def test_completed_job_older_than_ttl_is_run_again(tmp_path, resume):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), dedup_ttl=0.1)
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("worker")
+    queue.complete(job["job_id"], "worker", [], {})
+    time.sleep(0.2)
+    again, deduplicated = queue.submit(JD_URL, resume)
+    assert not deduplicated
+    assert again["job_id"] != job["job_id"]
+    # The old job keeps its results
+    assert queue.get(job["job_id"])["status"] == "completed"
+
+
+def test_zero_ttl_never_reuses_completed_jobs(tmp_path, resume):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), dedup_ttl=0)
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("worker")
+    queue.complete(job["job_id"], "worker", [], {})
+    _, deduplicated = queue.submit(JD_URL, resume)
+    assert not deduplicated
+
+
+def test_expired_lease_goes_to_the_next_worker(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    assert queue.claim("dead")["attempts"] == 1
+    assert queue.heartbeat(job["job_id"], "dead")
+    time.sleep(0.3)
+    reclaimed = queue.claim("alive")
+    assert reclaimed["job_id"] == job["job_id"]
+    assert reclaimed["attempts"] == 2
+    # The worker that lost its lease can neither extend nor finish the job
+    assert not queue.heartbeat(job["job_id"], "dead")
+    assert not queue.complete(job["job_id"], "dead", [], {})
+    assert queue.complete(job["job_id"], "alive", ["out"], {})
+    assert queue.get(job["job_id"])["status"] == "completed"
+
+
+def test_heartbeat_keeps_the_lease(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("worker")
+    for _ in range(4):
+        time.sleep(0.1)
+        assert queue.heartbeat(job["job_id"], "worker")
+    assert queue.claim("other") is None
+
+
+def test_job_fails_after_max_attempts(queue, resume):
+    job, _ = queue.submit(JD_URL, resume)
+    queue.claim("first")
+    time.sleep(0.3)
+    queue.claim("second")
+    time.sleep(0.3)
+    assert queue.claim("third") is None
+    failed = queue.get(job["job_id"])
+    assert failed["status"] == "failed"
+    assert "lease expired" in failed["error"]
+
+
+def test_jobs_survive_reopening(tmp_path, resume):
+    path = str(tmp_path / "jobs.sqlite")
+    job, _ = JobQueue(path).submit(JD_URL, resume, {"lean": True}, priority=2)
+    reopened = JobQueue(path)
+    assert reopened.get(job["job_id"])["options"] == {"lean": True}
+    assert reopened.claim("worker")["job_id"] == job["job_id"]
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from rate_limiter import AdaptiveConcurrency, RateLimiter
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def flaky(failures: int, result="ok"):
+    """A request that is throttled `failures` times before it succeeds."""
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise Throttled()
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_tokens_are_charged_once_per_call(monkeypatch):
+    monkeypatch.setattr("rate_limiter.retry_after", lambda error: 0.001)
+    limiter = RateLimiter(rpm=6000, tpm=60000, max_retries=3)
+    fn = flaky(2)
+    assert limiter.call(fn, tokens=1000) == "ok"
+    assert len(fn.calls) == 3
+    # Three requests, but only the first attempt's tokens
+    assert limiter.requests._tokens == pytest.approx(6000 - 3, abs=1)
+    assert limiter.tokens._tokens == pytest.approx(60000 - 1000, abs=5)
+
+
+def test_throttle_is_raised_after_max_retries(monkeypatch):
+    monkeypatch.setattr("rate_limiter.retry_after", lambda error: 0.001)
+    limiter = RateLimiter(rpm=0, tpm=0, max_retries=2)
+    fn = flaky(10)
+    with pytest.raises(Throttled):
+        limiter.call(fn)
+    assert len(fn.calls) == 3
+
+
+def test_async_tokens_are_charged_once_per_call(monkeypatch):
+    monkeypatch.setattr("rate_limiter.retry_after", lambda error: 0.001)
+    limiter = RateLimiter(rpm=6000, tpm=60000, max_retries=3)
+    fn = flaky(2)
+
+    async def request():
+        return fn()
+
+    assert asyncio.run(limiter.acall(request, tokens=1000)) == "ok"
+    assert limiter.tokens._tokens == pytest.approx(60000 - 1000, abs=5)
+
+
+def test_async_waiter_is_woken_by_release():
+    concurrency = AdaptiveConcurrency(maximum=1)
+
+    async def main():
+        await concurrency.acquire_async()
+        waiter = asyncio.ensure_future(concurrency.acquire_async())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        released = time.monotonic()
+        concurrency.release()
+        await asyncio.wait_for(waiter, 1)
+        return time.monotonic() - released
+
+    assert asyncio.run(main()) < 0.04
+    assert concurrency.in_flight == 1
+
+
+def test_thread_release_wakes_async_waiter():
+    concurrency = AdaptiveConcurrency(maximum=1)
+    concurrency.acquire()
+
+    async def main():
+        threading.Timer(0.05, concurrency.release).start()
+        await asyncio.wait_for(concurrency.acquire_async(), 1)
+
+    asyncio.run(main())
+    assert concurrency.in_flight == 1
+
+
+def test_cancelled_async_waiter_passes_its_slot_on():
+    concurrency = AdaptiveConcurrency(maximum=1)
+
+    async def main():
+        await concurrency.acquire_async()
+        first = asyncio.ensure_future(concurrency.acquire_async())
+        second = asyncio.ensure_future(concurrency.acquire_async())
+        await asyncio.sleep(0.01)
+        concurrency.release()
+        # Woken, but cancelled before it could take the slot
+        first.cancel()
+        await asyncio.wait_for(second, 1)
+        assert first.cancelled()
+
+    asyncio.run(main())
+    assert concurrency.in_flight == 1
+    assert not concurrency._async_waiters
+
+
+def test_async_calls_respect_the_concurrency_limit():
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=2)
+    in_flight, peak = 0, 0
+
+    async def request():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    async def main():
+        await asyncio.gather(*(limiter.acall(request) for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.concurrency.in_flight == 0
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Model endpoint stand-in: answers 429 with a Retry-After to every request above its capacity."""
+
+    capacity = 2
+    latency = 0.02
+    in_flight = 0
+    served = 0
+    throttled = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        cls = type(self)
+        with cls.lock:
+            admitted = cls.in_flight < cls.capacity
+            if admitted:
+                cls.in_flight += 1
+            else:
+                cls.throttled += 1
+        if not admitted:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(cls.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+            cls.served += 1
+        body = b'{"choices": []}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    handler = type("Handler", (ThrottlingHandler,), {"lock": threading.Lock()})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{httpd.server_address[1]}/v1/chat/completions"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_limiter_adapts_to_a_throttling_http_endpoint(endpoint):
+    handler, url = endpoint
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=8, max_retries=10)
+
+    def request():
+        response = requests.post(url, json={"messages": []}, timeout=5)
+        response.raise_for_status()
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(lambda _: limiter.call(request), range(40)))
+
+    assert statuses == [200] * 40
+    assert handler.served == 40
+    # The 429s halved the limit down towards the endpoint's capacity instead of retrying at full width
+    assert handler.throttled > 0
+    assert limiter.concurrency.limit < 8
+    assert handler.throttled < 40
@@ -0,0 +1,224 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cache import DiskCache
+from scheduler import CONTEXT_DIVIDER, build_dependency_graph, consumed_tasks, run_task_graph
+
+
+class FakeTask:
+    """Stand-in for a crewai Task whose output is its name applied to its context."""
+
+    def __init__(self, name: str, context=(), description: str = None, delay: float = 0):
+        self.description = description or f"Do {name}"
+        self.expected_output = "text"
+        self.output_pydantic = None
+        self.agent = SimpleNamespace(role=name, llm=None)
+        self.context = list(context)
+        self.output = None
+        self.delay = delay
+        self.calls = []
+
+    def execute_sync(self, agent, context):
+        self.calls.append(context)
+        time.sleep(self.delay)
+        self.output = SimpleNamespace(raw=f"{self.agent.role}[{context}]", description=self.description,
+                                      agent=self.agent.role)
+        return self.output
+
+
+def diamond(description_b: str = None):
+    """a -> (b, c) -> d"""
+    a = FakeTask("a")
+    b = FakeTask("b", [a], description=description_b)
+    c = FakeTask("c", [a])
+    d = FakeTask("d", [b, c])
+    return [a, b, c, d]
+
+
+def executed(tasks):
+    return [task.agent.role for task in tasks if task.calls]
+
+
+def test_graph_follows_task_context():
+    assert build_dependency_graph(diamond()) == {0: [], 1: [0], 2: [0], 3: [1, 2]}
+
+
+def test_cycle_is_rejected():
+    a, b = FakeTask("a"), FakeTask("b")
+    a.context, b.context = [b], [a]
+    with pytest.raises(ValueError, match="cycle"):
+        build_dependency_graph([a, b])
+
+
+def test_dependency_outside_the_run_is_rejected():
+    outsider = FakeTask("outsider")
+    with pytest.raises(ValueError, match="not part of this run"):
+        build_dependency_graph([FakeTask("a", [outsider])])
+
+
+def test_tasks_see_their_dependencies_outputs_in_order():
+    tasks = diamond()
+    result = run_task_graph(tasks, max_concurrency=4)
+    assert [output.raw for output in result.tasks_output] == [
+        "a[]", "b[a[]]", "c[a[]]", f"d[b[a[]]{CONTEXT_DIVIDER}c[a[]]]"]
+    assert result.raw == tasks[3].output.raw
+
+
+def test_concurrency_is_bounded():
+    tasks = [FakeTask(str(n), delay=0.05) for n in range(6)]
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def counting(task):
+        original = task.execute_sync
+
+        def execute_sync(agent, context):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            try:
+                return original(agent, context)
+            finally:
+                with lock:
+                    in_flight -= 1
+        return execute_sync
+
+    for task in tasks:
+        task.execute_sync = counting(task)
+    run_task_graph(tasks, max_concurrency=2)
+    assert peak == 2
+
+
+def test_max_concurrency_must_be_positive():
+    with pytest.raises(ValueError):
+        run_task_graph(diamond(), max_concurrency=0)
+
+
+class FlakyTask(FakeTask):
+    """Fails its first `failures` executions."""
+
+    def __init__(self, name: str, failures: int):
+        super().__init__(name)
+        self.failures = failures
+
+    def execute_sync(self, agent, context):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("transient")
+        return super().execute_sync(agent, context)
+
+
+def test_failing_task_aborts_the_run():
+    with pytest.raises(RuntimeError):
+        run_task_graph([FlakyTask("a", failures=1)])
+
+
+def test_failing_task_is_retried():
+    result = run_task_graph([FlakyTask("a", failures=1)], max_retries=1)
+    assert result.tasks_output[0].raw == "a[]"
+
+
+@pytest.fixture
+def stage_cache(tmp_path):
+    return DiskCache(str(tmp_path / "stages"))
+
+
+def test_unchanged_run_is_served_from_the_stage_cache(stage_cache):
+    first = run_task_graph(diamond(), stage_cache=stage_cache)
+    tasks = diamond()
+    second = run_task_graph(tasks, stage_cache=stage_cache)
+    assert executed(tasks) == []
+    assert [o.raw for o in second.tasks_output] == [o.raw for o in first.tasks_output]
+
+
+def test_changed_input_recomputes_only_what_depends_on_it(stage_cache):
+    resume = "/resumes/cv.pdf"
+    run_task_graph(diamond(f"Read {resume}"), stage_cache=stage_cache, fingerprints={resume: "v1"})
+    tasks = diamond(f"Read {resume}")
+    run_task_graph(tasks, stage_cache=stage_cache, fingerprints={resume: "v2"})
+    # b's output is unchanged by the new fingerprint, so d is reused
+    assert executed(tasks) == ["b"]
+
+    tasks = diamond(f"Read {resume}")
+    tasks[1].execute_sync = lambda agent, context: SimpleNamespace(raw="b changed")
+    run_task_graph(tasks, stage_cache=stage_cache, fingerprints={resume: "v3"})
+    assert executed(tasks) == ["d"]
+
+
+def test_stage_outputs_expire(stage_cache):
+    run_task_graph(diamond(), stage_cache=stage_cache)
+    time.sleep(0.05)
+    tasks = diamond()
+    run_task_graph(tasks, stage_cache=stage_cache, stage_ttl=0.01)
+    assert executed(tasks) == ["a", "b", "c", "d"]
+    tasks = diamond()
+    run_task_graph(tasks, stage_cache=stage_cache, stage_ttl=60)
+    assert executed(tasks) == []
+
+
+
+def test_completed_tasks_are_not_run_again():
+    tasks = diamond()
+    done = SimpleNamespace(raw="a[earlier]")
+    finished = []
+    run_task_graph(tasks, completed={0: done}, on_complete=lambda i, output: finished.append(i))
+    assert executed(tasks) == ["b", "c", "d"]
+    assert tasks[1].calls == ["a[earlier]"]
+    assert sorted(finished) == [1, 2, 3]
+
+
+def test_consumed_tasks_follow_dependencies_of_sinks():
+    graph = build_dependency_graph(diamond())
+    assert consumed_tasks(graph, [1]) == {0, 1}
+    assert consumed_tasks(graph, [3]) == {0, 1, 2, 3}
+
+
+def test_skipped_tasks_are_not_run():
+    tasks = diamond()
+    result = run_task_graph(tasks, skip={2, 3})
+    assert executed(tasks) == ["a", "b"]
+    assert result.tasks_output[2] is None and result.tasks_output[3] is None
+
+
+def test_skipping_a_needed_task_is_rejected():
+    tasks = diamond()
+    with pytest.raises(ValueError, match="Task 4 depends on a skipped task"):
+        run_task_graph(tasks, skip={2})
+    assert executed(tasks) == []
+
+
+def test_runner_replaces_the_agent():
+    tasks = diamond()
+    run_task_graph(tasks, runners={2: lambda context: SimpleNamespace(raw=f"local[{context}]")})
+    assert executed(tasks) == ["a", "b", "d"]
+    assert tasks[3].calls == [f"b[a[]]{CONTEXT_DIVIDER}local[a[]]"]
+
+
+class Runner:
+    def __init__(self, variant: str = None):
+        self.calls = []
+        if variant is not None:
+            self.variant = variant
+
+    def __call__(self, context: str):
+        self.calls.append(context)
+        return SimpleNamespace(raw=f"c[{context}]")
+
+
+def test_runner_variant_keeps_outputs_apart(stage_cache):
+    run_task_graph(diamond(), stage_cache=stage_cache)
+    # A runner without a variant shares the agent's stored output
+    plain = Runner()
+    run_task_graph(diamond(), stage_cache=stage_cache, runners={2: plain})
+    assert plain.calls == []
+
+    local = Runner("local")
+    run_task_graph(diamond(), stage_cache=stage_cache, runners={2: local})
+    assert local.calls == ["a[]"]
+    again = Runner("local")
+    run_task_graph(diamond(), stage_cache=stage_cache, runners={2: again})
+    assert again.calls == []
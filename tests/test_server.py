@@ -0,0 +1,82 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from job_queue import JobQueue
+from server import JobService, parse_job_input
+
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    directory = tmp_path / "resumes"
+    directory.mkdir()
+    (directory / "cv.pdf").write_bytes(b"%PDF-1.4 resume")
+    (directory / "notes.txt").write_text("not a resume")
+    (tmp_path / "outside.pdf").write_bytes(b"%PDF-1.4 other")
+    return str(directory)
+
+
+def job_input(resume_dir, **data):
+    return parse_job_input({"input_data": dict({"jd_url": "https://example.com/jobs/1", "resume_path": "cv.pdf"},
+                                               **data)}, resume_dir)
+
+
+def test_resume_is_resolved_inside_the_resume_directory(resume_dir):
+    _, resume_path, options, priority = job_input(resume_dir)
+    assert resume_path.endswith("cv.pdf") and resume_path.startswith(str(resume_dir))
+    assert options == {} and priority == 0
+
+
+@pytest.mark.parametrize("resume_path", ["../outside.pdf", "notes.txt", "/etc/passwd", ""])
+def test_resume_outside_the_directory_is_refused(resume_dir, resume_path):
+    with pytest.raises(ValueError, match="inside the resume directory"):
+        job_input(resume_dir, resume_path=resume_path)
+
+
+def test_context_budget_is_accepted_within_bounds(resume_dir):
+    assert job_input(resume_dir, context_budget=6000)[2] == {"context_budget": 6000}
+
+
+@pytest.mark.parametrize("budget", [0, -5, server.MAX_CONTEXT_BUDGET + 1])
+def test_context_budget_out_of_bounds_is_refused(resume_dir, budget):
+    with pytest.raises(ValueError, match="context_budget"):
+        job_input(resume_dir, context_budget=budget)
+
+
+def test_context_budget_must_be_an_int(resume_dir):
+    with pytest.raises(ValueError, match="context_budget"):
+        job_input(resume_dir, context_budget=True)
+
+
+def test_every_submission_is_picked_up_without_polling(tmp_path, resume_dir, monkeypatch):
+    # Workers without agents that finish each job at once
+    monkeypatch.setitem(sys.modules, "crew_definition", SimpleNamespace(build_agents=lambda: []))
+    monkeypatch.setattr(server, "JOB_POLL_SECONDS", 30)
+    service = JobService(workers=4, job_queue=JobQueue(str(tmp_path / "jobs.sqlite")))
+    finished = []
+    lock = threading.Lock()
+
+    def run_job(job, agents, worker_id):
+        service.queue.complete(job["job_id"], worker_id, [], {})
+        with lock:
+            finished.append(job["job_id"])
+
+    service._run_job = run_job
+    for n in range(service.workers):
+        threading.Thread(target=service._worker, daemon=True).start()
+    service._ready.wait()
+    try:
+        for n in range(3):
+            time.sleep(0.1)
+            jobs = [service.submit(f"https://example.com/jobs/{n}-{k}", f"{resume_dir}/cv.pdf")[0]
+                    for k in range(10)]
+            deadline = time.monotonic() + 2
+            while len(finished) < 10 * (n + 1) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert {job["job_id"] for job in jobs} <= set(finished)
+    finally:
+        service.stop()